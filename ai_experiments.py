@@ -1,121 +1,256 @@
-import time
-from game import CubicGame
-from ai_player import AdvancedAIPlayer
-from constants import PLAYER_X, PLAYER_O
-
-
-def run_single_game(difficulty_x=3, difficulty_o=3, heuristic=2):
-    
-
-    game = CubicGame()
-
-    ai_x = AdvancedAIPlayer(
-        PLAYER_X,
-        difficulty=difficulty_x,
-        heuristic_type=heuristic
-    )
-    ai_o = AdvancedAIPlayer(
-        PLAYER_O,
-        difficulty=difficulty_o,
-        heuristic_type=heuristic
-    )
-
-    total_nodes_x = 0
-    total_nodes_o = 0
-    total_time_x = 0.0
-    total_time_o = 0.0
-
-    while not game.game_over:
-        if game.current_player == PLAYER_X:
-            move = ai_x.find_best_move(game)
-            metrics = ai_x.get_metrics()
-            total_nodes_x += metrics["nodes"]
-            total_time_x += metrics["time"]
-        else:
-            move = ai_o.find_best_move(game)
-            metrics = ai_o.get_metrics()
-            total_nodes_o += metrics["nodes"]
-            total_time_o += metrics["time"]
-
-        if move:
-            game.make_move(*move)
-            game.switch_player()
-        else:
-            break
-
-    return {
-        "winner": game.winner,
-        "moves": game.move_count,
-        "x_nodes": total_nodes_x,
-        "o_nodes": total_nodes_o,
-        "x_time": round(total_time_x, 3),
-        "o_time": round(total_time_o, 3),
-    }
-
-
-def run_experiment(
-    games=30,
-    difficulty_x=3,
-    difficulty_o=3,
-    heuristic=2
-):
-    
-
-    results = {
-        "X_wins": 0,
-        "O_wins": 0,
-        "draws": 0,
-        "avg_moves": 0,
-        "avg_nodes_x": 0,
-        "avg_nodes_o": 0,
-        "avg_time_x": 0,
-        "avg_time_o": 0,
-    }
-
-    total_moves = 0
-    total_nodes_x = 0
-    total_nodes_o = 0
-    total_time_x = 0
-    total_time_o = 0
-
-    for i in range(games):
-        print(f"Running game {i + 1}/{games}")
-        result = run_single_game(
-            difficulty_x,
-            difficulty_o,
-            heuristic
-        )
-
-        if result["winner"] == PLAYER_X:
-            results["X_wins"] += 1
-        elif result["winner"] == PLAYER_O:
-            results["O_wins"] += 1
-        else:
-            results["draws"] += 1
-
-        total_moves += result["moves"]
-        total_nodes_x += result["x_nodes"]
-        total_nodes_o += result["o_nodes"]
-        total_time_x += result["x_time"]
-        total_time_o += result["o_time"]
-
-    results["avg_moves"] = round(total_moves / games, 2)
-    results["avg_nodes_x"] = int(total_nodes_x / games)
-    results["avg_nodes_o"] = int(total_nodes_o / games)
-    results["avg_time_x"] = round(total_time_x / games, 3)
-    results["avg_time_o"] = round(total_time_o / games, 3)
-
-    return results
-
-
-if __name__ == "__main__":
-    results = run_experiment(
-        games=20,
-        difficulty_x=3,
-        difficulty_o=3,
-        heuristic=2
-    )
-
-    print("\n===== EXPERIMENT RESULTS =====")
-    for key, value in results.items():
-        print(f"{key}: {value}")
+import os
+import json
+import math
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from game_record import GameRecord, RecordWriter
+from position_db import PositionDatabase
+from constants import PLAYER_X, PLAYER_O
+
+
+def run_single_game(difficulty_x=3, difficulty_o=3, heuristic=2, seed=None, verbose=True, move_time=None,
+                    record=False):
+    
+
+    # The AI only draws on the module RNG (opening and fallback moves), so
+    # seeding it here makes a game reproducible up to search timeouts.
+    if seed is not None:
+        random.seed(seed)
+
+    game = CubicGame()
+
+    ai_x = AdvancedAIPlayer(
+        PLAYER_X,
+        difficulty=difficulty_x,
+        heuristic_type=heuristic,
+        verbose=verbose
+    )
+    ai_o = AdvancedAIPlayer(
+        PLAYER_O,
+        difficulty=difficulty_o,
+        heuristic_type=heuristic,
+        verbose=verbose
+    )
+    # move_time overrides the difficulty's time limit; every search stops
+    # at its deadline with the last completed iteration.
+    if move_time is not None:
+        ai_x.max_time = move_time
+        ai_o.max_time = move_time
+
+    return play_game(game, ai_x, ai_o, record)
+
+
+# With record set, the result also holds a GameRecord of the game with
+# each move's search value, depth and time.
+def play_game(game, ai_x, ai_o, record=False):
+    
+
+    total_nodes_x = 0
+    total_nodes_o = 0
+    total_time_x = 0.0
+    total_time_o = 0.0
+    evals, depths, times = [], [], []
+
+    while not game.game_over:
+        if game.current_player == PLAYER_X:
+            ai = ai_x
+            move = ai_x.find_best_move(game)
+            metrics = ai_x.get_metrics()
+            total_nodes_x += metrics["nodes"]
+            total_time_x += metrics["time"]
+        else:
+            ai = ai_o
+            move = ai_o.find_best_move(game)
+            metrics = ai_o.get_metrics()
+            total_nodes_o += metrics["nodes"]
+            total_time_o += metrics["time"]
+
+        if move:
+            game.make_move(*move)
+            game.switch_player()
+            evals.append(getattr(ai, "best_value", 0))
+            depths.append(metrics.get("depth_reached", metrics["depth"]))
+            times.append(metrics["time"])
+        else:
+            break
+
+    result = {
+        "winner": game.winner,
+        "moves": game.move_count,
+        "x_nodes": total_nodes_x,
+        "o_nodes": total_nodes_o,
+        "x_time": round(total_time_x, 3),
+        "o_time": round(total_time_o, 3),
+    }
+    if record:
+        result["record"] = GameRecord.from_game(game, evals, depths, times)
+    return result
+
+
+def wilson_interval(successes, total, z=1.96):
+    if total == 0:
+        return (0.0, 1.0)
+    rate = successes / total
+    denominator = 1 + z * z / total
+    centre = (rate + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(rate * (1 - rate) / total + z * z / (4 * total * total)) / denominator
+    return (round(max(0.0, centre - margin), 4), round(min(1.0, centre + margin), 4))
+
+
+def summarize_results(game_results):
+    
+
+    games = len(game_results)
+    results = {
+        "X_wins": 0,
+        "O_wins": 0,
+        "draws": 0,
+        "avg_moves": 0,
+        "avg_nodes_x": 0,
+        "avg_nodes_o": 0,
+        "avg_time_x": 0,
+        "avg_time_o": 0,
+    }
+
+    total_moves = 0
+    total_nodes_x = 0
+    total_nodes_o = 0
+    total_time_x = 0
+    total_time_o = 0
+
+    for result in game_results:
+        if result["winner"] == PLAYER_X:
+            results["X_wins"] += 1
+        elif result["winner"] == PLAYER_O:
+            results["O_wins"] += 1
+        else:
+            results["draws"] += 1
+
+        total_moves += result["moves"]
+        total_nodes_x += result["x_nodes"]
+        total_nodes_o += result["o_nodes"]
+        total_time_x += result["x_time"]
+        total_time_o += result["o_time"]
+
+    if games == 0:
+        return results
+
+    results["avg_moves"] = round(total_moves / games, 2)
+    results["avg_nodes_x"] = int(total_nodes_x / games)
+    results["avg_nodes_o"] = int(total_nodes_o / games)
+    results["avg_time_x"] = round(total_time_x / games, 3)
+    results["avg_time_o"] = round(total_time_o / games, 3)
+    results["X_win_rate_ci"] = wilson_interval(results["X_wins"], games)
+    results["O_win_rate_ci"] = wilson_interval(results["O_wins"], games)
+    results["draw_rate_ci"] = wilson_interval(results["draws"], games)
+
+    return results
+
+
+def run_experiment(
+    games=30,
+    difficulty_x=3,
+    difficulty_o=3,
+    heuristic=2
+):
+    
+
+    game_results = []
+    for i in range(games):
+        print(f"Running game {i + 1}/{games}")
+        game_results.append(run_single_game(
+            difficulty_x,
+            difficulty_o,
+            heuristic
+        ))
+
+    return summarize_results(game_results)
+
+
+def _play_arena_game(game_id, seed, difficulty_x, difficulty_o, heuristic, move_time, record):
+    result = run_single_game(difficulty_x, difficulty_o, heuristic, seed=seed, verbose=False,
+                             move_time=move_time, record=record)
+    result["game"] = game_id
+    result["seed"] = seed
+    return result
+
+
+def run_arena(
+    games=30,
+    difficulty_x=3,
+    difficulty_o=3,
+    heuristic=2,
+    workers=None,
+    seed=0,
+    output_path=None,
+    move_time=None,
+    record_path=None,
+    position_db_path=None
+):
+    
+
+    # Games are independent, so they are sharded over a process pool and
+    # each one is written to the JSONL file the moment it finishes. Game i
+    # always plays with seed + i, whichever worker picks it up. With
+    # record_path, the moves are appended to that game record file too;
+    # with position_db_path, the games are added to that database as one
+    # new segment.
+    workers = workers or os.cpu_count() or 1
+    game_results = []
+    game_records = []
+    record = bool(record_path or position_db_path)
+    output = open(output_path, "a", encoding="utf-8") if output_path else None
+    records = RecordWriter(record_path) if record_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_play_arena_game, i, seed + i, difficulty_x, difficulty_o, heuristic,
+                                move_time, record)
+                for i in range(games)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if record:
+                    game_records.append(result.pop("record"))
+                if records:
+                    records.write(game_records[-1])
+                game_results.append(result)
+                if output:
+                    output.write(json.dumps(result) + "\n")
+                    output.flush()
+    finally:
+        if output:
+            output.close()
+        if records:
+            records.close()
+
+    if position_db_path:
+        database = PositionDatabase(position_db_path)
+        try:
+            database.add_records(game_records)
+        finally:
+            database.close()
+
+    game_results.sort(key=lambda result: result["game"])
+    results = summarize_results(game_results)
+    results["workers"] = workers
+    return results
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    results = run_arena(
+        games=20,
+        difficulty_x=3,
+        difficulty_o=3,
+        heuristic=2,
+        output_path="arena_results.jsonl"
+    )
+    results["wall_time"] = round(time.time() - start_time, 2)
+
+    print("\n===== EXPERIMENT RESULTS =====")
+    for key, value in results.items():
+        print(f"{key}: {value}")
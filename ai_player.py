@@ -1,449 +1,780 @@
-import math
-import time
-import random
-import threading
-from collections import OrderedDict
-from typing import Self
-from constants import *
-
-class AdvancedAIPlayer:
-    def __init__(self, player_symbol, difficulty=3, heuristic_type=2):
-        self.player_symbol = player_symbol 
-        self.heuristic_type = heuristic_type
-        self.opponent_symbol = PLAYER_O if player_symbol == PLAYER_X else PLAYER_X
-        self.difficulty = difficulty  
-        self.set_difficulty(difficulty)
-          
-
-        self.nodes_evaluated = 0
-        self.last_search_time = 0.0
-
-        self.transposition_table = OrderedDict()
-        self.search_cancelled = False
-        self.lock = threading.Lock()
-        self.killer_moves = {}
-
-    def reset_metrics(self):
-        self.nodes_evaluated = 0
-        self.last_search_time = 0.0
-
-    def get_metrics(self):
-        return {
-            "nodes": self.nodes_evaluated,
-            "time": round(self.last_search_time, 4),
-            "depth": self.depth,
-            "difficulty": self.difficulty,
-            "heuristic": self.heuristic_type
-        }
-    
-    
-    def set_difficulty(self, level):
-        difficulties = {
-            1: {'depth': 2, 'max_time': 1},
-            2: {'depth': 3, 'max_time': 2},
-            3: {'depth': 4, 'max_time': 3},
-            4: {'depth': 5, 'max_time': 5},
-            5: {'depth': 6, 'max_time': 8}
-        }
-        config = difficulties.get(level, difficulties[3])
-        self.depth = config['depth']
-        self.max_time = config['max_time']
-
-    def find_best_move(self, game):
-        self.nodes_evaluated = 0
-        self.search_cancelled = False
-        self.reset_metrics()
-        start_time = time.time()
-        
-        immediate_win = self.find_immediate_win(game, self.player_symbol)
-        if immediate_win:
-            return immediate_win
-            
-        immediate_block = self.find_immediate_win(game, self.opponent_symbol)
-        if immediate_block:
-            return immediate_block
-        
-        double_threat = self.find_double_threat_move(game)
-        if double_threat:
-            return double_threat
-        
-        best_move = self.iterative_deepening_search(game, start_time)
-        
-        search_time = time.time() - start_time
-        print(f"AI: Found move in {search_time:.2f}s, evaluated {self.nodes_evaluated} nodes, difficulty: {self.difficulty}")
-        
-        self.last_search_time = time.time() - start_time
-
-        return best_move if best_move else self.get_fallback_move(game)
-
-
-    def iterative_deepening_search(self, game, start_time):
-        best_move = None
-        best_value = -math.inf
-        
-        if game.move_count == 0:
-            return random.choice(CENTER_POSITIONS)
-        elif game.move_count == 1:
-            return self.get_second_move_response(game)
-        
-        for current_depth in range(1, self.depth + 1):
-            if self.check_timeout(start_time):
-                break
-                
-            try:
-                move, value = self.alpha_beta_search(game, current_depth, start_time)
-                if move and value > best_value:
-                    best_value = value
-                    best_move = move
-                    if value > WIN_SCORE - 1000:
-                        break
-            except TimeoutError:
-                break
-                
-        return best_move
-
-    def alpha_beta_search(self, game, depth, start_time):
-        best_value = -math.inf
-        best_move = None
-        alpha = -math.inf
-        beta = math.inf
-        
-        moves = self.get_ordered_moves(game)
-        
-        for move in moves:
-            if self.check_timeout(start_time):
-                raise TimeoutError()
-                
-            new_game = game.copy()
-            new_game.make_move(move[0], move[1], move[2])
-            new_game.switch_player()
-            
-            move_value = self.alpha_beta_minimax(new_game, depth - 1, alpha, beta, False, start_time)
-            
-            if move_value > best_value:
-                best_value = move_value
-                best_move = move
-                
-            alpha = max(alpha, best_value)
-            if beta <= alpha:
-                self.store_killer_move(depth, move)  
-                break
-                
-        return best_move, best_value
-
-    def get_ordered_moves(self, game):
-        moves = game.get_possible_moves()
-        if not moves:
-            return moves
-            
-        killer_moves = self.killer_moves.get(game.move_count, [])
-        ordered_moves = []
-        
-        for move in killer_moves:
-            if move in moves:
-                ordered_moves.append(move)
-                moves.remove(move)
-        
-        ordered_moves.extend(moves)
-        return ordered_moves
-
-    def store_killer_move(self, depth, move):
-        if depth not in self.killer_moves:
-            self.killer_moves[depth] = []
-        
-        if move not in self.killer_moves[depth]:
-            self.killer_moves[depth].insert(0, move)
-            self.killer_moves[depth] = self.killer_moves[depth][:3]
-
-    def alpha_beta_minimax(self, game, depth, alpha, beta, maximizing_player, start_time):
-        self.nodes_evaluated += 1
-        
-        if self.check_timeout(start_time):
-            return 0
-            
-        if game.game_over:
-            if game.winner == self.player_symbol:
-                return WIN_SCORE + depth * 1000  
-            elif game.winner == self.opponent_symbol:
-                return -WIN_SCORE - depth * 1000  
-            else:
-                return 0
-                
-        if depth == 0:
-            return self.evaluate(game)
-
-            
-        state_key = game.get_game_state() + str(depth) + str(maximizing_player)
-        if state_key in self.transposition_table:
-            return self.transposition_table[state_key]
-            
-        moves = self.get_ordered_moves(game)
-        
-        if maximizing_player:
-            max_eval = -math.inf
-            for move in moves:
-                if self.check_timeout(start_time):
-                    break
-                    
-                new_game = game.copy()
-                new_game.make_move(move[0], move[1], move[2])
-                new_game.switch_player()
-                
-                eval = self.alpha_beta_minimax(new_game, depth - 1, alpha, beta, False, start_time)
-                max_eval = max(max_eval, eval)
-                alpha = max(alpha, eval)
-                
-                if beta <= alpha:
-                    self.store_killer_move(depth, move)
-                    break
-                    
-            self.store_transposition(state_key, max_eval)
-            return max_eval
-        else:
-            min_eval = math.inf
-            for move in moves:
-                if self.check_timeout(start_time):
-                    break
-                    
-                new_game = game.copy()
-                new_game.make_move(move[0], move[1], move[2])
-                new_game.switch_player()
-                
-                eval = self.alpha_beta_minimax(new_game, depth - 1, alpha, beta, True, start_time)
-                min_eval = min(min_eval, eval)
-                beta = min(beta, eval)
-                
-                if beta <= alpha:
-                    self.store_killer_move(depth, move)
-                    break
-                    
-            self.store_transposition(state_key, min_eval)
-            return min_eval
-        
-
-    def evaluate(self, game):
-        if self.heuristic_type == 1:
-            return self.quick_evaluate(game)
-        return self.comprehensive_evaluate(game)
-
-    def comprehensive_evaluate(self, game):
-        if game.game_over:
-            if game.winner == self.player_symbol:
-                return WIN_SCORE
-            elif game.winner == self.opponent_symbol:
-                return -WIN_SCORE
-            return 0
-            
-        score = 0
-        
-        player_score = self.evaluate_player_position(game, self.player_symbol)
-        opponent_score = self.evaluate_player_position(game, self.opponent_symbol)
-        
-        score += player_score
-        score -= opponent_score * 1.1  
-        
-        score += self.evaluate_center_control(game, self.player_symbol) * CENTER_BONUS
-        score -= self.evaluate_center_control(game, self.opponent_symbol) * CENTER_BONUS
-        
-        score += self.evaluate_corners(game, self.player_symbol) * CORNER_BONUS
-        score -= self.evaluate_corners(game, self.opponent_symbol) * CORNER_BONUS
-        
-        score += self.evaluate_double_threats(game, self.player_symbol) * DOUBLE_THREAT_BONUS
-        score -= self.evaluate_double_threats(game, self.opponent_symbol) * DOUBLE_THREAT_BONUS
-        
-        mobility = len(game.get_possible_moves())
-        if game.current_player == self.player_symbol:
-            score += mobility * MOBILITY_BONUS
-        else:
-            score -= mobility * MOBILITY_BONUS
-            
-        return int(score)
-
-    def evaluate_player_position(self, game, player):
-        score = 0
-        opponent = self.opponent_symbol if player == self.player_symbol else self.player_symbol
-        
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                for z in range(BOARD_SIZE):
-                    if game.board[x][y][z] == player:
-                        for dx, dy, dz in DIRECTIONS:
-                            line_score = self.evaluate_line_from_point(game, x, y, z, dx, dy, dz, player, opponent)
-                            score += line_score
-                            
-        return score
-
-    def evaluate_line_from_point(self, game, x, y, z, dx, dy, dz, player, opponent):
-        player_count = 0
-        empty_count = 0
-        blocked = False
-        
-        for i in range(WINNING_LENGTH):
-            nx, ny, nz = x + i*dx, y + i*dy, z + i*dz
-            if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                blocked = True
-                break
-                
-            cell = game.board[nx][ny][nz]
-            if cell == player:
-                player_count += 1
-            elif cell == opponent:
-                blocked = True
-                break
-            else:
-                empty_count += 1
-        
-        if blocked:
-            return 0
-            
-        if player_count == 4:
-            return WIN_SCORE
-        elif player_count == 3 and empty_count == 1:
-            return THREE_IN_LINE
-        elif player_count == 2 and empty_count == 2:
-            return TWO_IN_LINE
-        elif player_count == 1 and empty_count == 3:
-            return TWO_IN_LINE // 2
-            
-        return 0
-
-    def evaluate_center_control(self, game, player):
-        control = 0
-        for pos in CENTER_POSITIONS:
-            x, y, z = pos
-            if game.board[x][y][z] == player:
-                control += 1
-        return control
-
-    def evaluate_corners(self, game, player):
-        control = 0
-        for pos in CORNER_POSITIONS:
-            x, y, z = pos
-            if game.board[x][y][z] == player:
-                control += 1
-        return control
-
-    def evaluate_double_threats(self, game, player):
-        threats = 0
-        possible_moves = game.get_possible_moves()
-        
-        for move in possible_moves:
-            x, y, z = move
-            game.board[x][y][z] = player
-            win_count = self.count_winning_lines(game, player, x, y, z)
-            game.board[x][y][z] = EMPTY
-            
-            if win_count >= 2:
-                threats += 1
-                
-        return threats
-
-    def count_winning_lines(self, game, player, x, y, z):
-        count = 0
-        for dx, dy, dz in DIRECTIONS:
-            if self.check_line_for_win(game, x, y, z, dx, dy, dz, player):
-                count += 1
-        return count
-
-    def check_line_for_win(self, game, x, y, z, dx, dy, dz, player):
-        total_count = 1 
-        
-        for i in range(1, WINNING_LENGTH):
-            nx, ny, nz = x + i*dx, y + i*dy, z + i*dz
-            if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                break
-            if game.board[nx][ny][nz] != player:
-                break
-            total_count += 1
-            
-        for i in range(1, WINNING_LENGTH):
-            nx, ny, nz = x - i*dx, y - i*dy, z - i*dz
-            if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                break
-            if game.board[nx][ny][nz] != player:
-                break
-            total_count += 1
-            
-        return total_count >= WINNING_LENGTH
-
-    def find_immediate_win(self, game, player):
-        for move in game.get_possible_moves():
-            x, y, z = move
-            game.board[x][y][z] = player
-            if game.check_win_optimized(x, y, z, player):
-                game.board[x][y][z] = EMPTY
-                return move
-            game.board[x][y][z] = EMPTY
-        return None
-
-    def find_double_threat_move(self, game):
-        for move in game.get_possible_moves():
-            x, y, z = move
-            game.board[x][y][z] = self.player_symbol
-            threat_count = self.count_winning_lines(game, self.player_symbol, x, y, z)
-            game.board[x][y][z] = EMPTY
-            
-            if threat_count >= 2:
-                return move
-        return None
-
-    def get_second_move_response(self, game):
-        for x, y, z in CENTER_POSITIONS:
-            if game.board[x][y][z] == self.opponent_symbol:
-                return random.choice(CORNER_POSITIONS)
-        
-        return random.choice(CENTER_POSITIONS)
-
-    def get_fallback_move(self, game):
-        moves = game.get_possible_moves()
-        if not moves:
-            return None
-            
-        best_score = -math.inf
-        best_move = moves[0]
-        
-        for move in moves[:8]: 
-            x, y, z = move
-            game.board[x][y][z] = self.player_symbol
-            score = self.quick_evaluate(game)
-            game.board[x][y][z] = EMPTY
-            
-            if score > best_score:
-                best_score = score
-                best_move = move
-                
-        return best_move
-
-    def quick_evaluate(self, game):
-        score = 0
-        for pos in CENTER_POSITIONS:
-            x, y, z = pos
-            if game.board[x][y][z] == self.player_symbol:
-                score += 20
-            elif game.board[x][y][z] == self.opponent_symbol:
-                score -= 25
-                
-        for pos in CORNER_POSITIONS:
-            x, y, z = pos
-            if game.board[x][y][z] == self.player_symbol:
-                score += 10
-            elif game.board[x][y][z] == self.opponent_symbol:
-                score -= 12
-                
-        return score
-
-    def check_timeout(self, start_time):
-        if time.time() - start_time > self.max_time:
-            self.search_cancelled = True
-            return True
-        return False
-
-    def store_transposition(self, key, value):
-        with self.lock:
-            if len(self.transposition_table) >= MAX_CACHE_SIZE:
-                self.transposition_table.popitem(last=False)
-            self.transposition_table[key] = value
-
-
-
-
+import math
+import random
+import threading
+from typing import Self
+from constants import *
+from bitboard import *
+from transposition import *
+from symmetry import unique_moves
+from threat_search import ThreatSpaceSearch
+from parallel_search import ParallelRootSearch
+from lazy_smp import LazySMPSearch
+from endgame import EndgameSolver
+from move_ordering import MoveOrdering
+from search_control import SearchController, SearchCancelled
+from time_manager import TimeManager
+from search_stats import SearchListeners, ITERATION, MOVE, effective_branching_factor, rate
+
+
+# A win k plies below a node searched with depth d scores WIN_SCORE +
+# (d - k) * 1000. The table keeps it as WIN_SCORE - k * 1000, relative to
+# the node, so a probe at another depth gets its own distance back. Any
+# value beyond mate_bound is a win.
+def _to_stored(value, depth, mate_bound):
+    if value > mate_bound:
+        return value - depth * 1000
+    if value < -mate_bound:
+        return value + depth * 1000
+    return value
+
+
+def _from_stored(value, depth, mate_bound):
+    if value > mate_bound:
+        return value + depth * 1000
+    if value < -mate_bound:
+        return value - depth * 1000
+    return value
+
+
+def print_search_event(event, data):
+    if event == MOVE:
+        print(f"AI: Found move in {data['time']:.2f}s, evaluated {data['nodes']} nodes, difficulty: {data['difficulty']}")
+
+class AdvancedAIPlayer:
+    def __init__(self, player_symbol, difficulty=3, heuristic_type=2, use_copy_search=False,
+                 use_symmetry=True, use_pvs=True, workers=1, parallel_mode="root",
+                 verbose=True, opening_book=None, endgame_threshold=ENDGAME_EMPTY_CELLS,
+                 endgame_cache=None, geometry=None, position_db=None):
+        self.player_symbol = player_symbol 
+        # Board shape of the games this player is given (see geometry.py).
+        self.geometry = geometry or DEFAULT_GEOMETRY
+        # No win is further away than the number of cells.
+        self.mate_bound = WIN_SCORE - self.geometry.cell_count * 1000
+        self.heuristic_type = heuristic_type
+        self.opponent_symbol = PLAYER_O if player_symbol == PLAYER_X else PLAYER_X
+        self.difficulty = difficulty  
+        self.set_difficulty(difficulty)
+        # The copy-per-node search is kept for comparison with make/unmake.
+        self.use_copy_search = use_copy_search
+        self.use_symmetry = use_symmetry
+        self.use_pvs = use_pvs
+        # The first two moves are picked without a search; the opening book
+        # builder turns this off to search those positions too.
+        self.use_opening_shortcuts = True
+        self.depth_reached = 0
+        self.best_value = 0
+        self.workers = workers
+        # "root" splits root moves over the pool, "lazy_smp" runs a full
+        # search in every worker against one shared transposition table.
+        self.parallel_mode = parallel_mode
+        self.parallel_search = None
+        self.verbose = verbose
+        # Search events for the UI, the arena and benchmarks; see
+        # search_stats.py. verbose prints each move through a listener.
+        self.listeners = SearchListeners()
+        if verbose:
+            self.listeners.add(print_search_event)
+        self.opening_book = opening_book
+        # Experience book: a PositionDatabase of earlier games, consulted
+        # once the forced moves have been ruled out.
+        self.position_db = position_db
+        # At or below endgame_threshold empty cells the position is solved
+        # exactly; endgame_cache names the sqlite file that keeps solutions.
+        self.endgame_threshold = endgame_threshold
+        self.endgame_cache = endgame_cache
+        self.endgame_solver = None
+          
+
+        self.nodes_evaluated = 0
+        self.worker_nodes = 0
+        self.last_search_time = 0.0
+        self.evaluations = 0
+        self.iteration_stats = []
+        self.profiler = None
+
+        self.transposition_table = TranspositionTable()
+        self.search_cancelled = False
+        self.move_ordering = MoveOrdering(self.geometry)
+        # Deadline and cancel flag for the running search, find_best_move or
+        # ponder; cancel_search() may be called from any thread.
+        self.controller = SearchController()
+        # Splits max_time (or a game clock, see set_clock) into a soft and a
+        # hard budget per move.
+        self.time_manager = TimeManager()
+        
+        # Pondering searches the predicted reply between moves; the completed
+        # iterations are resumed when the opponent plays that reply.
+        self.pondering = False
+        self.ponder_thread = None
+        self.ponder_history = None
+        self.ponder_result = None
+        self.ponder_hit = False
+        self.completed_iterations = None
+
+    def reset_metrics(self):
+        self.nodes_evaluated = 0
+        self.worker_nodes = 0
+        self.last_search_time = 0.0
+        self.evaluations = 0
+        self.iteration_stats = []
+        self.move_ordering.reset_stats()
+        self.transposition_table.reset_stats()
+
+    def add_listener(self, callback):
+        self.listeners.add(callback)
+
+    # Opt-in: times the hot search methods until disable_profiling (see
+    # profiling.py). Returns the profiler, which keeps its numbers.
+    def enable_profiling(self):
+        from profiling import SearchProfiler
+
+        if self.profiler is None:
+            self.profiler = SearchProfiler(self)
+            self.profiler.install()
+        return self.profiler
+
+    def disable_profiling(self):
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.uninstall()
+            self.profiler = None
+        return profiler
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    # "depth" is the configured limit and "depth_reached" the deepest
+    # completed iteration; "iterations" holds the per-iteration stats.
+    def get_metrics(self):
+        table = self.transposition_table
+        return {
+            "nodes": self.nodes_evaluated,
+            "time": round(self.last_search_time, 4),
+            "depth": self.depth,
+            "difficulty": self.difficulty,
+            "heuristic": self.heuristic_type,
+            "workers": self.workers,
+            "parallel_mode": self.parallel_mode,
+            "ponder_hit": self.ponder_hit,
+            "depth_reached": self.depth_reached,
+            "cutoffs": self.move_ordering.cutoffs,
+            "first_move_cutoff_rate": round(self.move_ordering.first_move_cutoff_rate(), 4),
+            "worker_nodes": self.worker_nodes,
+            "evaluations": self.evaluations,
+            "tt_probes": table.probes,
+            "tt_hits": table.hits,
+            "tt_hit_rate": round(rate(table.hits, table.probes), 4),
+            "tt_stores": table.stores,
+            "tt_evictions": table.evictions,
+            "iterations": list(self.iteration_stats)
+        }
+    
+    
+    def set_difficulty(self, level):
+        difficulties = {
+            1: {'depth': 2, 'max_time': 1, 'threat_depth': 0},
+            2: {'depth': 3, 'max_time': 2, 'threat_depth': 2},
+            3: {'depth': 4, 'max_time': 3, 'threat_depth': 4},
+            4: {'depth': 5, 'max_time': 5, 'threat_depth': 6},
+            5: {'depth': 6, 'max_time': 8, 'threat_depth': THREAT_SEARCH_DEPTH}
+        }
+        config = difficulties.get(level, difficulties[3])
+        self.depth = config['depth']
+        self.max_time = config['max_time']
+        self.threat_depth = config['threat_depth']
+
+    # Plays on a game clock instead of max_time per move.
+    def set_clock(self, remaining, increment=0.0):
+        self.time_manager.set_clock(remaining, increment)
+
+    def find_best_move(self, game):
+        self.stop_pondering()
+        resume = self.take_ponder_result(game)
+        self.ponder_hit = resume is not None
+        self.nodes_evaluated = 0
+        self.search_cancelled = False
+        self.depth_reached = 0
+        self.best_value = 0
+        self.reset_metrics()
+        self.transposition_table.new_search()
+        self.move_ordering.new_search()
+        self.controller.start(self.time_manager.start_move(game, self.max_time))
+        
+        move = self.choose_move(game, resume)
+        self.last_search_time = self.controller.elapsed()
+        self.time_manager.finish_move(self.last_search_time)
+        if self.listeners:
+            self.listeners.emit(MOVE, dict(self.get_metrics(), move=move))
+        return move
+
+    def choose_move(self, game, resume=None):
+        if self.opening_book is not None:
+            book_move = self.opening_book.lookup(game)
+            if book_move:
+                return book_move
+        
+        immediate_win = self.find_immediate_win(game, self.player_symbol)
+        if immediate_win:
+            return immediate_win
+            
+        immediate_block = self.find_immediate_win(game, self.opponent_symbol)
+        if immediate_block:
+            return immediate_block
+        
+        if self.geometry.cell_count - popcount(game.occupied()) <= self.endgame_threshold:
+            solved_move = self.solve_endgame(game)
+            if solved_move:
+                return solved_move
+        
+        double_threat = self.find_double_threat_move(game)
+        if double_threat:
+            return double_threat
+        
+        search_game = game.copy()
+        forcing_move = self.find_forcing_move(search_game)
+        if forcing_move:
+            return forcing_move
+        
+        if self.position_db is not None:
+            experience_move = self.position_db.best_move(game)
+            if experience_move:
+                return experience_move
+        
+        if self.use_symmetry and game.move_count < SYMMETRY_PLIES:
+            search_game.enable_symmetry_tracking()
+        if self.workers > 1 and self.parallel_mode == "lazy_smp":
+            best_move = self.lazy_smp_search(search_game)
+        else:
+            best_move = self.iterative_deepening_search(search_game, resume)
+        
+        return best_move if best_move else self.get_fallback_move(game)
+
+
+    # resume is (best_move, depth, values_by_depth) from earlier completed
+    # iterations on the same position, e.g. a ponder hit.
+    def iterative_deepening_search(self, game, resume=None):
+        best_move = None
+        # Scores swing with the side that moved last, so each iteration's
+        # window is centred on the last iteration of the same parity.
+        values_by_depth = {}
+        first_depth = 1
+        if resume is not None:
+            best_move, self.depth_reached, values_by_depth = resume
+            values_by_depth = dict(values_by_depth)
+            self.best_value = values_by_depth.get(self.depth_reached, 0)
+            first_depth = self.depth_reached + 1
+        self.completed_iterations = None
+        
+        if self.use_opening_shortcuts:
+            if game.move_count == 0:
+                return random.choice(self.geometry.center_positions)
+            elif game.move_count == 1:
+                return self.get_second_move_response(game)
+        
+        for current_depth in range(first_depth, self.depth + 1):
+            if self.controller.should_stop():
+                self.search_cancelled = True
+                break
+            # Stop early on a stable root, and never start an iteration that
+            # is not expected to finish before the deadline.
+            if not self.time_manager.should_start_iteration(self.controller.elapsed()):
+                break
+                
+            iteration_start = self.controller.elapsed()
+            iteration_nodes = self.nodes_evaluated
+            counters = self.search_counters()
+            try:
+                previous_value = values_by_depth.get(current_depth - 2)
+                if self.workers > 1 and self.parallel_mode == "root":
+                    move, value = self.parallel_root_search(game, current_depth)
+                elif self.use_pvs and previous_value is not None:
+                    move, value = self.aspiration_search(game, current_depth, previous_value)
+                else:
+                    move, value = self.alpha_beta_search(game, current_depth)
+            except SearchCancelled:
+                # A partially searched iteration says nothing reliable about
+                # the root, so only completed depths replace the last answer.
+                self.search_cancelled = True
+                break
+                
+            if not move:
+                break
+            best_move = move
+            values_by_depth[current_depth] = value
+            self.best_value = value
+            self.depth_reached = current_depth
+            self.completed_iterations = (best_move, current_depth, dict(values_by_depth))
+            iteration_time = self.controller.elapsed() - iteration_start
+            self.time_manager.record_iteration(current_depth, move, value, self.nodes_evaluated - iteration_nodes,
+                                               iteration_time)
+            self.record_iteration_stats(game, current_depth, move, value, self.nodes_evaluated - iteration_nodes,
+                                        iteration_time, counters)
+            if value > WIN_SCORE - 1000:
+                break
+                
+        return best_move
+
+    def search_counters(self):
+        table = self.transposition_table
+        ordering = self.move_ordering
+        return (table.probes, table.hits, table.stores, table.evictions, ordering.cutoffs,
+                ordering.first_move_cutoffs, self.evaluations)
+
+    # counters is search_counters() from the start of the iteration. Runs
+    # once per iteration, so it costs nothing per node.
+    def record_iteration_stats(self, game, depth, move, value, nodes, seconds, counters):
+        probes, hits, stores, evictions, cutoffs, first_move_cutoffs, evaluations = (
+            now - before for now, before in zip(self.search_counters(), counters))
+        stats = {
+            "depth": depth,
+            "move": move,
+            "value": value,
+            "nodes": nodes,
+            "time": round(seconds, 4),
+            "ebf": round(effective_branching_factor(nodes, depth), 3),
+            "tt_probes": probes,
+            "tt_hits": hits,
+            "tt_hit_rate": round(rate(hits, probes), 4),
+            "tt_stores": stores,
+            "tt_evictions": evictions,
+            "cutoffs": cutoffs,
+            "first_move_cutoff_rate": round(rate(first_move_cutoffs, cutoffs), 4),
+            "evaluations": evaluations,
+            "pv": self.principal_variation(game, move, depth),
+            "ponder": self.pondering
+        }
+        self.iteration_stats.append(stats)
+        if self.listeners:
+            self.listeners.emit(ITERATION, stats)
+
+    # The root move followed by the transposition table's best moves, as far
+    # as they stay legal. The game is restored before returning.
+    def principal_variation(self, game, move, depth):
+        pv = []
+        try:
+            while move is not None and len(pv) < depth and not game.game_over:
+                game.make_move(*move)
+                game.switch_player()
+                pv.append(move)
+                key, symmetry = self.position_key(game)
+                entry = self.probe_transposition(key, symmetry)
+                move = None
+                if entry and entry[3] != NO_MOVE and not game.occupied() & self.geometry.cell_bits[entry[3]]:
+                    move = self.geometry.cell_coords[entry[3]]
+        finally:
+            for _ in pv:
+                game.undo_move()
+        return pv
+
+    def aspiration_search(self, game, depth, previous_value):
+        alpha = previous_value - ASPIRATION_WINDOW
+        beta = previous_value + ASPIRATION_WINDOW
+        move, value = self.alpha_beta_search(game, depth, alpha, beta)
+        if value <= alpha:
+            move, value = self.alpha_beta_search(game, depth, -math.inf, beta)
+        elif value >= beta:
+            move, value = self.alpha_beta_search(game, depth, alpha, math.inf)
+        return move, value
+
+    # Raises SearchCancelled when the controller stops the search; the game
+    # is left as it was passed in.
+    def alpha_beta_search(self, game, depth, alpha=-math.inf, beta=math.inf):
+        best_value = -math.inf
+        best_move = None
+        alpha_original = alpha
+        
+        key, symmetry = self.position_key(game)
+        moves = self.get_root_moves(game, key, symmetry)
+        
+        for move_number, move in enumerate(moves):
+            child = self.enter_move(game, move)
+            try:
+                if best_move is None or not self.use_pvs:
+                    move_value = self.alpha_beta_minimax(child, depth - 1, alpha, beta, False)
+                else:
+                    move_value = self.alpha_beta_minimax(child, depth - 1, alpha, alpha + 1, False)
+                    if alpha < move_value < beta:
+                        move_value = self.alpha_beta_minimax(child, depth - 1, alpha, beta, False)
+            finally:
+                self.leave_move(game, child)
+            
+            if move_value > best_value:
+                best_value = move_value
+                best_move = move
+                
+            alpha = max(alpha, best_value)
+            if beta <= alpha:
+                self.move_ordering.record_cutoff(game.current_player, game.move_count, move, depth, move_number)
+                break
+                
+        self.store_bounded(key, symmetry, depth, best_value, alpha_original, beta, best_move)
+        return best_move, best_value
+
+    def parallel_root_search(self, game, depth):
+        if self.parallel_search is None:
+            self.parallel_search = ParallelRootSearch(self.workers)
+        key, symmetry = self.position_key(game)
+        moves = self.get_root_moves(game, key, symmetry)
+        
+        move, value, worker_nodes, completed = self.parallel_search.search(self, game, depth, moves)
+        self.nodes_evaluated += worker_nodes
+        self.worker_nodes += worker_nodes
+        if not completed:
+            raise SearchCancelled()
+            
+        self.store_transposition(key, symmetry, depth, EXACT, value, move)
+        return move, value
+
+    def lazy_smp_search(self, game):
+        if self.parallel_search is None:
+            self.parallel_search = LazySMPSearch(self.workers)
+        # Workers report only their final answer, so they get the soft budget.
+        max_time = min(self.controller.remaining(), self.time_manager.soft_time())
+        move, depth, worker_nodes = self.parallel_search.search(self, game, max_time)
+        self.nodes_evaluated += worker_nodes
+        self.worker_nodes += worker_nodes
+        self.depth_reached = depth
+        return move
+
+    def solve_endgame(self, game):
+        if self.endgame_solver is None:
+            self.endgame_solver = EndgameSolver(self.endgame_cache, geometry=self.geometry)
+        result = self.endgame_solver.solve(game, self.controller)
+        self.nodes_evaluated += self.endgame_solver.nodes
+        if result is None:
+            return None
+        self.best_value, move = result
+        self.depth_reached = self.geometry.cell_count - popcount(game.occupied())
+        return move
+
+    def predict_reply(self, game):
+        key, symmetry = self.position_key(game)
+        entry = self.probe_transposition(key, symmetry)
+        if entry and entry[3] != NO_MOVE:
+            move = self.geometry.cell_coords[entry[3]]
+            if move in game.get_possible_moves():
+                return move
+        reply = self.find_immediate_win(game, self.opponent_symbol) or \
+            self.find_immediate_win(game, self.player_symbol)
+        if reply:
+            return reply
+        moves = self.get_ordered_moves(game)
+        return moves[0] if moves else None
+
+    # Called with the game right after our move, the opponent to move.
+    def start_pondering(self, game):
+        self.stop_pondering()
+        if game.game_over:
+            return
+        reply = self.predict_reply(game)
+        if reply is None:
+            return
+        ponder_game = game.copy()
+        ponder_game.make_move(*reply)
+        if ponder_game.game_over:
+            return
+        ponder_game.switch_player()
+        if self.use_symmetry and ponder_game.move_count < SYMMETRY_PLIES:
+            ponder_game.enable_symmetry_tracking()
+        
+        self.ponder_history = [tuple(entry) for entry in ponder_game.move_history]
+        self.ponder_result = None
+        self.pondering = True
+        # Started here rather than in the thread so that an early
+        # stop_pondering() cannot have its cancel cleared.
+        self.controller.start()
+        self.time_manager.clear()
+        self.ponder_thread = threading.Thread(target=self.ponder, args=(ponder_game,), daemon=True)
+        self.ponder_thread.start()
+
+    def ponder(self, game):
+        self.nodes_evaluated = 0
+        self.iteration_stats = []
+        self.search_cancelled = False
+        self.depth_reached = 0
+        self.transposition_table.new_search()
+        self.iterative_deepening_search(game)
+        self.ponder_result = self.completed_iterations
+
+    def stop_pondering(self):
+        if self.ponder_thread is not None:
+            self.controller.cancel()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+        self.pondering = False
+
+    # Stops the running find_best_move, which then returns the move of its
+    # last completed iteration.
+    def cancel_search(self):
+        self.controller.cancel()
+
+    def take_ponder_result(self, game):
+        result, history = self.ponder_result, self.ponder_history
+        self.ponder_result = None
+        self.ponder_history = None
+        if result is None or history != [tuple(entry) for entry in game.move_history]:
+            return None
+        return result
+
+    def get_root_moves(self, game, key, symmetry):
+        entry = self.probe_transposition(key, symmetry)
+        moves = self.get_ordered_moves(game, entry[3] if entry else NO_MOVE)
+        if game.symmetric_hashes is not None:
+            moves = unique_moves(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O], moves, self.geometry)
+        return moves
+
+    def close(self):
+        self.stop_pondering()
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+        if self.endgame_solver is not None:
+            self.endgame_solver.close()
+            self.endgame_solver = None
+
+    def enter_move(self, game, move):
+        child = game.copy() if self.use_copy_search else game
+        child.make_move(*move)
+        child.switch_player()
+        return child
+
+    def leave_move(self, game, child):
+        if child is game:
+            game.undo_move()
+
+    def get_ordered_moves(self, game, tt_move=NO_MOVE):
+        return self.move_ordering.order_moves(game, tt_move)
+
+    def alpha_beta_minimax(self, game, depth, alpha, beta, maximizing_player):
+        self.nodes_evaluated += 1
+        self.controller.poll()
+            
+        if game.game_over:
+            if game.winner == self.player_symbol:
+                return WIN_SCORE + depth * 1000  
+            elif game.winner == self.opponent_symbol:
+                return -WIN_SCORE - depth * 1000  
+            else:
+                return 0
+                
+        if depth == 0:
+            return self.evaluate(game)
+
+            
+        alpha_original = alpha
+        beta_original = beta
+        tt_move = NO_MOVE
+        key, symmetry = self.position_key(game)
+        entry = self.probe_transposition(key, symmetry)
+        if entry:
+            entry_depth, flag, value, tt_move = entry
+            value = _from_stored(value, depth, self.mate_bound)
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value
+            
+        moves = self.get_ordered_moves(game, tt_move)
+        best_move = None
+        
+        if maximizing_player:
+            max_eval = -math.inf
+            for move_number, move in enumerate(moves):
+                child = self.enter_move(game, move)
+                try:
+                    if best_move is None or not self.use_pvs:
+                        eval = self.alpha_beta_minimax(child, depth - 1, alpha, beta, False)
+                    else:
+                        eval = self.alpha_beta_minimax(child, depth - 1, alpha, alpha + 1, False)
+                        if alpha < eval < beta:
+                            eval = self.alpha_beta_minimax(child, depth - 1, alpha, beta, False)
+                finally:
+                    self.leave_move(game, child)
+                if eval > max_eval:
+                    max_eval = eval
+                    best_move = move
+                alpha = max(alpha, eval)
+                
+                if beta <= alpha:
+                    self.move_ordering.record_cutoff(game.current_player, game.move_count, move, depth,
+                                                     move_number)
+                    break
+                    
+            self.store_bounded(key, symmetry, depth, max_eval, alpha_original, beta_original, best_move)
+            return max_eval
+        else:
+            min_eval = math.inf
+            for move_number, move in enumerate(moves):
+                child = self.enter_move(game, move)
+                try:
+                    if best_move is None or not self.use_pvs:
+                        eval = self.alpha_beta_minimax(child, depth - 1, alpha, beta, True)
+                    else:
+                        eval = self.alpha_beta_minimax(child, depth - 1, beta - 1, beta, True)
+                        if alpha < eval < beta:
+                            eval = self.alpha_beta_minimax(child, depth - 1, alpha, beta, True)
+                finally:
+                    self.leave_move(game, child)
+                if eval < min_eval:
+                    min_eval = eval
+                    best_move = move
+                beta = min(beta, eval)
+                
+                if beta <= alpha:
+                    self.move_ordering.record_cutoff(game.current_player, game.move_count, move, depth,
+                                                     move_number)
+                    break
+                    
+            self.store_bounded(key, symmetry, depth, min_eval, alpha_original, beta_original, best_move)
+            return min_eval
+        
+
+    def evaluate(self, game):
+        self.evaluations += 1
+        if self.heuristic_type == 1:
+            return self.quick_evaluate(game)
+        return self.comprehensive_evaluate(game)
+
+    def comprehensive_evaluate(self, game):
+        if game.game_over:
+            if game.winner == self.player_symbol:
+                return WIN_SCORE
+            elif game.winner == self.opponent_symbol:
+                return -WIN_SCORE
+            return 0
+            
+        player = self.player_symbol
+        opponent = self.opponent_symbol
+        score = 0
+        
+        score += game.line_score(player)
+        score -= game.line_score(opponent) * 1.1  
+        
+        score += game.center_counts[player] * CENTER_BONUS
+        score -= game.center_counts[opponent] * CENTER_BONUS
+        
+        score += game.corner_counts[player] * CORNER_BONUS
+        score -= game.corner_counts[opponent] * CORNER_BONUS
+        
+        score += game.threat_cells[player].bit_count() * DOUBLE_THREAT_BONUS
+        score -= game.threat_cells[opponent].bit_count() * DOUBLE_THREAT_BONUS
+        
+        mobility = self.geometry.cell_count - popcount(game.occupied())
+        if game.current_player == player:
+            score += mobility * MOBILITY_BONUS
+        else:
+            score -= mobility * MOBILITY_BONUS
+            
+        return int(score)
+
+    def find_immediate_win(self, game, player):
+        for move in game.get_possible_moves():
+            if game.is_winning_move(*move, player):
+                return move
+        return None
+
+    def find_double_threat_move(self, game):
+        own_bits = game.bitboards[self.player_symbol]
+        opponent_bits = game.bitboards[self.opponent_symbol]
+        occupied = own_bits | opponent_bits
+        geometry = self.geometry
+        
+        for move in game.get_possible_moves():
+            index = geometry.cell_of[move]
+            bit = geometry.cell_bits[index]
+            threat_cells = 0
+            for mask in geometry.cell_line_masks[index]:
+                if opponent_bits & mask:
+                    continue
+                if popcount(own_bits & mask) == geometry.length - 2:
+                    threat_cells |= mask & ~occupied & ~bit
+                    
+            if popcount(threat_cells) >= 2:
+                return move
+        return None
+
+    def find_forcing_move(self, game):
+        if not self.threat_depth:
+            return None
+        threat_search = ThreatSpaceSearch(self.threat_depth)
+        
+        sequence = threat_search.find_forced_win(game, self.player_symbol)
+        if not sequence:
+            defence = threat_search.find_defensive_move(game, self.opponent_symbol, self.player_symbol)
+        self.nodes_evaluated += threat_search.total_nodes
+        return sequence[0] if sequence else defence
+
+    def get_second_move_response(self, game):
+        if game.bitboards[self.opponent_symbol] & self.geometry.center_mask:
+            return random.choice(self.geometry.corner_positions)
+        
+        return random.choice(self.geometry.center_positions)
+
+    def get_fallback_move(self, game):
+        moves = game.get_possible_moves()
+        if not moves:
+            return None
+            
+        best_score = -math.inf
+        best_move = moves[0]
+        
+        for move in moves[:8]: 
+            game.place_piece(*move, self.player_symbol)
+            score = self.quick_evaluate(game)
+            game.remove_piece(*move)
+            
+            if score > best_score:
+                best_score = score
+                best_move = move
+                
+        return best_move
+
+    def quick_evaluate(self, game):
+        own = game.bitboards[self.player_symbol]
+        opponent = game.bitboards[self.opponent_symbol]
+        center_mask = self.geometry.center_mask
+        corner_mask = self.geometry.corner_mask
+        score = 20 * popcount(own & center_mask) - 25 * popcount(opponent & center_mask)
+        score += 10 * popcount(own & corner_mask) - 12 * popcount(opponent & corner_mask)
+        return score
+
+    def position_key(self, game):
+        if game.symmetric_hashes is None:
+            return game.hash, 0
+        return game.canonical_hash()
+
+    def probe_transposition(self, key, symmetry):
+        entry = self.transposition_table.probe(key)
+        if entry and symmetry and entry[3] != NO_MOVE:
+            entry = entry[:3] + (self.geometry.inverse_symmetries[symmetry][entry[3]],)
+        return entry
+
+    def store_bounded(self, key, symmetry, depth, value, alpha, beta, move):
+        if move is None:
+            return
+        if value <= alpha:
+            flag = UPPER_BOUND
+        elif value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.store_transposition(key, symmetry, depth, flag, value, move)
+
+    def store_transposition(self, key, symmetry, depth, flag, value, move=None):
+        if not move:
+            move_index = NO_MOVE
+        elif symmetry:
+            move_index = self.geometry.symmetries[symmetry][self.geometry.cell_of[move]]
+        else:
+            move_index = self.geometry.cell_of[move]
+        value = _to_stored(value, depth, self.mate_bound)
+        self.transposition_table.store(key, depth, flag, value, move_index)
+
+
+
+
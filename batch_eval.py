@@ -0,0 +1,109 @@
+import numpy as np
+from constants import *
+from bitboard import *
+
+# Boards are (N, 64) int8 arrays indexed like the bitboards (x*16 + y*4 + z),
+# holding 1 for X, -1 for O and 0 for an empty cell.
+X_STONE = 1
+O_STONE = -1
+STONES = {PLAYER_X: X_STONE, PLAYER_O: O_STONE}
+
+# LINE_INCIDENCE[cell, line] is 1 when the cell lies on the line.
+LINE_INCIDENCE = np.zeros((CELL_COUNT, len(LINE_CELLS)), dtype=np.int32)
+for _line, _cells in enumerate(LINE_CELLS):
+    LINE_INCIDENCE[list(_cells), _line] = 1
+
+CENTER_CELLS = np.array([bool(CELL_BITS[index] & CENTER_MASK) for index in range(CELL_COUNT)])
+CORNER_CELLS = np.array([bool(CELL_BITS[index] & CORNER_MASK) for index in range(CELL_COUNT)])
+LINE_SCORE_TABLE = np.array(LINE_SCORES, dtype=np.int64)
+
+
+def encode_games(games):
+    boards = np.zeros((len(games), CELL_COUNT), dtype=np.int8)
+    current_players = np.zeros(len(games), dtype=np.int8)
+    for row, game in enumerate(games):
+        for player, stone in STONES.items():
+            for index in iter_bits(game.bitboards[player]):
+                boards[row, index] = stone
+        current_players[row] = STONES[game.current_player]
+    return boards, current_players
+
+
+def default_current_players(boards):
+    # X moves first, so X is on move whenever the stone counts are equal.
+    x_stones = np.count_nonzero(boards == X_STONE, axis=1)
+    o_stones = np.count_nonzero(boards == O_STONE, axis=1)
+    return np.where(x_stones == o_stones, X_STONE, O_STONE).astype(np.int8)
+
+
+# Per-line stone counts for both players from one (2N, 64) x (64, 76)
+# matmul. Returns (x_counts, o_counts), each (N, 76).
+def line_counts(boards):
+    boards = np.asarray(boards)
+    stones = np.concatenate((boards == X_STONE, boards == O_STONE)).astype(np.int32)
+    counts = stones @ LINE_INCIDENCE
+    return counts[:len(boards)], counts[len(boards):]
+
+
+# Unblocked lines by own stone count, like CubicGame.open_lines.
+def open_line_histogram(own_counts, opponent_counts):
+    open_counts = np.where(opponent_counts == 0, own_counts, -1)
+    return np.stack([np.count_nonzero(open_counts == k, axis=1) for k in range(WINNING_LENGTH + 1)], axis=1)
+
+
+def line_scores(own_counts, opponent_counts):
+    return np.where(opponent_counts == 0, LINE_SCORE_TABLE[own_counts], 0).sum(axis=1)
+
+
+# (N, 64) bool: empty cells that complete an unblocked line, like
+# CubicGame.threat_cells. Two or more of them is a double threat.
+def winning_cells(boards, own_counts, opponent_counts):
+    threat_lines = ((own_counts == WINNING_LENGTH - 1) & (opponent_counts == 0)).astype(np.int32)
+    return ((threat_lines @ LINE_INCIDENCE.T) > 0) & (np.asarray(boards) == 0)
+
+
+def double_threats(boards, own_counts, opponent_counts):
+    return np.count_nonzero(winning_cells(boards, own_counts, opponent_counts), axis=1) >= 2
+
+
+# Scores every board exactly as AdvancedAIPlayer.comprehensive_evaluate
+# would for `player`. A board is terminal when a line is full or no cell
+# is empty, which is when CubicGame sets game_over.
+def batch_evaluate(boards, player=PLAYER_X, current_players=None):
+    boards = np.asarray(boards, dtype=np.int8)
+    if current_players is None:
+        current_players = default_current_players(boards)
+    x_counts, o_counts = line_counts(boards)
+    if player == PLAYER_X:
+        own_counts, opponent_counts = x_counts, o_counts
+    else:
+        own_counts, opponent_counts = o_counts, x_counts
+    own_stone = STONES[player]
+    own_stones = boards == own_stone
+    opponent_stones = boards == -own_stone
+
+    # Float operations run in the scalar evaluator's order so the
+    # truncated results match bit for bit.
+    score = line_scores(own_counts, opponent_counts).astype(np.float64)
+    score = score - line_scores(opponent_counts, own_counts) * 1.1
+    score = score + np.count_nonzero(own_stones & CENTER_CELLS, axis=1) * CENTER_BONUS
+    score = score - np.count_nonzero(opponent_stones & CENTER_CELLS, axis=1) * CENTER_BONUS
+    score = score + np.count_nonzero(own_stones & CORNER_CELLS, axis=1) * CORNER_BONUS
+    score = score - np.count_nonzero(opponent_stones & CORNER_CELLS, axis=1) * CORNER_BONUS
+    score = score + np.count_nonzero(winning_cells(boards, own_counts, opponent_counts), axis=1) * DOUBLE_THREAT_BONUS
+    score = score - np.count_nonzero(winning_cells(boards, opponent_counts, own_counts), axis=1) * DOUBLE_THREAT_BONUS
+    mobility = np.count_nonzero(boards == 0, axis=1)
+    score = np.where(current_players == own_stone, score + mobility * MOBILITY_BONUS,
+                     score - mobility * MOBILITY_BONUS)
+    values = np.trunc(score).astype(np.int64)
+
+    own_wins = (own_counts == WINNING_LENGTH).any(axis=1)
+    opponent_wins = (opponent_counts == WINNING_LENGTH).any(axis=1)
+    values = np.where(mobility == 0, 0, values)
+    values = np.where(opponent_wins, -WIN_SCORE, values)
+    return np.where(own_wins, WIN_SCORE, values)
+
+
+def evaluate_games(games, player=PLAYER_X):
+    boards, current_players = encode_games(games)
+    return batch_evaluate(boards, player, current_players)
@@ -0,0 +1,56 @@
+from constants import *
+from geometry import Geometry, DEFAULT_GEOMETRY, get_geometry
+
+# Tables of the default 4x4x4 cube as module constants. Code that also
+# handles other board shapes reads them from game.geometry instead.
+_cube = DEFAULT_GEOMETRY
+
+CELL_COUNT = _cube.cell_count
+FULL_MASK = _cube.full_mask
+
+CELL_COORDS = _cube.cell_coords
+CELL_BITS = _cube.cell_bits
+
+
+def cell_index(x, y, z):
+    return (x * BOARD_SIZE + y) * BOARD_SIZE + z
+
+
+def popcount(bits):
+    return bits.bit_count()
+
+
+def iter_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def cell_weight(x, y, z):
+    return _cube.cell_weights[cell_index(x, y, z)]
+
+
+# Static move order used by get_possible_moves: heaviest cells first, ties
+# kept in x, y, z order (the order the old per-call sort produced).
+MOVE_ORDER = _cube.move_order
+MOVE_ORDER_BITS = _cube.move_order_bits
+
+CENTER_MASK = _cube.center_mask
+CORNER_MASK = _cube.corner_mask
+
+# The 76 winning lines of the cube, as coordinate tuples, cell indices and
+# bit masks, plus the lines passing through every cell.
+WINNING_LINES = _cube.lines
+LINE_CELLS = _cube.line_cells
+LINE_MASKS = _cube.line_masks
+CELL_LINES = _cube.cell_lines
+CELL_LINE_MASKS = _cube.cell_line_masks
+
+# Zobrist keys: one per (player, cell) plus one for "O to move".
+ZOBRIST_KEYS = _cube.zobrist_keys
+ZOBRIST_SIDE = _cube.zobrist_side
+
+
+def zobrist_hash(x_bits, o_bits, current_player):
+    return _cube.zobrist_hash(x_bits, o_bits, current_player)
@@ -1,43 +1,71 @@
-BOARD_SIZE = 4
-WINNING_LENGTH = 4
-
-PLAYER_X = "X"
-PLAYER_O = "O"
-EMPTY = None
-
-AI_DEPTH = 5
-MAX_SEARCH_TIME = 3
-MAX_CACHE_SIZE = 100000
-
-WIN_SCORE = 1000000
-THREE_IN_LINE = 10000
-TWO_IN_LINE = 200
-BLOCK_OPPONENT_WIN = 50000
-CENTER_BONUS = 100
-MOBILITY_BONUS = 10
-DOUBLE_THREAT_BONUS = 3000
-CORNER_BONUS = 30
-
-DIRECTIONS = []
-for dx in (-1, 0, 1):
-    for dy in (-1, 0, 1):
-        for dz in (-1, 0, 1):
-            if (dx, dy, dz) != (0, 0, 0):
-                DIRECTIONS.append((dx, dy, dz))
-
-CENTER_POSITIONS = [
-    (1, 1, 1), (1, 1, 2), (1, 2, 1), (1, 2, 2),
-    (2, 1, 1), (2, 1, 2), (2, 2, 1), (2, 2, 2)
-]
-
-POSITION_WEIGHTS = [
-    [4, 3, 3, 4],
-    [3, 2, 2, 3],
-    [3, 2, 2, 3],
-    [4, 3, 3, 4]
-]
-
-CORNER_POSITIONS = [
-    (0, 0, 0), (0, 0, 3), (0, 3, 0), (0, 3, 3),
-    (3, 0, 0), (3, 0, 3), (3, 3, 0), (3, 3, 3)
-]
+BOARD_SIZE = 4
+WINNING_LENGTH = 4
+
+PLAYER_X = "X"
+PLAYER_O = "O"
+EMPTY = None
+
+AI_DEPTH = 5
+MAX_SEARCH_TIME = 3
+MAX_CACHE_SIZE = 100000
+# Slots in the transposition table shared by Lazy SMP workers (16 bytes each).
+SHARED_TABLE_SIZE = 1 << 20
+# Searches rooted before this many moves hash positions up to symmetry.
+SYMMETRY_PLIES = 8
+# Half-width of the window that opens each iterative-deepening iteration.
+ASPIRATION_WINDOW = 500
+# Threat-space search: attacker moves per forcing line and nodes per call.
+THREAT_SEARCH_DEPTH = 8
+THREAT_SEARCH_NODES = 20000
+# Opening book loaded by the UI when the file exists (see opening_book.py).
+OPENING_BOOK_PATH = "opening_book.bin"
+# Positions with at most this many empty cells are solved exactly.
+ENDGAME_EMPTY_CELLS = 12
+ENDGAME_NODE_LIMIT = 500000
+ENDGAME_CACHE_PATH = "endgame_cache.sqlite"
+# The UI saves games as game records (see game_record.py).
+SAVE_GAME_PATH = "cubic_game_save.qgr"
+LEGACY_SAVE_GAME_PATH = "cubic_game_save.pkl"
+# A position database move is only played after this many games with it.
+POSITION_DB_MIN_GAMES = 20
+# ...and only when it scores at least this much, counting a win as 1 and
+# a draw as 1/2; weaker moves are left to the search.
+POSITION_DB_MIN_SCORE = 0.6
+# Searches read the clock and the cancel flag once every this many nodes.
+SEARCH_POLL_NODES = 256
+
+WIN_SCORE = 1000000
+THREE_IN_LINE = 10000
+TWO_IN_LINE = 200
+BLOCK_OPPONENT_WIN = 50000
+CENTER_BONUS = 100
+MOBILITY_BONUS = 10
+DOUBLE_THREAT_BONUS = 3000
+CORNER_BONUS = 30
+
+# Score of an unblocked line indexed by how many of its cells a player holds.
+LINE_SCORES = [0, TWO_IN_LINE // 2, TWO_IN_LINE, THREE_IN_LINE, WIN_SCORE]
+
+DIRECTIONS = []
+for dx in (-1, 0, 1):
+    for dy in (-1, 0, 1):
+        for dz in (-1, 0, 1):
+            if (dx, dy, dz) != (0, 0, 0):
+                DIRECTIONS.append((dx, dy, dz))
+
+CENTER_POSITIONS = [
+    (1, 1, 1), (1, 1, 2), (1, 2, 1), (1, 2, 2),
+    (2, 1, 1), (2, 1, 2), (2, 2, 1), (2, 2, 2)
+]
+
+POSITION_WEIGHTS = [
+    [4, 3, 3, 4],
+    [3, 2, 2, 3],
+    [3, 2, 2, 3],
+    [4, 3, 3, 4]
+]
+
+CORNER_POSITIONS = [
+    (0, 0, 0), (0, 0, 3), (0, 3, 0), (0, 3, 3),
+    (3, 0, 0), (3, 0, 3), (3, 3, 0), (3, 3, 3)
+]
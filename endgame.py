@@ -0,0 +1,216 @@
+import sqlite3
+from bitboard import *
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND, NO_MOVE
+from search_control import SearchCancelled
+from constants import *
+
+# Solved values are seen from the side to move: MATE_SCORE - n is a win in
+# n plies, -(MATE_SCORE - n) a loss in n plies and 0 a draw. Inside a search
+# n counts from the root; stored values count from the stored position.
+MATE_SCORE = WIN_SCORE
+PERSIST_MIN_EMPTY = 4
+
+
+def _signed(bits):
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+
+def _to_stored(value, ply):
+    if value > 0:
+        return value + ply
+    if value < 0:
+        return value - ply
+    return value
+
+
+def _from_stored(value, ply):
+    if value > 0:
+        return value - ply
+    if value < 0:
+        return value + ply
+    return value
+
+
+class EndgameSolver:
+    # The sqlite cache keys positions by the board shape and 64-bit
+    # bitboards, so it is only used on boards of at most 64 cells.
+    def __init__(self, cache_path=None, node_limit=ENDGAME_NODE_LIMIT, geometry=DEFAULT_GEOMETRY):
+        self.geometry = geometry
+        if geometry.cell_count > 64:
+            cache_path = None
+        self.cache_path = cache_path
+        self.node_limit = node_limit
+        self.table = {}
+        self.nodes = 0
+        self.controller = None
+        self.pending = []
+        self.connection = None
+        if cache_path:
+            # The UI searches from a worker thread, one search at a time.
+            self.connection = sqlite3.connect(cache_path, timeout=30, check_same_thread=False)
+            # Rows of the old solved table carry no board shape, so they
+            # cannot be told apart and are dropped.
+            self.connection.execute("DROP TABLE IF EXISTS solved")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                "size INTEGER, length INTEGER, dims INTEGER, "
+                "x_bits INTEGER, o_bits INTEGER, o_to_move INTEGER, value INTEGER, move INTEGER, "
+                "PRIMARY KEY (size, length, dims, x_bits, o_bits, o_to_move)) WITHOUT ROWID"
+            )
+            self.connection.commit()
+
+    def close(self):
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    # Returns (value, move) for the side to move, or None when the node
+    # limit runs out or the controller stops the solve first.
+    def solve(self, game, controller=None):
+        player = game.current_player
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        stored = self.load(game, player)
+        if stored is not None:
+            return stored
+
+        if len(self.table) > MAX_CACHE_SIZE * 10:
+            self.table = {}
+        self.nodes = 0
+        self.controller = controller
+        search_game = game.copy()
+        search_game.symmetric_hashes = None
+        try:
+            value = self.negamax(search_game, player, opponent, -MATE_SCORE, MATE_SCORE, 0)
+        except (TimeoutError, SearchCancelled):
+            self.pending = []
+            return None
+        entry = self.table.get(self.position_key(search_game, 0))
+        self.flush()
+        if entry is None:
+            return value, None
+        move = entry[2]
+        return value, self.geometry.cell_coords[move] if move != NO_MOVE else None
+
+    def position_key(self, game, ply):
+        return game.hash ^ self.geometry.zobrist_side if ply & 1 else game.hash
+
+    def negamax(self, game, player, opponent, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise TimeoutError()
+        if self.controller is not None:
+            self.controller.poll()
+
+        own_threats = game.threat_cells[player]
+        if own_threats:
+            index = (own_threats & -own_threats).bit_length() - 1
+            self.store(game, player, ply, EXACT, MATE_SCORE - ply - 1, index)
+            return MATE_SCORE - ply - 1
+        empty = ~(game.bitboards[PLAYER_X] | game.bitboards[PLAYER_O]) & self.geometry.full_mask
+        if not empty:
+            return 0
+        opponent_threats = game.threat_cells[opponent]
+        if popcount(opponent_threats) > 1:
+            # One block leaves the other winning cell.
+            index = (opponent_threats & -opponent_threats).bit_length() - 1
+            self.store(game, player, ply, EXACT, -(MATE_SCORE - ply - 2), index)
+            return -(MATE_SCORE - ply - 2)
+
+        key = self.position_key(game, ply)
+        tt_move = NO_MOVE
+        entry = self.table.get(key)
+        if entry is not None:
+            flag, stored, tt_move = entry
+            value = _from_stored(stored, ply)
+            if flag == EXACT:
+                return value
+            if flag == LOWER_BOUND and value >= beta:
+                return value
+            if flag == UPPER_BOUND and value <= alpha:
+                return value
+
+        # Nothing can beat a win on the next move of this side.
+        if beta > MATE_SCORE - ply - 3:
+            beta = MATE_SCORE - ply - 3
+            if alpha >= beta:
+                return beta
+
+        candidates = opponent_threats if opponent_threats else empty
+        moves = self.order_moves(game, player, candidates)
+        if tt_move != NO_MOVE and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        alpha_original = alpha
+        best_value = -MATE_SCORE
+        best_move = NO_MOVE
+        for index in moves:
+            game.place_index(index, player)
+            value = -self.negamax(game, opponent, player, -beta, -alpha, ply + 1)
+            game.remove_index(index)
+            if value > best_value:
+                best_value = value
+                best_move = index
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best_value <= alpha_original:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.store(game, player, ply, flag, best_value, best_move)
+        return best_value
+
+    # Moves that open a winning cell come first, then the usual cell order.
+    def order_moves(self, game, player, candidates):
+        forcing = []
+        quiet = []
+        own_counts = game.line_counts[player]
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        opponent_counts = game.line_counts[opponent]
+        two_short = self.geometry.length - 2
+        cell_lines = self.geometry.cell_lines
+        for bit, coords in self.geometry.move_order_bits:
+            if not candidates & bit:
+                continue
+            index = bit.bit_length() - 1
+            if any(own_counts[line] == two_short and opponent_counts[line] == 0
+                   for line in cell_lines[index]):
+                forcing.append(index)
+            else:
+                quiet.append(index)
+        return forcing + quiet
+
+    def store(self, game, player, ply, flag, value, move):
+        self.table[self.position_key(game, ply)] = (flag, _to_stored(value, ply), move)
+        if flag == EXACT and self.connection is not None:
+            empty = self.geometry.cell_count - popcount(game.bitboards[PLAYER_X] | game.bitboards[PLAYER_O])
+            if empty >= PERSIST_MIN_EMPTY or ply == 0:
+                self.pending.append(self.geometry.key + (
+                    _signed(game.bitboards[PLAYER_X]), _signed(game.bitboards[PLAYER_O]),
+                    int(player == PLAYER_O), _to_stored(value, ply), move))
+
+    def load(self, game, player):
+        if self.connection is None:
+            return None
+        row = self.connection.execute(
+            "SELECT value, move FROM solutions WHERE size = ? AND length = ? AND dims = ? "
+            "AND x_bits = ? AND o_bits = ? AND o_to_move = ?",
+            self.geometry.key + (_signed(game.bitboards[PLAYER_X]), _signed(game.bitboards[PLAYER_O]),
+                                 int(player == PLAYER_O))
+        ).fetchone()
+        if row is None:
+            return None
+        value, move = row
+        return value, self.geometry.cell_coords[move] if move != NO_MOVE else None
+
+    def flush(self):
+        if self.connection is None or not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
@@ -1,181 +1,384 @@
-from constants import *
-import threading
-import pickle
-import os
-
-class CubicGame:
-    def __init__(self):
-        self.lock = threading.Lock()
-        self.reset_game()
-        self.move_history = []
-
-    def reset_game(self):
-        with self.lock:
-            self.board = [[[EMPTY for _ in range(BOARD_SIZE)] 
-                          for _ in range(BOARD_SIZE)] 
-                          for _ in range(BOARD_SIZE)]
-            self.current_player = PLAYER_X
-            self.game_over = False
-            self.winner = None
-            self.winning_line = None
-            self.move_count = 0
-            self.move_history = []
-
-    def make_move(self, x, y, z):
-        with self.lock:
-            if self.board[x][y][z] is not EMPTY or self.game_over:
-                return False
-                
-            self.board[x][y][z] = self.current_player
-            self.move_history.append((x, y, z, self.current_player))
-            self.move_count += 1
-            
-            if self.check_win_optimized(x, y, z, self.current_player):
-                self.game_over = True
-                self.winner = self.current_player
-                self.winning_line = self.get_winning_line_optimized(x, y, z, self.current_player)
-            elif self.is_full():
-                self.game_over = True
-                self.winner = None
-                
-            return True
-
-    def check_win_optimized(self, x, y, z, player):
-        for dx, dy, dz in DIRECTIONS:
-            count = 1  
-            
-            for i in range(1, WINNING_LENGTH):
-                nx, ny, nz = x + i*dx, y + i*dy, z + i*dz
-                if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                    break
-                if self.board[nx][ny][nz] != player:
-                    break
-                count += 1
-                
-            for i in range(1, WINNING_LENGTH):
-                nx, ny, nz = x - i*dx, y - i*dy, z - i*dz
-                if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                    break
-                if self.board[nx][ny][nz] != player:
-                    break
-                count += 1
-                
-            if count >= WINNING_LENGTH:
-                return True
-                
-        return False
-
-    def get_winning_line_optimized(self, x, y, z, player):
-        for dx, dy, dz in DIRECTIONS:
-            line = [(x, y, z)]
-            
-            for i in range(1, WINNING_LENGTH):
-                nx, ny, nz = x + i*dx, y + i*dy, z + i*dz
-                if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                    break
-                if self.board[nx][ny][nz] != player:
-                    break
-                line.append((nx, ny, nz))
-                
-            for i in range(1, WINNING_LENGTH):
-                nx, ny, nz = x - i*dx, y - i*dy, z - i*dz
-                if not (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE):
-                    break
-                if self.board[nx][ny][nz] != player:
-                    break
-                line.insert(0, (nx, ny, nz))
-                
-            if len(line) >= WINNING_LENGTH:
-                return line[:WINNING_LENGTH]
-                
-        return None
-
-    def undo_move(self):
-        with self.lock:
-            if not self.move_history:
-                return False
-                
-            x, y, z, player = self.move_history.pop()
-            self.board[x][y][z] = EMPTY
-            self.move_count -= 1
-            self.game_over = False
-            self.winner = None
-            self.winning_line = None
-            self.current_player = player  
-            return True
-
-    def switch_player(self):
-        with self.lock:
-            self.current_player = PLAYER_O if self.current_player == PLAYER_X else PLAYER_X
-
-    def is_full(self):
-        return self.move_count == BOARD_SIZE ** 3
-
-    def get_possible_moves(self):
-        moves = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                for z in range(BOARD_SIZE):
-                    if self.board[x][y][z] is EMPTY:
-                        weight = (POSITION_WEIGHTS[x][y] + 
-                                 POSITION_WEIGHTS[z][x] + 
-                                 POSITION_WEIGHTS[y][z])
-                        
-                        if (x, y, z) in CENTER_POSITIONS:
-                            weight += 2
-                            
-                        if (x, y, z) in CORNER_POSITIONS:
-                            weight += 1
-                            
-                        moves.append((weight, (x, y, z)))
-        
-        moves.sort(reverse=True, key=lambda x: x[0])
-        return [move for _, move in moves]
-
-    def copy(self):
-        new_game = CubicGame()
-        new_game.board = [[[self.board[x][y][z] for z in range(BOARD_SIZE)] 
-                         for y in range(BOARD_SIZE)] 
-                         for x in range(BOARD_SIZE)]
-        new_game.current_player = self.current_player
-        new_game.game_over = self.game_over
-        new_game.winner = self.winner
-        new_game.winning_line = self.winning_line.copy() if self.winning_line else None
-        new_game.move_count = self.move_count
-        new_game.move_history = self.move_history.copy()
-        return new_game
-
-    def save_game(self, filename):
-        with open(filename, 'wb') as f:
-            pickle.dump({
-                'board': self.board,
-                'current_player': self.current_player,
-                'move_history': self.move_history
-            }, f)
-
-    def load_game(self, filename):
-        if os.path.exists(filename):
-            with open(filename, 'rb') as f:
-                data = pickle.load(f)
-                self.board = data['board']
-                self.current_player = data['current_player']
-                self.move_history = data['move_history']
-                self.move_count = len(self.move_history)
-                self.game_over = False
-                self.winner = None
-                self.winning_line = None
-
-    def get_game_state(self):
-        state_parts = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                for z in range(BOARD_SIZE):
-                    cell = self.board[x][y][z]
-                    if cell == PLAYER_X:
-                        state_parts.append('X')
-                    elif cell == PLAYER_O:
-                        state_parts.append('O')
-                    else:
-                        state_parts.append('.')
-        state_parts.append(self.current_player)
-        return ''.join(state_parts)
+from constants import *
+from bitboard import *
+from symmetry import symmetric_hashes, canonical_from_hashes
+import threading
+import os
+
+class CubicGame:
+    # geometry defaults to the 4x4x4 cube; see geometry.get_geometry.
+    def __init__(self, geometry=None):
+        self.lock = threading.Lock()
+        self.geometry = geometry or DEFAULT_GEOMETRY
+        self.reset_game()
+        self.move_history = []
+
+    def reset_game(self):
+        with self.lock:
+            self.bitboards = {PLAYER_X: 0, PLAYER_O: 0}
+            self.reset_line_state()
+            self.hash = 0
+            self.symmetric_hashes = None
+            self.current_player = PLAYER_X
+            self.game_over = False
+            self.winner = None
+            self.winning_line = None
+            self.move_count = 0
+            self.move_history = []
+
+    # Nested lists indexed by coordinates (board[x][y][z] on the cube). Built
+    # from the bitboards when read, so moves do not have to maintain it.
+    # Every read builds a new copy: read it once per pass, and change the
+    # position with make_move / undo_move, since writes to the copy are lost.
+    @property
+    def board(self):
+        return self.geometry.board_from_bits(self.bitboards[PLAYER_X], self.bitboards[PLAYER_O])
+
+    # Coordinates are one per axis of the geometry: make_move(x, y, z) on
+    # the cube.
+    def make_move(self, *coords):
+        with self.lock:
+            geometry = self.geometry
+            index = geometry.cell_of[coords]
+            bit = geometry.cell_bits[index]
+            if (self.bitboards[PLAYER_X] | self.bitboards[PLAYER_O]) & bit or self.game_over:
+                return False
+                
+            self.bitboards[self.current_player] |= bit
+            self.add_to_lines(index, self.current_player)
+            self.hash ^= geometry.zobrist_keys[self.current_player][index]
+            if self.symmetric_hashes is not None:
+                self.update_symmetric_hashes(index, self.current_player)
+            self.move_history.append(coords + (self.current_player,))
+            self.move_count += 1
+            
+            if self.completes_line(index, self.current_player):
+                self.game_over = True
+                self.winner = self.current_player
+                self.winning_line = self.get_winning_line_optimized(*coords, self.current_player)
+            elif self.is_full():
+                self.game_over = True
+                self.winner = None
+                
+            return True
+
+    # The *coords, player methods below take the player after the
+    # coordinates: check_win_optimized(x, y, z, player) on the cube.
+    def check_win_optimized(self, *coords_and_player):
+        *coords, player = coords_and_player
+        return self.completes_line(self.geometry.cell_of[tuple(coords)], player)
+
+    def completes_line(self, index, player):
+        bits = self.bitboards[player]
+        for mask in self.geometry.cell_line_masks[index]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def get_winning_line_optimized(self, *coords_and_player):
+        *coords, player = coords_and_player
+        bits = self.bitboards[player]
+        geometry = self.geometry
+        for line in geometry.cell_lines[geometry.cell_of[tuple(coords)]]:
+            mask = geometry.line_masks[line]
+            if bits & mask == mask:
+                return list(geometry.lines[line])
+        return None
+
+    def is_winning_move(self, *coords_and_player):
+        *coords, player = coords_and_player
+        index = self.geometry.cell_of[tuple(coords)]
+        bits = self.bitboards[player] | self.geometry.cell_bits[index]
+        for mask in self.geometry.cell_line_masks[index]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def undo_move(self):
+        with self.lock:
+            if not self.move_history:
+                return False
+                
+            entry = self.move_history.pop()
+            player = entry[-1]
+            geometry = self.geometry
+            index = geometry.cell_of[entry[:-1]]
+            self.bitboards[player] &= ~geometry.cell_bits[index]
+            self.remove_from_lines(index, player)
+            self.hash ^= geometry.zobrist_keys[player][index]
+            if self.symmetric_hashes is not None:
+                self.update_symmetric_hashes(index, player)
+            if self.current_player != player:
+                self.hash ^= geometry.zobrist_side
+            self.move_count -= 1
+            self.game_over = False
+            self.winner = None
+            self.winning_line = None
+            self.current_player = player  
+            return True
+
+    @classmethod
+    def from_history(cls, move_history, current_player=None, geometry=None):
+        game = cls(geometry)
+        game.replay(move_history, current_player)
+        return game
+
+    def replay(self, move_history, current_player=None):
+        for *coords, player in move_history:
+            if self.current_player != player:
+                self.switch_player()
+            self.make_move(*coords)
+            self.switch_player()
+        if current_player is not None and self.current_player != current_player:
+            self.switch_player()
+
+    def switch_player(self):
+        with self.lock:
+            self.current_player = PLAYER_O if self.current_player == PLAYER_X else PLAYER_X
+            self.hash ^= self.geometry.zobrist_side
+
+    def is_full(self):
+        return (self.bitboards[PLAYER_X] | self.bitboards[PLAYER_O]) == self.geometry.full_mask
+
+    def occupied(self):
+        return self.bitboards[PLAYER_X] | self.bitboards[PLAYER_O]
+
+    def get_possible_moves(self):
+        occupied = self.bitboards[PLAYER_X] | self.bitboards[PLAYER_O]
+        return [move for bit, move in self.geometry.move_order_bits if not occupied & bit]
+
+    # place_piece(x, y, z, player) on the cube.
+    def place_piece(self, *coords_and_player):
+        *coords, player = coords_and_player
+        self.place_index(self.geometry.cell_of[tuple(coords)], player)
+
+    def remove_piece(self, *coords):
+        self.remove_index(self.geometry.cell_of[coords])
+
+    # Cell-index versions for searches that already work with indices.
+    def place_index(self, index, player):
+        self.bitboards[player] |= self.geometry.cell_bits[index]
+        self.add_to_lines(index, player)
+        self.hash ^= self.geometry.zobrist_keys[player][index]
+        if self.symmetric_hashes is not None:
+            self.update_symmetric_hashes(index, player)
+
+    def remove_index(self, index):
+        bit = self.geometry.cell_bits[index]
+        for player in (PLAYER_X, PLAYER_O):
+            if self.bitboards[player] & bit:
+                self.bitboards[player] &= ~bit
+                self.remove_from_lines(index, player)
+                self.hash ^= self.geometry.zobrist_keys[player][index]
+                if self.symmetric_hashes is not None:
+                    self.update_symmetric_hashes(index, player)
+
+    # Rebuilds the bitboards and line state from a nested board.
+    def sync_bitboards(self, board):
+        bits = self.geometry.bits_from_board(board)
+        self.bitboards = {PLAYER_X: 0, PLAYER_O: 0}
+        self.reset_line_state()
+        for player in (PLAYER_X, PLAYER_O):
+            for index in iter_bits(bits[player]):
+                self.bitboards[player] |= self.geometry.cell_bits[index]
+                self.add_to_lines(index, player)
+        self.hash = self.geometry.zobrist_hash(self.bitboards[PLAYER_X], self.bitboards[PLAYER_O],
+                                               self.current_player)
+        if self.symmetric_hashes is not None:
+            self.enable_symmetry_tracking()
+
+    def enable_symmetry_tracking(self):
+        self.symmetric_hashes = symmetric_hashes(self.bitboards[PLAYER_X], self.bitboards[PLAYER_O], self.geometry)
+
+    def disable_symmetry_tracking(self):
+        self.symmetric_hashes = None
+
+    def update_symmetric_hashes(self, index, player):
+        keys = self.geometry.symmetric_zobrist[player][index]
+        self.symmetric_hashes = [h ^ k for h, k in zip(self.symmetric_hashes, keys)]
+
+    def canonical_hash(self):
+        hashes = self.symmetric_hashes
+        if hashes is None:
+            hashes = symmetric_hashes(self.bitboards[PLAYER_X], self.bitboards[PLAYER_O], self.geometry)
+        return canonical_from_hashes(hashes, self.current_player, self.geometry)
+
+    def reset_line_state(self):
+        line_total = len(self.geometry.line_masks)
+        length = self.geometry.length
+        self.line_counts = {PLAYER_X: [0] * line_total, PLAYER_O: [0] * line_total}
+        # open_lines[player][k]: lines holding k of the player's stones and none of the opponent's.
+        self.open_lines = {
+            PLAYER_X: [line_total] + [0] * length,
+            PLAYER_O: [line_total] + [0] * length
+        }
+        # threat_counts[player][cell]: open lines that the player completes by playing cell.
+        cell_count = self.geometry.cell_count
+        self.threat_counts = {PLAYER_X: [0] * cell_count, PLAYER_O: [0] * cell_count}
+        self.threat_cells = {PLAYER_X: 0, PLAYER_O: 0}
+        self.center_counts = {PLAYER_X: 0, PLAYER_O: 0}
+        self.corner_counts = {PLAYER_X: 0, PLAYER_O: 0}
+
+    def add_to_lines(self, index, player):
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        own_counts = self.line_counts[player]
+        opponent_counts = self.line_counts[opponent]
+        own_open = self.open_lines[player]
+        opponent_open = self.open_lines[opponent]
+        empty = ~(self.bitboards[PLAYER_X] | self.bitboards[PLAYER_O])
+        geometry = self.geometry
+        line_masks = geometry.line_masks
+        last = geometry.length - 1
+        
+        for line in geometry.cell_lines[index]:
+            own = own_counts[line]
+            other = opponent_counts[line]
+            own_counts[line] = own + 1
+            if other == 0:
+                own_open[own] -= 1
+                own_open[own + 1] += 1
+                if own == last - 1:
+                    self.add_threat(player, (line_masks[line] & empty).bit_length() - 1)
+                elif own == last:
+                    self.remove_threat(player, index)
+            if own == 0:
+                opponent_open[other] -= 1
+                if other == last:
+                    self.remove_threat(opponent, index)
+                    
+        bit = geometry.cell_bits[index]
+        if bit & geometry.center_mask:
+            self.center_counts[player] += 1
+        if bit & geometry.corner_mask:
+            self.corner_counts[player] += 1
+
+    def remove_from_lines(self, index, player):
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        own_counts = self.line_counts[player]
+        opponent_counts = self.line_counts[opponent]
+        own_open = self.open_lines[player]
+        opponent_open = self.open_lines[opponent]
+        geometry = self.geometry
+        line_masks = geometry.line_masks
+        last = geometry.length - 1
+        bit = geometry.cell_bits[index]
+        empty = ~(self.bitboards[PLAYER_X] | self.bitboards[PLAYER_O]) & ~bit
+        
+        for line in geometry.cell_lines[index]:
+            own = own_counts[line] - 1
+            other = opponent_counts[line]
+            own_counts[line] = own
+            if other == 0:
+                own_open[own + 1] -= 1
+                own_open[own] += 1
+                if own == last - 1:
+                    self.remove_threat(player, (line_masks[line] & empty).bit_length() - 1)
+                elif own == last:
+                    self.add_threat(player, index)
+            if own == 0:
+                opponent_open[other] += 1
+                if other == last:
+                    self.add_threat(opponent, index)
+                    
+        if bit & geometry.center_mask:
+            self.center_counts[player] -= 1
+        if bit & geometry.corner_mask:
+            self.corner_counts[player] -= 1
+
+    def add_threat(self, player, index):
+        counts = self.threat_counts[player]
+        counts[index] += 1
+        if counts[index] == 1:
+            self.threat_cells[player] |= self.geometry.cell_bits[index]
+
+    def remove_threat(self, player, index):
+        counts = self.threat_counts[player]
+        counts[index] -= 1
+        if counts[index] == 0:
+            self.threat_cells[player] &= ~self.geometry.cell_bits[index]
+
+    def line_score(self, player):
+        open_lines = self.open_lines[player]
+        line_scores = self.geometry.line_scores
+        score = 0
+        for count in range(1, self.geometry.length + 1):
+            score += line_scores[count] * open_lines[count]
+        return score
+
+    def winning_cells(self, player):
+        return self.threat_cells[player]
+
+    def copy(self):
+        new_game = CubicGame(self.geometry)
+        new_game.bitboards = self.bitboards.copy()
+        new_game.hash = self.hash
+        new_game.symmetric_hashes = self.symmetric_hashes
+        new_game.line_counts = {player: counts.copy() for player, counts in self.line_counts.items()}
+        new_game.open_lines = {player: counts.copy() for player, counts in self.open_lines.items()}
+        new_game.threat_counts = {player: counts.copy() for player, counts in self.threat_counts.items()}
+        new_game.threat_cells = self.threat_cells.copy()
+        new_game.center_counts = self.center_counts.copy()
+        new_game.corner_counts = self.corner_counts.copy()
+        new_game.current_player = self.current_player
+        new_game.game_over = self.game_over
+        new_game.winner = self.winner
+        new_game.winning_line = self.winning_line.copy() if self.winning_line else None
+        new_game.move_count = self.move_count
+        new_game.move_history = self.move_history.copy()
+        return new_game
+
+    # Saves are game record files (see game_record.py); old pickled saves
+    # can be converted with game_record.migrate_pickle.
+    def save_game(self, filename):
+        from game_record import save_record
+
+        save_record(filename, self)
+
+    def load_game(self, filename):
+        from game_record import load_record
+
+        if os.path.exists(filename):
+            record, geometry = load_record(filename)
+            self.geometry = geometry
+            self.reset_game()
+            self.replay(record.move_history(geometry), record.current_player)
+
+    def get_game_state(self):
+        x_bits = self.bitboards[PLAYER_X]
+        o_bits = self.bitboards[PLAYER_O]
+        state_parts = []
+        for bit in self.geometry.cell_bits:
+            if x_bits & bit:
+                state_parts.append('X')
+            elif o_bits & bit:
+                state_parts.append('O')
+            else:
+                state_parts.append('.')
+        state_parts.append(self.current_player)
+        return ''.join(state_parts)
+
+    # Inverse of get_game_state. The order of the moves is not part of the
+    # state, so the game comes back without a move history.
+    @classmethod
+    def from_game_state(cls, state, geometry=None):
+        game = cls(geometry)
+        geometry = game.geometry
+        if len(state) != geometry.cell_count + 1 or state[-1] not in (PLAYER_X, PLAYER_O):
+            raise ValueError(f"not a game state of {geometry}: {state!r}")
+        for index, cell in enumerate(state[:-1]):
+            if cell in (PLAYER_X, PLAYER_O):
+                game.place_index(index, cell)
+            elif cell != '.':
+                raise ValueError(f"bad cell {cell!r} in game state")
+        if game.current_player != state[-1]:
+            game.switch_player()
+        game.move_count = popcount(game.occupied())
+        for player in (PLAYER_X, PLAYER_O):
+            bits = game.bitboards[player]
+            for line, mask in enumerate(geometry.line_masks):
+                if bits & mask == mask:
+                    game.game_over = True
+                    game.winner = player
+                    game.winning_line = list(geometry.lines[line])
+        if game.is_full():
+            game.game_over = True
+        return game
@@ -0,0 +1,238 @@
+import os
+import sys
+import struct
+import pickle
+from game import CubicGame
+from geometry import get_geometry, DEFAULT_GEOMETRY
+from constants import *
+
+# File layout: a 12-byte header (magic, board size, winning length,
+# dimensions) followed by games back to back. A game is a 4-byte header
+# (move count, flags, result), one byte per move holding the cell index,
+# then the optional per-move fields named in the flags: search values as
+# int32, depths as uint8 and seconds as float32.
+RECORD_MAGIC = b"QUBICGR1"
+FILE_HEADER = struct.Struct("<8sBBBx")
+GAME_HEADER = struct.Struct("<HBB")
+
+FIRST_PLAYER_O = 0x01
+CURRENT_PLAYER_O = 0x02
+HAS_EVALS = 0x04
+HAS_DEPTHS = 0x08
+HAS_TIMES = 0x10
+
+RESULT_ONGOING = 0
+RESULT_CODES = {PLAYER_X: 1, PLAYER_O: 2, None: 3}
+RESULTS = {code: winner for winner, code in RESULT_CODES.items()}
+
+EVAL_LIMIT = (1 << 31) - 1
+
+
+class GameRecord:
+    __slots__ = ("moves", "first_player", "current_player", "game_over", "winner",
+                 "evals", "depths", "times")
+
+    # moves are cell indexes; the players alternate from first_player.
+    def __init__(self, moves, first_player=PLAYER_X, current_player=None, game_over=False, winner=None,
+                 evals=None, depths=None, times=None):
+        self.moves = bytes(moves)
+        self.first_player = first_player
+        if current_player is None:
+            current_player = first_player if len(self.moves) % 2 == 0 else other_player(first_player)
+        self.current_player = current_player
+        self.game_over = game_over
+        self.winner = winner
+        self.evals = evals
+        self.depths = depths
+        self.times = times
+
+    @classmethod
+    def from_game(cls, game, evals=None, depths=None, times=None):
+        if game.geometry.cell_count > 256:
+            raise ValueError(f"{game.geometry} has too many cells for one byte per move")
+        first_player = game.move_history[0][-1] if game.move_history else game.current_player
+        player = first_player
+        moves = []
+        for entry in game.move_history:
+            if entry[-1] != player:
+                raise ValueError("game records need alternating moves")
+            moves.append(game.geometry.cell_of[entry[:-1]])
+            player = other_player(player)
+        return cls(moves, first_player, game.current_player, game.game_over, game.winner,
+                   evals, depths, times)
+
+    def __len__(self):
+        return len(self.moves)
+
+    def __eq__(self, other):
+        return isinstance(other, GameRecord) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def move_history(self, geometry=DEFAULT_GEOMETRY):
+        history = []
+        player = self.first_player
+        for index in self.moves:
+            history.append(geometry.cell_coords[index] + (player,))
+            player = other_player(player)
+        return history
+
+    # Replaying the moves restores game_over, winner and the winning line.
+    def to_game(self, geometry=DEFAULT_GEOMETRY):
+        return CubicGame.from_history(self.move_history(geometry), self.current_player, geometry)
+
+
+def other_player(player):
+    return PLAYER_O if player == PLAYER_X else PLAYER_X
+
+
+def _check_fields(record):
+    for values in (record.evals, record.depths, record.times):
+        if values is not None and len(values) != len(record.moves):
+            raise ValueError("per-move fields need one value per move")
+
+
+def encode_record(record):
+    _check_fields(record)
+    count = len(record.moves)
+    flags = 0
+    if record.first_player == PLAYER_O:
+        flags |= FIRST_PLAYER_O
+    if record.current_player == PLAYER_O:
+        flags |= CURRENT_PLAYER_O
+    result = RESULT_CODES[record.winner] if record.game_over else RESULT_ONGOING
+    parts = [record.moves]
+    if record.evals is not None:
+        flags |= HAS_EVALS
+        parts.append(struct.pack(f"<{count}i", *(
+            int(max(-EVAL_LIMIT, min(EVAL_LIMIT, value))) for value in record.evals)))
+    if record.depths is not None:
+        flags |= HAS_DEPTHS
+        parts.append(struct.pack(f"<{count}B", *(min(255, max(0, depth)) for depth in record.depths)))
+    if record.times is not None:
+        flags |= HAS_TIMES
+        parts.append(struct.pack(f"<{count}f", *record.times))
+    return GAME_HEADER.pack(count, flags, result) + b"".join(parts)
+
+
+class RecordWriter:
+    # Appends to an existing file of the same geometry unless append is
+    # False, in which case the file is replaced.
+    def __init__(self, path, geometry=DEFAULT_GEOMETRY, append=True):
+        self.path = path
+        self.geometry = geometry
+        self.count = 0
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with RecordReader(path) as reader:
+                if reader.geometry is not geometry:
+                    raise ValueError(f"{path} holds {reader.geometry} games, not {geometry}")
+            self.file = open(path, "ab")
+        else:
+            self.file = open(path, "wb")
+            self.file.write(FILE_HEADER.pack(RECORD_MAGIC, geometry.size, geometry.length, geometry.dims))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def write(self, record):
+        self.file.write(encode_record(record))
+        self.count += 1
+
+    def write_game(self, game, evals=None, depths=None, times=None):
+        self.write(GameRecord.from_game(game, evals, depths, times))
+
+
+class RecordReader:
+    # Iterating reads one game at a time, so files of any size stream in
+    # constant memory.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        header = self.file.read(FILE_HEADER.size)
+        if len(header) != FILE_HEADER.size or header[:len(RECORD_MAGIC)] != RECORD_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a game record file")
+        _, size, length, dims = FILE_HEADER.unpack(header)
+        self.geometry = get_geometry(size, length, dims)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def __iter__(self):
+        while True:
+            header = self.file.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) != GAME_HEADER.size:
+                raise ValueError(f"{self.path} ends inside a game header")
+            count, flags, result = GAME_HEADER.unpack(header)
+            moves = self.read_exact(count)
+            evals = depths = times = None
+            if flags & HAS_EVALS:
+                evals = list(struct.unpack(f"<{count}i", self.read_exact(4 * count)))
+            if flags & HAS_DEPTHS:
+                depths = list(self.read_exact(count))
+            if flags & HAS_TIMES:
+                times = list(struct.unpack(f"<{count}f", self.read_exact(4 * count)))
+            yield GameRecord(
+                moves,
+                PLAYER_O if flags & FIRST_PLAYER_O else PLAYER_X,
+                PLAYER_O if flags & CURRENT_PLAYER_O else PLAYER_X,
+                result != RESULT_ONGOING,
+                RESULTS.get(result),
+                evals, depths, times
+            )
+
+    def read_exact(self, size):
+        data = self.file.read(size)
+        if len(data) != size:
+            raise ValueError(f"{self.path} ends inside a game")
+        return data
+
+    def games(self):
+        for record in self:
+            yield record.to_game(self.geometry)
+
+
+def save_record(path, game):
+    with RecordWriter(path, game.geometry, append=False) as writer:
+        writer.write_game(game)
+
+
+# Returns (record, geometry) for the first game in the file.
+def load_record(path):
+    with RecordReader(path) as reader:
+        record = next(iter(reader), None)
+        if record is None:
+            raise ValueError(f"{path} holds no games")
+        return record, reader.geometry
+
+
+# Old saves are pickles of the board, the current player and the move
+# history. Unpickling runs arbitrary code, so only migrate files you made.
+def migrate_pickle(pickle_path, record_path, append=False):
+    with open(pickle_path, "rb") as pickle_file:
+        data = pickle.load(pickle_file)
+    game = CubicGame.from_history([tuple(entry) for entry in data['move_history']], data['current_player'])
+    with RecordWriter(record_path, game.geometry, append=append) as writer:
+        writer.write_game(game)
+    return game
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: python game_record.py OLD_SAVE.pkl NEW_SAVE.qgr")
+        sys.exit(1)
+    migrated = migrate_pickle(sys.argv[1], sys.argv[2])
+    print(f"Migrated {migrated.move_count} moves to {sys.argv[2]}")
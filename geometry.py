@@ -0,0 +1,201 @@
+import random
+import itertools
+from functools import cached_property
+from constants import *
+
+# Fixed seed so hashes agree between processes and across runs. The default
+# cube draws its keys in the same order as it always has.
+ZOBRIST_SEED = 0x5EED_C0DE
+
+
+# Score of an unblocked line by the number of its cells a player holds:
+# LINE_SCORES for the 4-in-a-row cube, and the same shape for other lengths.
+def line_scores(length):
+    scores = [0] * (length + 1)
+    scores[length] = WIN_SCORE
+    if length >= 2:
+        scores[length - 1] = THREE_IN_LINE
+    for count in range(length - 2, 0, -1):
+        scores[count] = TWO_IN_LINE >> (length - 2 - count)
+    return scores
+
+
+# All tables derived from the board size, the winning length and the number
+# of dimensions. Build one per shape through get_geometry, which caches them,
+# and pass it to CubicGame and AdvancedAIPlayer. Cells are numbered like the
+# bitboards: coordinates in row-major order, the last axis fastest.
+class Geometry:
+    def __init__(self, size=BOARD_SIZE, length=WINNING_LENGTH, dims=3):
+        if dims < 2 or not 2 <= length <= size:
+            raise ValueError(f"unsupported geometry: size {size}, length {length}, {dims} dimensions")
+        self.size = size
+        self.length = length
+        self.dims = dims
+        self.key = (size, length, dims)
+        self.cell_count = size ** dims
+        self.full_mask = (1 << self.cell_count) - 1
+        self.cell_coords = list(itertools.product(range(size), repeat=dims))
+        self.cell_bits = [1 << index for index in range(self.cell_count)]
+        self.cell_of = {coords: index for index, coords in enumerate(self.cell_coords)}
+        self.line_scores = line_scores(length)
+
+        # Lines are walked in "forward" directions only, so each is found once.
+        origin = (0,) * dims
+        forward = [d for d in itertools.product((-1, 0, 1), repeat=dims) if d > origin]
+        self.lines = []
+        for start in self.cell_coords:
+            for direction in forward:
+                cells = tuple(tuple(c + i * d for c, d in zip(start, direction)) for i in range(length))
+                if all(cell in self.cell_of for cell in cells):
+                    self.lines.append(cells)
+        self.line_cells = [tuple(self.cell_of[cell] for cell in line) for line in self.lines]
+        self.line_masks = [sum(self.cell_bits[index] for index in cells) for cells in self.line_cells]
+        cell_lines = [[] for _ in range(self.cell_count)]
+        for line, cells in enumerate(self.line_cells):
+            for index in cells:
+                cell_lines[index].append(line)
+        self.cell_lines = [tuple(lines) for lines in cell_lines]
+        self.cell_line_masks = [tuple(self.line_masks[line] for line in lines) for lines in self.cell_lines]
+
+        # Centre cells sit on the middle one or two values of every axis,
+        # corners on an end of every axis.
+        middle = [c for c in range(size) if abs(2 * c - (size - 1)) <= 1]
+        ends = (0, size - 1)
+        self.center_positions = [coords for coords in self.cell_coords if all(c in middle for c in coords)]
+        self.corner_positions = [coords for coords in self.cell_coords if all(c in ends for c in coords)]
+        self.center_mask = sum(self.cell_bits[self.cell_of[coords]] for coords in self.center_positions)
+        self.corner_mask = sum(self.cell_bits[self.cell_of[coords]] for coords in self.corner_positions)
+
+        # On the cube this is POSITION_WEIGHTS summed over the axis pairs:
+        # 2 per axis, 2 more per axis at an edge, plus the centre and corner
+        # bonuses. Moves are tried heaviest first, ties in cell order.
+        self.cell_weights = []
+        for index, coords in enumerate(self.cell_coords):
+            weight = 2 * dims + 2 * sum(c in ends for c in coords)
+            if self.center_mask & self.cell_bits[index]:
+                weight += 2
+            if self.corner_mask & self.cell_bits[index]:
+                weight += 1
+            self.cell_weights.append(weight)
+        self.move_order = sorted(range(self.cell_count), key=lambda i: self.cell_weights[i], reverse=True)
+        self.move_order_bits = [(self.cell_bits[i], self.cell_coords[i]) for i in self.move_order]
+
+        rng = random.Random(ZOBRIST_SEED)
+        self.zobrist_keys = {
+            PLAYER_X: [rng.getrandbits(64) for _ in range(self.cell_count)],
+            PLAYER_O: [rng.getrandbits(64) for _ in range(self.cell_count)]
+        }
+        self.zobrist_side = rng.getrandbits(64)
+
+    # Pickles as a reference to the cached instance, so worker processes
+    # share the tables and `is` comparisons keep working.
+    def __reduce__(self):
+        return get_geometry, self.key
+
+    def __repr__(self):
+        return f"Geometry(size={self.size}, length={self.length}, dims={self.dims})"
+
+    def cell_index(self, *coords):
+        return self.cell_of[coords]
+
+    def zobrist_hash(self, x_bits, o_bits, current_player):
+        key = self.zobrist_side if current_player == PLAYER_O else 0
+        for player, bits in ((PLAYER_X, x_bits), (PLAYER_O, o_bits)):
+            keys = self.zobrist_keys[player]
+            while bits:
+                low = bits & -bits
+                key ^= keys[low.bit_length() - 1]
+                bits ^= low
+        return key
+
+    # Nested lists indexed by coordinates (board[x][y][z] on the cube).
+    def board_from_bits(self, x_bits, o_bits):
+        cells = [
+            PLAYER_X if x_bits & bit else PLAYER_O if o_bits & bit else EMPTY
+            for bit in self.cell_bits
+        ]
+        for _ in range(self.dims - 1):
+            cells = [cells[start:start + self.size] for start in range(0, len(cells), self.size)]
+        return cells
+
+    def bits_from_board(self, board):
+        cells = board
+        for _ in range(self.dims - 1):
+            cells = [cell for row in cells for cell in row]
+        bits = {PLAYER_X: 0, PLAYER_O: 0}
+        for index, cell in enumerate(cells):
+            if cell is not EMPTY:
+                bits[cell] |= self.cell_bits[index]
+        return bits
+
+    # Board automorphisms as cell permutations; SYMMETRIES[s][cell] is where
+    # s sends cell and index 0 is the identity. Built on first use, as the
+    # group grows quickly with the dimension.
+    @cached_property
+    def symmetries(self):
+        last = self.size - 1
+        maps = [
+            lambda c: (c[1], c[0]) + c[2:],
+            lambda c: c[1:] + c[:1],
+            lambda c: (last - c[0],) + c[1:],
+        ]
+        # With full-length lines, any map of the values that commutes with
+        # reversal, applied to every axis at once, keeps lines intact: on
+        # the 4-cube, swapping the middle values and the "inside-out" map
+        # exchanging corners with centre cells.
+        if self.length == self.size:
+            pairs = [(i, last - i) for i in range(self.size // 2)]
+            for low, high in pairs[1:]:
+                values = list(range(self.size))
+                values[low], values[high] = high, low
+                maps.append(lambda c, values=tuple(values): tuple(values[v] for v in c))
+            for (low, high), (next_low, next_high) in zip(pairs, pairs[1:]):
+                values = list(range(self.size))
+                values[low], values[next_low] = next_low, low
+                values[high], values[next_high] = next_high, high
+                maps.append(lambda c, values=tuple(values): tuple(values[v] for v in c))
+
+        generators = [tuple(self.cell_of[transform(coords)] for coords in self.cell_coords) for transform in maps]
+        identity = tuple(range(self.cell_count))
+        symmetries = [identity]
+        seen = {identity}
+        for perm in symmetries:
+            for generator in generators:
+                composed = tuple(generator[perm[index]] for index in range(self.cell_count))
+                if composed not in seen:
+                    seen.add(composed)
+                    symmetries.append(composed)
+        return symmetries
+
+    @cached_property
+    def inverse_symmetries(self):
+        inverses = []
+        for perm in self.symmetries:
+            inverse = [0] * self.cell_count
+            for index, target in enumerate(perm):
+                inverse[target] = index
+            inverses.append(tuple(inverse))
+        return inverses
+
+    # SYMMETRIC_ZOBRIST[player][cell][s] is the Zobrist key of the cell's
+    # image under symmetry s, so a position's hash in every frame is a XOR.
+    @cached_property
+    def symmetric_zobrist(self):
+        return {
+            player: [tuple(keys[perm[index]] for perm in self.symmetries) for index in range(self.cell_count)]
+            for player, keys in self.zobrist_keys.items()
+        }
+
+
+_geometries = {}
+
+
+def get_geometry(size=BOARD_SIZE, length=WINNING_LENGTH, dims=3):
+    key = (size, length, dims)
+    geometry = _geometries.get(key)
+    if geometry is None:
+        geometry = _geometries[key] = Geometry(size, length, dims)
+    return geometry
+
+
+DEFAULT_GEOMETRY = get_geometry()
@@ -0,0 +1,108 @@
+import sys
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from game import CubicGame
+from transposition import SharedTranspositionTable
+from constants import *
+
+BENCHMARK_OPENING = [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2)]
+
+
+def _lazy_smp_worker(table_name, table_size, generation, config, move_history, current_player,
+                     worker_id, max_time):
+    from ai_player import AdvancedAIPlayer
+
+    player_symbol, difficulty, heuristic_type, geometry = config
+    table = SharedTranspositionTable.attach(table_name, table_size, generation)
+    try:
+        player = AdvancedAIPlayer(player_symbol, difficulty=difficulty, heuristic_type=heuristic_type,
+                                  geometry=geometry)
+        player.transposition_table = table
+        # Odd helpers look one ply further so the pool does not walk the
+        # same iterations in lockstep; the shared table does the rest.
+        player.depth += worker_id % 2
+
+        game = CubicGame.from_history(move_history, current_player, geometry)
+        if player.use_symmetry and game.move_count < SYMMETRY_PLIES:
+            game.enable_symmetry_tracking()
+        player.controller.start(max_time)
+        move = player.iterative_deepening_search(game)
+        return worker_id, move, player.depth_reached, player.nodes_evaluated
+    finally:
+        table.close()
+
+
+class LazySMPSearch:
+    def __init__(self, workers, table_size=SHARED_TABLE_SIZE):
+        self.workers = workers
+        self.table = SharedTranspositionTable(table_size)
+        self.executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context())
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.table.close()
+
+    # Every worker searches the same root against the shared table. The
+    # answer is taken from the worker that completed the deepest iteration,
+    # preferring lower worker ids on ties. Returns (move, depth, nodes).
+    def search(self, ai, game, max_time):
+        self.table.new_search()
+        config = (ai.player_symbol, ai.difficulty, ai.heuristic_type, ai.geometry)
+        move_history = [tuple(entry) for entry in game.move_history]
+        futures = [
+            self.executor.submit(_lazy_smp_worker, self.table.name, self.table.size, self.table.generation,
+                                 config, move_history, game.current_player, worker_id, max_time)
+            for worker_id in range(self.workers)
+        ]
+
+        best = None
+        nodes = 0
+        for future in futures:
+            worker_id, move, depth, worker_nodes = future.result()
+            nodes += worker_nodes
+            if move and (best is None or depth > best[1]):
+                best = (move, depth)
+        if best is None:
+            return None, 0, nodes
+        return best[0], best[1], nodes
+
+
+def benchmark_lazy_smp(worker_counts=(1, 2, 4, 8), seconds=3, difficulty=5, moves=BENCHMARK_OPENING):
+    from ai_player import AdvancedAIPlayer
+
+    game = CubicGame()
+    for x, y, z in moves:
+        game.make_move(x, y, z)
+        game.switch_player()
+
+    results = []
+    for workers in worker_counts:
+        ai = AdvancedAIPlayer(game.current_player, difficulty=difficulty, workers=workers,
+                              parallel_mode="lazy_smp")
+        ai.max_time = seconds
+        ai.threat_depth = 0
+        search = LazySMPSearch(workers)
+        try:
+            start_time = time.time()
+            move, depth, nodes = search.search(ai, game, seconds)
+            elapsed = time.time() - start_time
+        finally:
+            search.close()
+        results.append({
+            "workers": workers,
+            "move": move,
+            "depth": depth,
+            "nodes": nodes,
+            "time": round(elapsed, 3),
+            "nodes_per_sec": int(nodes / elapsed) if elapsed > 0 else 0
+        })
+    return results
+
+
+if __name__ == "__main__":
+    counts = tuple(int(arg) for arg in sys.argv[1:]) or (1, 2, 4, 8)
+    print("===== LAZY SMP SCALING =====")
+    for row in benchmark_lazy_smp(counts):
+        print(f"workers: {row['workers']}  nodes/sec: {row['nodes_per_sec']}  "
+              f"nodes: {row['nodes']}  depth: {row['depth']}  move: {row['move']}")
@@ -0,0 +1,344 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from game import CubicGame
+from search_control import SearchController
+from search_stats import SearchListeners, MOVE
+from bitboard import *
+from constants import *
+
+# Exploration constants for UCT (no prior) and PUCT (quick_evaluate prior).
+UCT_EXPLORATION = 1.4
+PUCT_EXPLORATION = 2.0
+# quick_evaluate scores are softened by this before the softmax prior.
+PRIOR_TEMPERATURE = 20.0
+# Playout result when the board fills up (EMPTY is None, like "no result").
+DRAW = "draw"
+
+
+def print_search_event(event, data):
+    if event == MOVE:
+        print(f"MCTS: Found move in {data['time']:.2f}s, {data['iterations']} playouts, "
+              f"difficulty: {data['difficulty']}")
+
+
+class MCTSNode:
+    __slots__ = ("move", "parent", "player", "children", "visits", "wins", "prior", "winner")
+
+    # `player` made `move` to reach this node; wins are counted for them.
+    def __init__(self, move, parent, player, prior=1.0):
+        self.move = move
+        self.parent = parent
+        self.player = player
+        self.children = None
+        self.visits = 0
+        self.wins = 0.0
+        self.prior = prior
+        self.winner = None
+
+    def depth(self):
+        if not self.children:
+            return 0
+        return 1 + max(child.depth() for child in self.children)
+
+
+def _run_mcts_worker(config, move_history, current_player, seed, max_time):
+    player_symbol, difficulty, heuristic_type, geometry = config
+    player = MCTSPlayer(player_symbol, difficulty=difficulty, heuristic_type=heuristic_type, seed=seed,
+                        verbose=False, geometry=geometry)
+    player.controller.start(max_time)
+    game = CubicGame.from_history(move_history, current_player, geometry=geometry)
+    root = player.search(game)
+    stats = {child.move: (child.visits, child.wins) for child in root.children or []}
+    return stats, player.iterations
+
+
+class MCTSPlayer:
+    def __init__(self, player_symbol, difficulty=3, heuristic_type=2, use_prior=True, workers=1,
+                 seed=None, verbose=True, geometry=None):
+        self.geometry = geometry or DEFAULT_GEOMETRY
+        self.player_symbol = player_symbol
+        self.opponent_symbol = PLAYER_O if player_symbol == PLAYER_X else PLAYER_X
+        # heuristic_type 1 plays plain UCT; the prior needs heuristic 2.
+        self.heuristic_type = heuristic_type
+        self.use_prior = use_prior and heuristic_type != 1
+        self.difficulty = difficulty
+        self.set_difficulty(difficulty)
+        self.workers = workers
+        self.verbose = verbose
+        self.listeners = SearchListeners()
+        if verbose:
+            self.listeners.add(print_search_event)
+        self.rng = random.Random(seed)
+        # quick_evaluate after the mover takes each cell, less the part
+        # that is the same for every cell: 20 for a centre cell and 10 for
+        # a corner. The softmax prior only sees these differences.
+        self.prior_scores = [
+            20 * bool(self.geometry.center_mask & bit) + 10 * bool(self.geometry.corner_mask & bit)
+            for bit in self.geometry.cell_bits
+        ]
+        self.executor = None
+        self.controller = SearchController()
+
+        self.root = None
+        self.root_history = []
+        self.iterations = 0
+        self.reused_visits = 0
+        self.tree_depth = 0
+        self.nodes_evaluated = 0
+        self.last_search_time = 0.0
+
+    def reset_metrics(self):
+        self.nodes_evaluated = 0
+        self.iterations = 0
+        self.reused_visits = 0
+        self.last_search_time = 0.0
+
+    def get_metrics(self):
+        return {
+            "nodes": self.nodes_evaluated,
+            "time": round(self.last_search_time, 4),
+            "depth": self.tree_depth,
+            "difficulty": self.difficulty,
+            "heuristic": self.heuristic_type,
+            "workers": self.workers,
+            "iterations": self.iterations,
+            "reused_visits": self.reused_visits
+        }
+
+    def set_difficulty(self, level):
+        difficulties = {
+            1: {'iterations': 300, 'max_time': 1},
+            2: {'iterations': 1000, 'max_time': 2},
+            3: {'iterations': 3000, 'max_time': 3},
+            4: {'iterations': 10000, 'max_time': 5},
+            5: {'iterations': 30000, 'max_time': 8}
+        }
+        config = difficulties.get(level, difficulties[3])
+        self.max_iterations = config['iterations']
+        self.max_time = config['max_time']
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def cancel_search(self):
+        self.controller.cancel()
+
+    def add_listener(self, callback):
+        self.listeners.add(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def find_best_move(self, game):
+        self.reset_metrics()
+        self.controller.start(self.max_time)
+
+        winning = game.threat_cells[game.current_player]
+        blocking = game.threat_cells[PLAYER_O if game.current_player == PLAYER_X else PLAYER_X]
+        forced = winning or blocking
+        if forced:
+            return self.finish_move(game.geometry.cell_coords[(forced & -forced).bit_length() - 1])
+
+        if self.workers > 1:
+            best_move = self.root_parallel_search(game)
+        else:
+            root = self.search(game)
+            best = max(root.children, key=lambda child: child.visits) if root.children else None
+            best_move = best.move if best else None
+            # Keep our move's subtree for the next call.
+            if best is not None:
+                best.parent = None
+                self.root = best
+                self.root_history = [tuple(entry) for entry in game.move_history] + \
+                    [best.move + (game.current_player,)]
+
+        if best_move is None:
+            moves = game.get_possible_moves()
+            best_move = moves[0] if moves else None
+        return self.finish_move(best_move)
+
+    def finish_move(self, move):
+        self.last_search_time = self.controller.elapsed()
+        if self.listeners:
+            self.listeners.emit(MOVE, dict(self.get_metrics(), move=move))
+        return move
+
+    def root_parallel_search(self, game):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        config = (self.player_symbol, self.difficulty, self.heuristic_type, self.geometry)
+        move_history = [tuple(entry) for entry in game.move_history]
+        remaining = self.controller.remaining()
+        futures = [
+            self.executor.submit(_run_mcts_worker, config, move_history, game.current_player,
+                                 self.rng.randrange(1 << 30), remaining)
+            for _ in range(self.workers)
+        ]
+
+        # Independent trees vote with their root visit counts.
+        totals = {}
+        for future in futures:
+            stats, iterations = future.result()
+            self.iterations += iterations
+            for move, (visits, wins) in stats.items():
+                total_visits, total_wins = totals.get(move, (0, 0.0))
+                totals[move] = (total_visits + visits, total_wins + wins)
+        self.nodes_evaluated = self.iterations
+        if not totals:
+            return None
+        return max(totals, key=lambda move: totals[move][0])
+
+    def reuse_root(self, game):
+        history = [tuple(entry) for entry in game.move_history]
+        node = self.root
+        if node is None or history[:len(self.root_history)] != self.root_history:
+            return None
+        for entry in history[len(self.root_history):]:
+            if not node.children:
+                return None
+            node = next((child for child in node.children if child.move == entry[:-1]), None)
+            if node is None:
+                return None
+        node.parent = None
+        return node
+
+    def search(self, game):
+        opponent = PLAYER_O if game.current_player == PLAYER_X else PLAYER_X
+        root = self.reuse_root(game)
+        if root is None:
+            root = MCTSNode(None, None, opponent)
+        self.reused_visits = root.visits
+        self.root = None
+
+        state = game.copy()
+        state.symmetric_hashes = None
+        while self.iterations < self.max_iterations:
+            if self.iterations & 31 == 0 and self.controller.should_stop():
+                break
+            self.iterate(root, state)
+            self.iterations += 1
+
+        self.nodes_evaluated = self.iterations
+        self.tree_depth = root.depth()
+        return root
+
+    def iterate(self, root, state):
+        node = root
+        placed = []
+        winner = node.winner
+        cell_of = state.geometry.cell_of
+        while winner is None and node.children is not None:
+            node = self.select_child(node)
+            index = cell_of[node.move]
+            state.place_index(index, node.player)
+            placed.append(index)
+            winner = node.winner
+
+        if winner is None:
+            if state.occupied() == state.geometry.full_mask:
+                winner = DRAW
+            else:
+                self.expand(node, state)
+                winner = self.rollout(state, PLAYER_O if node.player == PLAYER_X else PLAYER_X)
+
+        for index in reversed(placed):
+            state.remove_index(index)
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1
+            elif winner == DRAW:
+                node.wins += 0.5
+            node = node.parent
+
+    def select_child(self, node):
+        log_visits = math.log(node.visits + 1)
+        sqrt_visits = math.sqrt(node.visits + 1)
+        best = None
+        best_score = -math.inf
+        for child in node.children:
+            value = child.wins / child.visits if child.visits else 0.5
+            if self.use_prior:
+                score = value + PUCT_EXPLORATION * child.prior * sqrt_visits / (1 + child.visits)
+            elif child.visits == 0:
+                return child
+            else:
+                score = value + UCT_EXPLORATION * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_score = score
+                best = child
+        return best
+
+    # A winning cell is the only child worth having; an opponent winning
+    # cell must be blocked. Otherwise every empty cell is a child.
+    def expand(self, node, state):
+        player = PLAYER_O if node.player == PLAYER_X else PLAYER_X
+        opponent = node.player
+        geometry = state.geometry
+        winning = state.threat_cells[player]
+        if winning:
+            child = MCTSNode(geometry.cell_coords[(winning & -winning).bit_length() - 1], node, player)
+            child.winner = player
+            node.children = [child]
+            return
+        blocking = state.threat_cells[opponent]
+        candidates = blocking if blocking else ~state.occupied() & geometry.full_mask
+        moves = [coords for bit, coords in geometry.move_order_bits if candidates & bit]
+
+        priors = [1.0] * len(moves)
+        if self.use_prior and len(moves) > 1:
+            scores = [self.prior_scores[geometry.cell_of[move]] for move in moves]
+            top = max(scores)
+            weights = [math.exp((score - top) / PRIOR_TEMPERATURE) for score in scores]
+            total = sum(weights)
+            priors = [weight / total for weight in weights]
+        node.children = [MCTSNode(move, node, player, prior) for move, prior in zip(moves, priors)]
+
+    # Random playout on local copies of the line counts. A side with a
+    # winning cell wins at once and a side facing one blocks it, which
+    # settles most playouts long before the board fills.
+    def rollout(self, state, player):
+        counts = {PLAYER_X: state.line_counts[PLAYER_X][:], PLAYER_O: state.line_counts[PLAYER_O][:]}
+        threats = {PLAYER_X: state.threat_cells[PLAYER_X], PLAYER_O: state.threat_cells[PLAYER_O]}
+        occupied = state.occupied()
+        geometry = state.geometry
+        cell_bits = geometry.cell_bits
+        cell_lines = geometry.cell_lines
+        line_masks = geometry.line_masks
+        one_short = geometry.length - 1
+        empty = [index for index in range(geometry.cell_count) if not occupied & cell_bits[index]]
+        self.rng.shuffle(empty)
+        position = 0
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+
+        while True:
+            if threats[player]:
+                return player
+            blocking = threats[opponent]
+            if blocking:
+                if blocking & (blocking - 1):
+                    return opponent
+                index = blocking.bit_length() - 1
+            else:
+                while position < len(empty) and occupied & cell_bits[empty[position]]:
+                    position += 1
+                if position == len(empty):
+                    return DRAW
+                index = empty[position]
+                position += 1
+
+            bit = cell_bits[index]
+            occupied |= bit
+            threats[PLAYER_X] &= ~bit
+            threats[PLAYER_O] &= ~bit
+            own_counts = counts[player]
+            opponent_counts = counts[opponent]
+            for line in cell_lines[index]:
+                own_counts[line] += 1
+                if own_counts[line] == one_short and opponent_counts[line] == 0:
+                    threats[player] |= line_masks[line] & ~occupied
+            player, opponent = opponent, player
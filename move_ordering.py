@@ -0,0 +1,101 @@
+from bitboard import *
+from transposition import NO_MOVE
+from constants import *
+
+KILLER_SLOTS = 2
+# Sort keys, highest first. History scores stay far below the killer band
+# because they are halved at the start of every search.
+TT_MOVE_SCORE = 1 << 40
+WIN_MOVE_SCORE = 1 << 39
+BLOCK_MOVE_SCORE = 1 << 38
+THREAT_MOVE_SCORE = 1 << 36
+KILLER_MOVE_SCORE = 1 << 34
+THREAT_BLOCK_SCORE = 1 << 32
+
+
+class MoveOrdering:
+    def __init__(self, geometry=DEFAULT_GEOMETRY):
+        self.geometry = geometry
+        self.max_ply = geometry.cell_count + 1
+        # killers[ply] holds the last quiet moves that cut off at game ply
+        # `ply` (game.move_count), newest first.
+        self.killers = [[NO_MOVE] * KILLER_SLOTS for _ in range(self.max_ply)]
+        # history[player][cell] grows by depth^2 whenever the move cuts off.
+        self.history = {PLAYER_X: [0] * geometry.cell_count, PLAYER_O: [0] * geometry.cell_count}
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        for player_history in self.history.values():
+            for index in range(len(player_history)):
+                player_history[index] >>= 1
+
+    def reset_stats(self):
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def order_moves(self, game, tt_move=NO_MOVE):
+        player = game.current_player
+        opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+        geometry = self.geometry
+        empty = ~game.occupied() & geometry.full_mask
+        if not empty:
+            return []
+
+        wins = game.threat_cells[player]
+        blocks = game.threat_cells[opponent]
+        threat_moves = 0
+        threat_blocks = 0
+        own_counts = game.line_counts[player]
+        opponent_counts = game.line_counts[opponent]
+        two_short = geometry.length - 2
+        for line, mask in enumerate(geometry.line_masks):
+            own = own_counts[line]
+            other = opponent_counts[line]
+            if other == 0 and own == two_short:
+                threat_moves |= mask
+            elif own == 0 and other == two_short:
+                threat_blocks |= mask
+        killers = self.killers[game.move_count] if game.move_count < self.max_ply else ()
+        history = self.history[player]
+
+        scored = []
+        for bit, coords in geometry.move_order_bits:
+            if not empty & bit:
+                continue
+            index = bit.bit_length() - 1
+            if index == tt_move:
+                score = TT_MOVE_SCORE
+            elif wins & bit:
+                score = WIN_MOVE_SCORE
+            elif blocks & bit:
+                score = BLOCK_MOVE_SCORE
+            else:
+                score = history[index]
+                if threat_moves & bit:
+                    score += THREAT_MOVE_SCORE
+                if index in killers:
+                    score += KILLER_MOVE_SCORE >> killers.index(index)
+                if threat_blocks & bit:
+                    score += THREAT_BLOCK_SCORE
+            scored.append((score, coords))
+        # The sort is stable, so equal scores keep the static cell order.
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [coords for _, coords in scored]
+
+    # Called when `move` (searched as number `move_number`, from 0) caused a
+    # beta cutoff with `depth` plies left at game ply `ply`.
+    def record_cutoff(self, player, ply, move, depth, move_number):
+        self.cutoffs += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+        index = self.geometry.cell_of[move]
+        self.history[player][index] += depth * depth
+        if ply < self.max_ply:
+            killers = self.killers[ply]
+            if killers[0] != index:
+                killers[1:] = killers[:-1]
+                killers[0] = index
@@ -0,0 +1,144 @@
+import os
+import sys
+import mmap
+import time
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from game import CubicGame
+from bitboard import *
+from symmetry import canonical_hash, transform_move, inverse_transform_move
+from constants import *
+
+# File layout: a 16-byte header (magic, entry count, plies, search depth)
+# followed by 16-byte records sorted by canonical key. A record holds the
+# key, the root value, the book move in the canonical frame and the depth
+# the move was searched to.
+BOOK_MAGIC = b"QUBICBK1"
+HEADER = struct.Struct("<8sIHH")
+RECORD = struct.Struct("<QiBBH")
+
+
+class OpeningBook:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.plies, self.depth = HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    @classmethod
+    def open_default(cls, path=OPENING_BOOK_PATH):
+        return cls(path) if os.path.exists(path) else None
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    # Binary search over the mapped records; returns (value, cell, depth)
+    # in the canonical frame, or None.
+    def find(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            found = struct.unpack_from("<Q", self.data, offset)[0]
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                _, value, cell, depth, _ = RECORD.unpack_from(self.data, offset)
+                return value, cell, depth
+        return None
+
+    # Books are built for the default cube only.
+    def lookup(self, game):
+        if game.geometry is not DEFAULT_GEOMETRY:
+            return None
+        if game.move_count >= self.plies or game.game_over:
+            return None
+        x_bits, o_bits = game.bitboards[PLAYER_X], game.bitboards[PLAYER_O]
+        key, symmetry = canonical_hash(x_bits, o_bits, game.current_player)
+        entry = self.find(key)
+        if entry is None:
+            return None
+        move = inverse_transform_move(CELL_COORDS[entry[1]], symmetry)
+        # A colliding key could name an occupied cell; never play it.
+        if (x_bits | o_bits) & CELL_BITS[cell_index(*move)]:
+            return None
+        return move
+
+
+def write_book(path, entries, plies, depth):
+    # entries: {canonical key: (value, canonical cell, depth)}
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(BOOK_MAGIC, len(entries), plies, depth))
+        for key in sorted(entries):
+            value, cell, searched = entries[key]
+            value = int(max(-WIN_SCORE, min(WIN_SCORE, value)))
+            book_file.write(RECORD.pack(key, value, cell, searched, 0))
+
+
+# Every position with fewer than `plies` stones, one representative per
+# symmetry class. Returns {canonical key: (move history, symmetry)}.
+def enumerate_positions(plies):
+    positions = {}
+    frontier = [CubicGame()]
+    for _ in range(plies):
+        next_frontier = []
+        for game in frontier:
+            key, symmetry = canonical_hash(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O],
+                                           game.current_player)
+            if key in positions or game.game_over:
+                continue
+            positions[key] = ([tuple(entry) for entry in game.move_history], symmetry)
+            for move in game.get_possible_moves():
+                child = game.copy()
+                child.make_move(*move)
+                child.switch_player()
+                next_frontier.append(child)
+        frontier = next_frontier
+    return positions
+
+
+def _search_book_position(move_history, symmetry, depth, max_time):
+    from ai_player import AdvancedAIPlayer
+
+    game = CubicGame.from_history(move_history)
+    ai = AdvancedAIPlayer(game.current_player, difficulty=5, verbose=False)
+    ai.depth = depth
+    ai.max_time = max_time
+    ai.use_opening_shortcuts = False
+    move = ai.find_best_move(game)
+    cell = cell_index(*transform_move(move, symmetry))
+    return cell, ai.best_value, ai.depth_reached
+
+
+def build_book(path=OPENING_BOOK_PATH, plies=3, depth=8, max_time=60, workers=None):
+    positions = enumerate_positions(plies)
+    entries = {}
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = {
+            key: executor.submit(_search_book_position, history, symmetry, depth, max_time)
+            for key, (history, symmetry) in positions.items()
+        }
+        for key, future in futures.items():
+            cell, value, searched = future.result()
+            entries[key] = (value, cell, searched)
+    write_book(path, entries, plies, depth)
+    return {"positions": len(entries), "plies": plies, "depth": depth,
+            "time": round(time.time() - start_time, 2)}
+
+
+if __name__ == "__main__":
+    plies = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    print("===== BUILDING OPENING BOOK =====")
+    for key, value in build_book(plies=plies, depth=depth).items():
+        print(f"{key}: {value}")
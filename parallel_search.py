@@ -0,0 +1,118 @@
+import math
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from game import CubicGame
+from search_control import SearchCancelled
+from constants import *
+
+# Per-process state of a pool worker: the alpha bound shared with the parent
+# and one player per configuration, so its transposition table and killer
+# moves carry over from one root move (and one search) to the next.
+_shared_alpha = None
+_worker_players = {}
+
+
+def _init_worker(shared_alpha):
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _get_worker_player(config):
+    from ai_player import AdvancedAIPlayer
+
+    player = _worker_players.get(config)
+    if player is None:
+        player_symbol, difficulty, heuristic_type, geometry = config
+        player = AdvancedAIPlayer(player_symbol, difficulty=difficulty, heuristic_type=heuristic_type,
+                                  geometry=geometry)
+        _worker_players[config] = player
+    return player
+
+
+# Returns (move, value, nodes, finished, failed_low). The move is searched
+# with the window (alpha, +inf) for the shared alpha it starts with, so a
+# value at or below that alpha is only an upper bound: failed_low.
+def _search_root_move(config, move_history, current_player, move, depth, deadline):
+    player = _get_worker_player(config)
+    game = CubicGame.from_history(move_history, current_player, player.geometry)
+    player.nodes_evaluated = 0
+    player.controller.start(deadline - time.time())
+
+    alpha = _shared_alpha.value
+    child = player.enter_move(game, move)
+    try:
+        value = player.alpha_beta_minimax(child, depth - 1, alpha, math.inf, False)
+    except SearchCancelled:
+        return move, None, player.nodes_evaluated, False, False
+
+    if value <= alpha:
+        return move, value, player.nodes_evaluated, True, True
+    with _shared_alpha.get_lock():
+        if value > _shared_alpha.value:
+            _shared_alpha.value = value
+    return move, value, player.nodes_evaluated, True, False
+
+
+class ParallelRootSearch:
+    def __init__(self, workers):
+        self.workers = workers
+        self.executor = None
+        self.shared_alpha = None
+
+    def start(self):
+        if self.executor is None:
+            context = multiprocessing.get_context()
+            self.shared_alpha = context.Value('d', -math.inf)
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.shared_alpha,)
+            )
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    # Young Brothers Wait at the root: the eldest move is searched here to
+    # set alpha, then its brothers are split over the pool. Returns
+    # (move, value, worker_nodes, completed). Workers get the deadline of
+    # ai.controller; a cancel only reaches the eldest move, which raises
+    # SearchCancelled.
+    def search(self, ai, game, depth, moves):
+        self.start()
+        deadline = time.time() + ai.controller.remaining()
+
+        child = ai.enter_move(game, moves[0])
+        try:
+            best_value = ai.alpha_beta_minimax(child, depth - 1, -math.inf, math.inf, False)
+        finally:
+            ai.leave_move(game, child)
+        best_move = moves[0]
+
+        with self.shared_alpha.get_lock():
+            self.shared_alpha.value = best_value
+
+        config = (ai.player_symbol, ai.difficulty, ai.heuristic_type, ai.geometry)
+        move_history = [tuple(entry) for entry in game.move_history]
+        futures = [
+            self.executor.submit(_search_root_move, config, move_history, game.current_player,
+                                 move, depth, deadline)
+            for move in moves[1:]
+        ]
+
+        worker_nodes = 0
+        completed = True
+        # A fail-low value is no better than an exact value some move has
+        # already reached, so only exact values can replace the best move.
+        # Among those, ties go to the move searched first in move order.
+        for future in futures:
+            move, value, nodes, finished, failed_low = future.result()
+            worker_nodes += nodes
+            completed = completed and finished
+            if finished and not failed_low and value > best_value:
+                best_value = value
+                best_move = move
+        return best_move, best_value, worker_nodes, completed
@@ -0,0 +1,276 @@
+import os
+import sys
+import mmap
+import heapq
+import struct
+from game import CubicGame
+from game_record import RecordReader
+from geometry import get_geometry, DEFAULT_GEOMETRY
+from symmetry import transform_move, inverse_transform_move
+from constants import *
+
+# A database is a directory of immutable segment files plus a MANIFEST
+# naming the live ones. A segment is a 16-byte header (magic, record count,
+# board size, winning length, dimensions) followed by 24-byte records
+# sorted by (canonical key, cell). A record counts the games in which the
+# side to move played that cell (in the canonical frame) and went on to
+# win, draw or lose. New games go into a new segment, so adding never
+# rewrites the old ones; compact() merges them when there are too many.
+SEGMENT_MAGIC = b"QUBICPD1"
+HEADER = struct.Struct("<8sIBBBx")
+RECORD = struct.Struct("<QBxxxIII")
+MANIFEST = "MANIFEST"
+# Positions gathered in memory before they are written as a segment.
+SEGMENT_ENTRIES = 1 << 20
+# Lookups search every segment, so more than this many are merged.
+MAX_SEGMENTS = 8
+
+
+class Segment:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, size, length, dims = HEADER.unpack_from(self.data, 0)
+        if magic != SEGMENT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a position database segment")
+        self.geometry = get_geometry(size, length, dims)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    # Binary search for the first record of `key`, then a scan over the
+    # records that share it. Yields (cell, wins, draws, losses).
+    def find(self, key):
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from("<Q", self.data, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        while low < self.count:
+            found, cell, wins, draws, losses = RECORD.unpack_from(self.data, HEADER.size + low * RECORD.size)
+            if found != key:
+                return
+            yield cell, wins, draws, losses
+            low += 1
+
+    def __iter__(self):
+        for offset in range(HEADER.size, HEADER.size + self.count * RECORD.size, RECORD.size):
+            yield RECORD.unpack_from(self.data, offset)
+
+
+def write_segment(path, geometry, records):
+    # records: sorted (key, cell, wins, draws, losses); the count is
+    # patched into the header once they are all written.
+    count = 0
+    with open(path, "wb") as segment_file:
+        segment_file.write(HEADER.pack(SEGMENT_MAGIC, 0, geometry.size, geometry.length, geometry.dims))
+        for record in records:
+            segment_file.write(RECORD.pack(*record))
+            count += 1
+        segment_file.seek(0)
+        segment_file.write(HEADER.pack(SEGMENT_MAGIC, count, geometry.size, geometry.length, geometry.dims))
+    return count
+
+
+# Sums the counts of equal (key, cell) pairs in a sorted stream.
+def _combine(records):
+    current = None
+    for key, cell, wins, draws, losses in records:
+        if current is not None and current[0] == key and current[1] == cell:
+            current[2] += wins
+            current[3] += draws
+            current[4] += losses
+            continue
+        if current is not None:
+            yield tuple(current)
+        current = [key, cell, wins, draws, losses]
+    if current is not None:
+        yield tuple(current)
+
+
+class PositionDatabase:
+    def __init__(self, path, geometry=DEFAULT_GEOMETRY):
+        if geometry.cell_count > 256:
+            raise ValueError(f"{geometry} has too many cells for the position database")
+        self.path = path
+        self.geometry = geometry
+        os.makedirs(path, exist_ok=True)
+        self.segments = []
+        manifest = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest, encoding="utf-8") as manifest_file:
+                names = manifest_file.read().split()
+            for name in names:
+                segment = Segment(os.path.join(path, name))
+                self.segments.append(segment)
+                if segment.geometry is not geometry:
+                    self.close()
+                    raise ValueError(f"{path} holds {segment.geometry} positions, not {geometry}")
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def __len__(self):
+        return sum(segment.count for segment in self.segments)
+
+    def write_manifest(self, names):
+        manifest = os.path.join(self.path, MANIFEST)
+        with open(manifest + ".tmp", "w", encoding="utf-8") as manifest_file:
+            manifest_file.write("\n".join(names) + "\n")
+        os.replace(manifest + ".tmp", manifest)
+
+    def next_segment_name(self):
+        numbers = [int(os.path.basename(segment.path)[8:-4]) for segment in self.segments]
+        return f"segment-{max(numbers, default=0) + 1:06d}.pdb"
+
+    def add_segment(self, records):
+        name = self.next_segment_name()
+        if not write_segment(os.path.join(self.path, name), self.geometry, records):
+            os.remove(os.path.join(self.path, name))
+            return
+        self.write_manifest([os.path.basename(segment.path) for segment in self.segments] + [name])
+        self.segments.append(Segment(os.path.join(self.path, name)))
+        if len(self.segments) > MAX_SEGMENTS:
+            self.compact()
+
+    # Merges every segment into one. The new manifest is written before the
+    # old segments are removed, so an interrupted compaction loses nothing.
+    def compact(self):
+        if len(self.segments) < 2:
+            return
+        name = self.next_segment_name()
+        write_segment(os.path.join(self.path, name), self.geometry,
+                      _combine(heapq.merge(*self.segments)))
+        self.write_manifest([name])
+        old_paths = [segment.path for segment in self.segments]
+        self.close()
+        for path in old_paths:
+            os.remove(path)
+        self.segments = [Segment(os.path.join(self.path, name))]
+
+    # Adds finished games (GameRecords) as one or more new segments.
+    # Unfinished games are skipped; max_plies limits how deep into each
+    # game positions are kept. Returns the number of games added.
+    def add_records(self, records, max_plies=None):
+        counts = {}
+        games = 0
+        for record in records:
+            if not record.game_over:
+                continue
+            self.count_game(counts, record, max_plies)
+            games += 1
+            if len(counts) >= SEGMENT_ENTRIES:
+                self.add_segment(key + tuple(value) for key, value in sorted(counts.items()))
+                counts = {}
+        if counts:
+            self.add_segment(key + tuple(value) for key, value in sorted(counts.items()))
+        return games
+
+    def add_record_file(self, path, max_plies=None):
+        with RecordReader(path) as reader:
+            if reader.geometry is not self.geometry:
+                raise ValueError(f"{path} holds {reader.geometry} games, not {self.geometry}")
+            return self.add_records(reader, max_plies)
+
+    def count_game(self, counts, record, max_plies):
+        geometry = self.geometry
+        game = CubicGame(geometry)
+        game.enable_symmetry_tracking()
+        if game.current_player != record.first_player:
+            game.switch_player()
+        for ply, index in enumerate(record.moves):
+            if max_plies is not None and ply >= max_plies:
+                break
+            player = game.current_player
+            key, symmetry = game.canonical_hash()
+            move = geometry.cell_coords[index]
+            cell = geometry.cell_of[transform_move(move, symmetry, geometry)]
+            entry = counts.setdefault((key, cell), [0, 0, 0])
+            if record.winner == player:
+                entry[0] += 1
+            elif record.winner is None:
+                entry[1] += 1
+            else:
+                entry[2] += 1
+            game.make_move(*move)
+            game.switch_player()
+
+    # Aggregated results of the side to move, per move in the game's frame
+    # and in total, or None for an unknown position. best_move is the move
+    # with the best score (wins plus half the draws, per game) among those
+    # played at least min_games times.
+    def lookup(self, game, min_games=1):
+        if game.geometry is not self.geometry:
+            return None
+        key, symmetry = game.canonical_hash()
+        cells = {}
+        for segment in self.segments:
+            for cell, wins, draws, losses in segment.find(key):
+                totals = cells.get(cell, (0, 0, 0))
+                cells[cell] = (totals[0] + wins, totals[1] + draws, totals[2] + losses)
+        if not cells:
+            return None
+
+        occupied = game.occupied()
+        moves = {}
+        for cell, totals in cells.items():
+            move = inverse_transform_move(self.geometry.cell_coords[cell], symmetry, self.geometry)
+            # A colliding key could name an occupied cell; never report it.
+            if not occupied & self.geometry.cell_bits[self.geometry.cell_of[move]]:
+                moves[move] = totals
+        if not moves:
+            return None
+
+        def score(move):
+            wins, draws, losses = moves[move]
+            games = wins + draws + losses
+            return (wins + draws / 2) / games, games
+
+        candidates = [move for move, totals in moves.items() if sum(totals) >= min_games]
+        best_move = max(candidates, key=score) if candidates else None
+        return {
+            "games": sum(sum(totals) for totals in moves.values()),
+            "wins": sum(totals[0] for totals in moves.values()),
+            "draws": sum(totals[1] for totals in moves.values()),
+            "losses": sum(totals[2] for totals in moves.values()),
+            "moves": moves,
+            "best_move": best_move,
+            "best_score": score(best_move)[0] if best_move else None
+        }
+
+    # Lookup by a CubicGame.get_game_state() string.
+    def lookup_state(self, state, min_games=1):
+        return self.lookup(CubicGame.from_game_state(state, self.geometry), min_games)
+
+    # None unless the best-scoring move has min_games games and scores at
+    # least min_score, so losing experience never replaces a search.
+    def best_move(self, game, min_games=POSITION_DB_MIN_GAMES, min_score=POSITION_DB_MIN_SCORE):
+        entry = self.lookup(game, min_games)
+        if entry is None or entry["best_move"] is None or entry["best_score"] < min_score:
+            return None
+        return entry["best_move"]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[2] not in ("add", "query", "compact"):
+        print("usage: python position_db.py DB_DIR add RECORDS.qgr... | query STATE | compact")
+        sys.exit(1)
+    database = PositionDatabase(sys.argv[1])
+    try:
+        if sys.argv[2] == "add":
+            for record_path in sys.argv[3:]:
+                print(f"{record_path}: {database.add_record_file(record_path)} games")
+        elif sys.argv[2] == "query":
+            print(database.lookup_state(sys.argv[3]))
+        else:
+            database.compact()
+        print(f"{len(database)} entries in {len(database.segments)} segments")
+    finally:
+        database.close()
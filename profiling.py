@@ -0,0 +1,161 @@
+import sys
+import time
+import pstats
+import cProfile
+from game import CubicGame
+from constants import *
+
+# Player methods timed by SearchProfiler. They are wrapped on the instance,
+# so other players and games are untouched. enter_move and leave_move carry
+# make/unmake (and game.copy with use_copy_search).
+PROFILED_METHODS = (
+    "choose_move", "iterative_deepening_search", "alpha_beta_search", "alpha_beta_minimax",
+    "get_ordered_moves", "enter_move", "leave_move", "position_key", "probe_transposition",
+    "store_transposition", "evaluate", "comprehensive_evaluate", "quick_evaluate",
+    "find_immediate_win", "find_double_threat_move", "find_forcing_move",
+    "solve_endgame", "principal_variation"
+)
+OUTPUT_PREFIX = "search_profile"
+
+
+class SearchProfiler:
+    # Per function: calls, self time and inclusive time (counted once for
+    # recursive calls), plus self time per call stack for flame graphs.
+    # Only the thread running the search should be profiled; stop pondering
+    # first.
+    def __init__(self, ai):
+        self.ai = ai
+        self.originals = {}
+        self.reset()
+
+    def reset(self):
+        self.stats = {}
+        self.stacks = {}
+        # One [path, child time] per active call, and the active calls per name.
+        self.frames = []
+        self.active = {}
+
+    def install(self):
+        for name in PROFILED_METHODS:
+            if name not in self.originals and hasattr(self.ai, name):
+                self.originals[name] = getattr(self.ai, name)
+                setattr(self.ai, name, self.wrap(name, self.originals[name]))
+
+    def uninstall(self):
+        for name in self.originals:
+            delattr(self.ai, name)
+        self.originals = {}
+
+    def wrap(self, name, function):
+        frames = self.frames
+        active = self.active
+        stacks = self.stacks
+        entry = self.stats.setdefault(name, [0, 0.0, 0.0])
+        clock = time.perf_counter
+
+        def profiled(*args, **kwargs):
+            path = frames[-1][0] + (name,) if frames else (name,)
+            frame = [path, 0.0]
+            frames.append(frame)
+            active[name] = active.get(name, 0) + 1
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                frames.pop()
+                active[name] -= 1
+                own = elapsed - frame[1]
+                entry[0] += 1
+                entry[1] += own
+                if not active[name]:
+                    entry[2] += elapsed
+                if frames:
+                    frames[-1][1] += elapsed
+                stacks[path] = stacks.get(path, 0.0) + own
+        return profiled
+
+    # Rows sorted by self time: function, calls, self and inclusive seconds
+    # and self microseconds per call.
+    def table(self):
+        rows = [
+            {
+                "function": name,
+                "calls": calls,
+                "self_time": round(own, 6),
+                "total_time": round(total, 6),
+                "per_call_us": round(own / calls * 1e6, 3) if calls else 0.0
+            }
+            for name, (calls, own, total) in self.stats.items() if calls
+        ]
+        rows.sort(key=lambda row: row["self_time"], reverse=True)
+        return rows
+
+    def format_table(self):
+        lines = [f"{'function':<28}{'calls':>10}{'self s':>10}{'total s':>10}{'us/call':>10}"]
+        for row in self.table():
+            lines.append(f"{row['function']:<28}{row['calls']:>10}{row['self_time']:>10.4f}"
+                         f"{row['total_time']:>10.4f}{row['per_call_us']:>10.2f}")
+        return "\n".join(lines)
+
+    # Collapsed stacks, "outer;inner microseconds" per line, the input of
+    # flamegraph.pl, speedscope and similar tools.
+    def collapsed_stacks(self):
+        return [f"{';'.join(path)} {int(own * 1e6)}" for path, own in sorted(self.stacks.items())
+                if int(own * 1e6) > 0]
+
+    def write_collapsed(self, path):
+        with open(path, "w", encoding="utf-8") as output:
+            output.write("\n".join(self.collapsed_stacks()) + "\n")
+
+
+# Runs find_best_move under cProfile; writes the raw stats to path (for
+# pstats or snakeviz) when given. Returns (move, pstats.Stats).
+def cprofile_search(ai, game, path=None):
+    profile = cProfile.Profile()
+    move = profile.runcall(ai.find_best_move, game)
+    if path:
+        profile.dump_stats(path)
+    return move, pstats.Stats(profile)
+
+
+def profile_position(state, depth=None, difficulty=4, use_cprofile=False, prefix=OUTPUT_PREFIX):
+    from ai_player import AdvancedAIPlayer
+
+    game = CubicGame.from_game_state(state)
+    ai = AdvancedAIPlayer(game.current_player, difficulty=difficulty, verbose=False)
+    if depth is not None:
+        ai.depth = depth
+        ai.max_time = 1000
+    try:
+        if use_cprofile:
+            move, stats = cprofile_search(ai, game, prefix + ".prof")
+            with open(prefix + ".txt", "w", encoding="utf-8") as output:
+                stats.stream = output
+                stats.sort_stats("tottime").print_stats(40)
+            return move, ai.get_metrics(), [prefix + ".prof", prefix + ".txt"]
+
+        profiler = ai.enable_profiling()
+        move = ai.find_best_move(game)
+        ai.disable_profiling()
+        profiler.write_collapsed(prefix + ".collapsed")
+        with open(prefix + ".txt", "w", encoding="utf-8") as output:
+            output.write(profiler.format_table() + "\n")
+        return move, ai.get_metrics(), [prefix + ".collapsed", prefix + ".txt"]
+    finally:
+        ai.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python profiling.py STATE [DEPTH] [--cprofile]")
+        print("STATE is CubicGame.get_game_state(): 64 cells of X, O or . and the side to move")
+        sys.exit(1)
+    arguments = [arg for arg in sys.argv[1:] if arg != "--cprofile"]
+    search_depth = int(arguments[1]) if len(arguments) > 1 else None
+    best, metrics, files = profile_position(arguments[0], search_depth, use_cprofile="--cprofile" in sys.argv)
+    print("===== SEARCH PROFILE =====")
+    print(f"move: {best}  nodes: {metrics['nodes']}  depth: {metrics['depth_reached']}  time: {metrics['time']}")
+    with open(files[-1], encoding="utf-8") as table:
+        print(table.read())
+    print("written: " + ", ".join(files))
@@ -0,0 +1,59 @@
+import math
+import time
+import threading
+from constants import *
+
+
+# Raised inside a search when its controller stops it. Searches catch it
+# where they can fall back on their last completed iteration.
+class SearchCancelled(Exception):
+    pass
+
+
+class SearchController:
+    def __init__(self, poll_interval=SEARCH_POLL_NODES):
+        self.poll_interval = poll_interval
+        self.cancel_event = threading.Event()
+        self.start_time = time.perf_counter()
+        self.deadline = None
+        self.countdown = poll_interval
+        self.stopped = False
+
+    # time_limit is in seconds; None runs until cancel() is called.
+    def start(self, time_limit=None):
+        self.cancel_event.clear()
+        self.start_time = time.perf_counter()
+        self.deadline = None if time_limit is None else self.start_time + time_limit
+        self.countdown = self.poll_interval
+        self.stopped = False
+
+    # Safe to call from any thread, e.g. the UI while the search runs.
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def remaining(self):
+        if self.deadline is None:
+            return math.inf
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def should_stop(self):
+        if not self.stopped:
+            self.stopped = self.cancel_event.is_set() or \
+                (self.deadline is not None and time.perf_counter() >= self.deadline)
+        return self.stopped
+
+    # Called once per node; only every poll_interval-th call looks at the
+    # clock and the cancel flag.
+    def poll(self):
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.countdown = self.poll_interval
+            if self.should_stop():
+                raise SearchCancelled()
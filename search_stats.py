@@ -0,0 +1,49 @@
+# Events passed to search listeners as listener(event, data):
+#   ITERATION  after each completed iterative-deepening iteration, with the
+#              iteration's stats (see AdvancedAIPlayer.record_iteration_stats)
+#   MOVE       when find_best_move returns, with get_metrics() and the move
+# Listeners run on the searching thread, which for the UI and pondering is
+# not the main one.
+ITERATION = "iteration"
+MOVE = "move"
+
+
+class SearchListeners:
+    def __init__(self):
+        self.callbacks = []
+
+    def add(self, callback):
+        if callback not in self.callbacks:
+            self.callbacks.append(callback)
+
+    def remove(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    # Lets callers skip building event data when nobody is listening.
+    def __bool__(self):
+        return bool(self.callbacks)
+
+    def emit(self, event, data):
+        for callback in list(self.callbacks):
+            callback(event, data)
+
+
+# The uniform branching factor b of a tree of depth d with this many nodes,
+# from nodes = b + b^2 + ... + b^d, found by bisection.
+def effective_branching_factor(nodes, depth):
+    if depth <= 0 or nodes <= depth:
+        return 1.0 if depth > 0 and nodes > 0 else 0.0
+    low, high = 1.0, float(nodes)
+    for _ in range(60):
+        middle = (low + high) / 2
+        total = sum(middle ** ply for ply in range(1, depth + 1))
+        if total < nodes:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2
+
+
+def rate(part, whole):
+    return part / whole if whole else 0.0
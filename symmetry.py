@@ -0,0 +1,80 @@
+from constants import *
+from bitboard import *
+
+# The board automorphisms are built by the geometry (see
+# Geometry.symmetries): on the cube, its rotations and reflections with the
+# middle-swap and inside-out maps give the full group of 192. The module
+# tables are the cube's; every function takes the geometry of other boards.
+SYMMETRIES = DEFAULT_GEOMETRY.symmetries
+INVERSE_SYMMETRIES = DEFAULT_GEOMETRY.inverse_symmetries
+SYMMETRIC_ZOBRIST = DEFAULT_GEOMETRY.symmetric_zobrist
+
+
+def transform_bits(bits, symmetry, geometry=DEFAULT_GEOMETRY):
+    perm = geometry.symmetries[symmetry]
+    cell_bits = geometry.cell_bits
+    result = 0
+    for index in iter_bits(bits):
+        result |= cell_bits[perm[index]]
+    return result
+
+
+def transform_move(move, symmetry, geometry=DEFAULT_GEOMETRY):
+    return geometry.cell_coords[geometry.symmetries[symmetry][geometry.cell_of[tuple(move)]]]
+
+
+def inverse_transform_move(move, symmetry, geometry=DEFAULT_GEOMETRY):
+    return geometry.cell_coords[geometry.inverse_symmetries[symmetry][geometry.cell_of[tuple(move)]]]
+
+
+def symmetric_hashes(x_bits, o_bits, geometry=DEFAULT_GEOMETRY):
+    hashes = [0] * len(geometry.symmetries)
+    for player, bits in ((PLAYER_X, x_bits), (PLAYER_O, o_bits)):
+        for index in iter_bits(bits):
+            hashes = [h ^ k for h, k in zip(hashes, geometry.symmetric_zobrist[player][index])]
+    return hashes
+
+
+def canonical_from_hashes(hashes, current_player, geometry=DEFAULT_GEOMETRY):
+    key = min(hashes)
+    symmetry = hashes.index(key)
+    if current_player == PLAYER_O:
+        key ^= geometry.zobrist_side
+    return key, symmetry
+
+
+def canonical_hash(x_bits, o_bits, current_player, geometry=DEFAULT_GEOMETRY):
+    return canonical_from_hashes(symmetric_hashes(x_bits, o_bits, geometry), current_player, geometry)
+
+
+def canonical_position(x_bits, o_bits, geometry=DEFAULT_GEOMETRY):
+    best = None
+    for symmetry in range(len(geometry.symmetries)):
+        candidate = (transform_bits(x_bits, symmetry, geometry), transform_bits(o_bits, symmetry, geometry))
+        if best is None or candidate < best[0]:
+            best = (candidate, symmetry)
+    (canonical_x, canonical_o), symmetry = best
+    return canonical_x, canonical_o, symmetry
+
+
+def stabilizer(x_bits, o_bits, geometry=DEFAULT_GEOMETRY):
+    return [
+        symmetry for symmetry in range(len(geometry.symmetries))
+        if transform_bits(x_bits, symmetry, geometry) == x_bits
+        and transform_bits(o_bits, symmetry, geometry) == o_bits
+    ]
+
+
+def unique_moves(x_bits, o_bits, moves, geometry=DEFAULT_GEOMETRY):
+    symmetries = stabilizer(x_bits, o_bits, geometry)
+    if len(symmetries) == 1:
+        return moves
+    seen = set()
+    unique = []
+    for move in moves:
+        index = geometry.cell_of[move]
+        representative = min(geometry.symmetries[symmetry][index] for symmetry in symmetries)
+        if representative not in seen:
+            seen.add(representative)
+            unique.append(move)
+    return unique
@@ -1,98 +1,310 @@
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-import time
-from game import CubicGame
-from ai_player import AdvancedAIPlayer
-from constants import *
-
-def test_ai_performance():
-    """اختبار أداء الذكاء الاصطناعي"""
-    print("  Testing AI performance...")
-    
-    # إنشاء لعبة جديدة
-    game = CubicGame()
-    
-    # إنشاء AI مع الصعوبة بدلاً من العمق
-    ai = AdvancedAIPlayer(PLAYER_O, difficulty=1)
-    
-    # اختبار سرعة AI
-    start_time = time.time()
-    
-    # جعل AI يلعب عدة حركات
-    moves_to_test = 3
-    moves_made = 0
-    
-    for i in range(moves_to_test):
-        if game.game_over:
-            break
-            
-        # جعل اللاعب البشري يلعب حركة عشوائية أولاً
-        possible_moves = game.get_possible_moves()
-        if possible_moves:
-            # حركة بشرية عشوائية
-            x, y, z = possible_moves[0]
-            game.make_move(x, y, z)
-            game.switch_player()
-            
-            # حركة AI
-            if not game.game_over:
-                ai_move = ai.find_best_move(game)
-                if ai_move:
-                    x, y, z = ai_move
-                    game.make_move(x, y, z)
-                    game.switch_player()
-                    moves_made += 1
-    
-    end_time = time.time()
-    execution_time = end_time - start_time
-    
-    print(f"    AI made {moves_made} moves in {execution_time:.2f} seconds")
-    
-    if execution_time < 10:  # أقل من 10 ثواني
-        print("    PASS: AI performance acceptable")
-        return True
-    else:
-        print("    FAIL: AI too slow")
-        return False
-
-def test_ai_smart_moves():
-    """اختبار أن الذكاء الاصطناعي يلعب حركات ذكية"""
-    print("  Testing AI smart moves...")
-    
-    game = CubicGame()
-    ai = AdvancedAIPlayer(PLAYER_O, difficulty=3)
-    
-    # حركة بشرية أولى
-    game.make_move(1, 1, 1)  # مركز
-    game.switch_player()
-    
-    # حركة AI
-    ai_move = ai.find_best_move(game)
-    
-    if ai_move:
-        x, y, z = ai_move
-        print(f"    AI chose position: ({x}, {y}, {z})")
-        
-        # التحقق من أن الحركة منطقية (ليست عشوائية)
-        if (x, y, z) in [(1, 1, 2), (1, 2, 1), (2, 1, 1), (1, 1, 0), (1, 0, 1), (0, 1, 1)]:
-            print("    PASS: AI made a strategic move")
-            return True
-        else:
-            print("    WARNING: AI move might not be optimal")
-            return True  # لا نعتبر هذا فشلاً
-    else:
-        print("    FAIL: AI returned no move")
-        return False
-
-if __name__ == "__main__":
-    print("Testing AI functionality...")
-    
-    success1 = test_ai_performance()
-    success2 = test_ai_smart_moves()
-    
-    if success1 and success2:
-        print("SUCCESS: All AI tests passed!")
-    else:
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import math
+import time
+import threading
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from transposition import *
+from bitboard import cell_index
+from search_control import SearchCancelled
+from constants import *
+
+def test_ai_performance():
+    """اختبار أداء الذكاء الاصطناعي"""
+    print("  Testing AI performance...")
+    
+    # إنشاء لعبة جديدة
+    game = CubicGame()
+    
+    # إنشاء AI مع الصعوبة بدلاً من العمق
+    ai = AdvancedAIPlayer(PLAYER_O, difficulty=1)
+    
+    # اختبار سرعة AI
+    start_time = time.time()
+    
+    # جعل AI يلعب عدة حركات
+    moves_to_test = 3
+    moves_made = 0
+    
+    for i in range(moves_to_test):
+        if game.game_over:
+            break
+            
+        # جعل اللاعب البشري يلعب حركة عشوائية أولاً
+        possible_moves = game.get_possible_moves()
+        if possible_moves:
+            # حركة بشرية عشوائية
+            x, y, z = possible_moves[0]
+            game.make_move(x, y, z)
+            game.switch_player()
+            
+            # حركة AI
+            if not game.game_over:
+                ai_move = ai.find_best_move(game)
+                if ai_move:
+                    x, y, z = ai_move
+                    game.make_move(x, y, z)
+                    game.switch_player()
+                    moves_made += 1
+    
+    end_time = time.time()
+    execution_time = end_time - start_time
+    
+    print(f"    AI made {moves_made} moves in {execution_time:.2f} seconds")
+    
+    if execution_time < 10:  # أقل من 10 ثواني
+        print("    PASS: AI performance acceptable")
+        return True
+    else:
+        print("    FAIL: AI too slow")
+        return False
+
+def test_ai_smart_moves():
+    """اختبار أن الذكاء الاصطناعي يلعب حركات ذكية"""
+    print("  Testing AI smart moves...")
+    
+    game = CubicGame()
+    ai = AdvancedAIPlayer(PLAYER_O, difficulty=3)
+    
+    # حركة بشرية أولى
+    game.make_move(1, 1, 1)  # مركز
+    game.switch_player()
+    
+    # حركة AI
+    ai_move = ai.find_best_move(game)
+    
+    if ai_move:
+        x, y, z = ai_move
+        print(f"    AI chose position: ({x}, {y}, {z})")
+        
+        # التحقق من أن الحركة منطقية (ليست عشوائية)
+        if (x, y, z) in [(1, 1, 2), (1, 2, 1), (2, 1, 1), (1, 1, 0), (1, 0, 1), (0, 1, 1)]:
+            print("    PASS: AI made a strategic move")
+            return True
+        else:
+            print("    WARNING: AI move might not be optimal")
+            return True  # لا نعتبر هذا فشلاً
+    else:
+        print("    FAIL: AI returned no move")
+        return False
+
+def test_make_unmake_matches_copy():
+    """اختبار أن البحث في المكان يطابق البحث بالنسخ"""
+    print("  Testing make/unmake search against copy search...")
+    
+    game = CubicGame()
+    for x, y, z in [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    state_before = game.get_game_state()
+    
+    results = []
+    for use_copy in (True, False):
+        ai = AdvancedAIPlayer(game.current_player, difficulty=3, use_copy_search=use_copy)
+        ai.max_time = 1000
+        move, value = ai.alpha_beta_search(game, 3)
+        results.append((move, value, ai.nodes_evaluated))
+    
+    assert results[0] == results[1], f"Search modes disagree: {results}"
+    assert game.get_game_state() == state_before, "Make/unmake search must restore the board"
+    print(f"    PASS: Both modes chose {results[0][0]} after {results[0][2]} nodes")
+
+def test_transposition_table_replacement():
+    """اختبار جدول التحويل وسياسة الاستبدال"""
+    print("  Testing transposition table replacement...")
+    
+    table = TranspositionTable(size=16)
+    table.new_search()
+    table.store(5, 4, EXACT, 120, 7)
+    table.store(21, 2, LOWER_BOUND, 50, 3)
+    assert table.probe(5) == (4, EXACT, 120, 7), "Deeper entry should survive a shallower store"
+    assert table.probe(21) is None, "Shallower colliding entry should be rejected"
+    
+    table.new_search()
+    table.store(21, 1, UPPER_BOUND, -40, 2)
+    assert table.probe(21) == (1, UPPER_BOUND, -40, 2), "Entries from older searches are replaceable"
+    assert table.probe(5) is None, "Replaced entry should be gone"
+    print("    PASS: Depth-preferred replacement works")
+
+def test_mate_scores_survive_the_table():
+    """اختبار أن قيم الفوز المخزنة تحتفظ بالمسافة الصحيحة"""
+    print("  Testing mate distances through the transposition table...")
+    
+    game = CubicGame()
+    for x, y, z in [(0, 0, 0), (3, 3, 0), (0, 0, 1), (3, 3, 1), (0, 0, 2), (3, 2, 0)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    
+    fresh = AdvancedAIPlayer(PLAYER_X, difficulty=3, verbose=False)
+    fresh.max_time = 1000
+    fresh.controller.start()
+    expected = fresh.alpha_beta_minimax(game, 3, -math.inf, math.inf, True)
+    
+    ai = AdvancedAIPlayer(PLAYER_X, difficulty=3, verbose=False)
+    ai.max_time = 1000
+    ai.controller.start()
+    deep = ai.alpha_beta_minimax(game, 5, -math.inf, math.inf, True)
+    shallow = ai.alpha_beta_minimax(game, 3, -math.inf, math.inf, True)
+    assert ai.transposition_table.probe(game.hash)[0] == 5, "The deep result should be in the table"
+    assert deep == WIN_SCORE + 4 * 1000, f"A win on the next move at depth 5, got {deep}"
+    assert shallow == expected == WIN_SCORE + 2 * 1000, f"Table hit changed the win distance: {shallow}"
+    print(f"    PASS: Depth 5 gives {deep}, a table hit at depth 3 gives {shallow}")
+
+def test_pvs_matches_alpha_beta():
+    """اختبار أن بحث PVS يعطي نفس القيمة"""
+    print("  Testing principal-variation search...")
+    
+    game = CubicGame()
+    for x, y, z in [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2), (0, 3, 0), (1, 1, 2)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    
+    results = []
+    for use_pvs in (False, True):
+        ai = AdvancedAIPlayer(game.current_player, difficulty=3, use_pvs=use_pvs)
+        ai.max_time = 1000
+        move, value = ai.alpha_beta_search(game.copy(), 4)
+        results.append((value, ai.nodes_evaluated))
+    
+    assert results[0][0] == results[1][0], f"PVS changed the root value: {results}"
+    assert results[1][1] <= results[0][1], "PVS should not search more nodes here"
+    
+    ai = AdvancedAIPlayer(game.current_player, difficulty=3)
+    ai.max_time = 1000
+    ai.find_best_move(game)
+    assert ai.depth_reached == ai.depth, "Every iteration should complete without a time limit"
+    print(f"    PASS: Same value, {results[0][1]} -> {results[1][1]} nodes")
+
+def test_pondering_resumes_search():
+    """اختبار استئناف البحث بعد التفكير المسبق"""
+    print("  Testing pondering on the predicted reply...")
+    
+    game = CubicGame()
+    for x, y, z in [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    
+    ai = AdvancedAIPlayer(game.current_player, difficulty=3, verbose=False)
+    ai.threat_depth = 0
+    ai.max_time = 1000
+    game.make_move(*ai.find_best_move(game))
+    game.switch_player()
+    
+    ai.start_pondering(game)
+    ai.ponder_thread.join()
+    x, y, z, _ = ai.ponder_history[-1]
+    game.make_move(x, y, z)
+    game.switch_player()
+    move = ai.find_best_move(game)
+    assert move in game.get_possible_moves(), "Ponder hit returned an illegal move"
+    assert ai.get_metrics()["ponder_hit"], "The predicted reply should be a ponder hit"
+    assert ai.depth_reached == ai.depth and ai.nodes_evaluated == 0, "A finished ponder needs no new search"
+    
+    # A stopped ponder on a different reply is a miss and searches normally.
+    game.make_move(*move)
+    game.switch_player()
+    ai.start_pondering(game)
+    predicted = ai.ponder_history[-1][:3]
+    other = next(m for m in game.get_possible_moves() if m != predicted)
+    game.make_move(*other)
+    game.switch_player()
+    ai.find_best_move(game)
+    assert not ai.ponder_hit and not ai.pondering, "A different reply is a ponder miss"
+    assert ai.depth_reached == ai.depth, "The miss should search normally"
+    print(f"    PASS: Ponder hit answered {move} at depth {ai.depth_reached}")
+
+def test_move_ordering():
+    """اختبار ترتيب الحركات"""
+    print("  Testing move ordering...")
+    
+    game = CubicGame()
+    for x, y, z in [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    
+    ai = AdvancedAIPlayer(game.current_player, difficulty=3, use_pvs=False, verbose=False)
+    ai.max_time = 1000
+    ai.alpha_beta_search(game.copy(), 3)
+    ordering = ai.move_ordering
+    killer_plies = [ply for ply, slots in enumerate(ordering.killers) if slots[0] != NO_MOVE]
+    assert killer_plies, "Cutoffs should record killer moves"
+    assert all(game.move_count <= ply < game.move_count + 3 for ply in killer_plies), \
+        "Killers must be keyed by the ply they are read at"
+    assert any(ordering.history[game.current_player]), "Cutoffs should feed the history table"
+    metrics = ai.get_metrics()
+    assert metrics["cutoffs"] > 0 and 0 < metrics["first_move_cutoff_rate"] <= 1, "Cutoff rate should be reported"
+    
+    # The TT move leads, then a block of the opponent's winning cell.
+    for x, y, z in [(0, 0, 1), (3, 3, 0), (0, 0, 2)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    moves = ordering.order_moves(game, cell_index(3, 0, 0))
+    assert moves[:2] == [(3, 0, 0), (0, 0, 3)], "TT move first, then the block"
+    print(f"    PASS: {metrics['cutoffs']} cutoffs, {metrics['first_move_cutoff_rate']:.0%} on the first move")
+
+def test_search_cancellation():
+    """اختبار إلغاء البحث والمهلة الزمنية"""
+    print("  Testing search cancellation and deadlines...")
+    
+    game = CubicGame()
+    for x, y, z in [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1)]:
+        game.make_move(x, y, z)
+        game.switch_player()
+    
+    # A cancelled search unwinds and leaves the game as it was.
+    ai = AdvancedAIPlayer(game.current_player, difficulty=3, verbose=False)
+    search_game = game.copy()
+    ai.controller.start()
+    ai.cancel_search()
+    try:
+        ai.alpha_beta_search(search_game, 4)
+        assert False, "A cancelled search should raise SearchCancelled"
+    except SearchCancelled:
+        pass
+    assert search_game.hash == game.hash and search_game.move_history == game.move_history, \
+        "Unwinding must undo every move"
+    
+    # Cancel from another thread, as the UI does.
+    ai = AdvancedAIPlayer(game.current_player, difficulty=5, verbose=False)
+    ai.threat_depth = 0
+    ai.depth = 12
+    ai.max_time = 1000
+    result = []
+    worker = threading.Thread(target=lambda: result.append(ai.find_best_move(game)))
+    worker.start()
+    time.sleep(0.5)
+    ai.cancel_search()
+    worker.join(5)
+    assert not worker.is_alive(), "Cancel should stop the search"
+    assert ai.search_cancelled and 0 < ai.depth_reached < ai.depth, "Only completed iterations count"
+    assert result[0] == ai.completed_iterations[0], "The last completed iteration gives the move"
+    
+    # A short deadline is kept to within a few polls.
+    ai.max_time = 0.2
+    start_time = time.perf_counter()
+    move = ai.find_best_move(game)
+    elapsed = time.perf_counter() - start_time
+    assert move in game.get_possible_moves(), "A timed-out search still returns a legal move"
+    assert elapsed < 0.5, f"Deadline overrun: {elapsed:.3f}s"
+    print(f"    PASS: Cancelled at depth {ai.depth_reached}, 0.2s deadline kept in {elapsed:.3f}s")
+
+if __name__ == "__main__":
+    print("Testing AI functionality...")
+    
+    success1 = test_ai_performance()
+    success2 = test_ai_smart_moves()
+    test_make_unmake_matches_copy()
+    test_transposition_table_replacement()
+    test_mate_scores_survive_the_table()
+    test_pvs_matches_alpha_beta()
+    test_pondering_resumes_search()
+    test_move_ordering()
+    test_search_cancellation()
+    
+    if success1 and success2:
+        print("SUCCESS: All AI tests passed!")
+    else:
         print("FAIL: Some AI tests failed!")
\ No newline at end of file
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from constants import *
+
+try:
+    import numpy as np
+    from batch_eval import *
+except ImportError:
+    np = None
+
+def random_games(count, seed):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        game = CubicGame()
+        for _ in range(rng.randrange(BOARD_SIZE ** 3)):
+            if game.game_over:
+                break
+            game.make_move(*rng.choice(game.get_possible_moves()))
+            game.switch_player()
+        games.append(game)
+    return games
+
+def test_line_counts_match_game():
+    print("  Testing batched line counts...")
+    if np is None:
+        print("    SKIP: numpy is not installed")
+        return
+    games = random_games(50, 1)
+    boards, _ = encode_games(games)
+    x_counts, o_counts = line_counts(boards)
+    for row, game in enumerate(games):
+        assert list(x_counts[row]) == game.line_counts[PLAYER_X], "X line counts differ"
+        assert list(o_counts[row]) == game.line_counts[PLAYER_O], "O line counts differ"
+        assert list(open_line_histogram(x_counts, o_counts)[row]) == game.open_lines[PLAYER_X], \
+            "Open line histogram differs"
+        cells = winning_cells(boards, x_counts, o_counts)[row]
+        assert sum(1 << index for index in range(64) if cells[index]) == game.threat_cells[PLAYER_X], \
+            "Winning cells differ"
+    print("    PASS: Line counts, open lines and winning cells match the game")
+
+def test_batch_matches_comprehensive_evaluate():
+    print("  Testing the batch evaluator against comprehensive_evaluate...")
+    if np is None:
+        print("    SKIP: numpy is not installed")
+        return
+    games = random_games(200, 2)
+    boards, current_players = encode_games(games)
+    for player in (PLAYER_X, PLAYER_O):
+        ai = AdvancedAIPlayer(player, verbose=False)
+        expected = [ai.comprehensive_evaluate(game) for game in games]
+        assert list(batch_evaluate(boards, player, current_players)) == expected, f"Scores differ for {player}"
+        assert list(batch_evaluate(boards, player)) == expected, "Side to move should follow the stone counts"
+    print(f"    PASS: {len(games)} positions score identically for both players")
+
+if __name__ == "__main__":
+    print("Testing the batch evaluator...")
+    test_line_counts_match_game()
+    test_batch_matches_comprehensive_evaluate()
+    print("SUCCESS: All batch evaluator tests passed!")
@@ -0,0 +1,179 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from game import CubicGame
+from bitboard import *
+from constants import *
+
+def play_random_moves(game, count, seed):
+    rng = random.Random(seed)
+    for _ in range(count):
+        if game.game_over:
+            break
+        x, y, z = rng.choice(game.get_possible_moves())
+        game.make_move(x, y, z)
+        game.switch_player()
+
+def board_from_bitboards(game):
+    board = [[[EMPTY for _ in range(BOARD_SIZE)]
+              for _ in range(BOARD_SIZE)]
+              for _ in range(BOARD_SIZE)]
+    for player in (PLAYER_X, PLAYER_O):
+        for index in iter_bits(game.bitboards[player]):
+            x, y, z = CELL_COORDS[index]
+            board[x][y][z] = player
+    return board
+
+def test_bitboard_matches_list_board():
+    print("  Testing bitboards against the list board...")
+    for seed in range(20):
+        game = CubicGame()
+        play_random_moves(game, 30, seed)
+        assert board_from_bitboards(game) == game.board, "Bitboards and list board disagree"
+        assert game.bitboards[PLAYER_X] & game.bitboards[PLAYER_O] == 0, "Players share a cell"
+        assert popcount(game.occupied()) == game.move_count, "Popcount differs from move count"
+    print("    PASS: Bitboards match the list board")
+
+def test_undo_restores_bitboards():
+    print("  Testing undo on bitboards...")
+    game = CubicGame()
+    play_random_moves(game, 10, 7)
+    snapshot = game.bitboards.copy()
+    game.make_move(*game.get_possible_moves()[0])
+    game.undo_move()
+    assert game.bitboards == snapshot, "Undo did not restore the bitboards"
+    while game.undo_move():
+        pass
+    assert game.occupied() == 0, "Undoing every move should empty the board"
+    print("    PASS: Undo restores bitboards")
+
+def test_possible_moves_order():
+    print("  Testing move generation order...")
+    game = CubicGame()
+    play_random_moves(game, 12, 3)
+    expected = []
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            for z in range(BOARD_SIZE):
+                if game.board[x][y][z] is EMPTY:
+                    expected.append((cell_weight(x, y, z), (x, y, z)))
+    expected.sort(reverse=True, key=lambda item: item[0])
+    assert game.get_possible_moves() == [move for _, move in expected], "Move order changed"
+    print("    PASS: Move generation keeps the weighted order")
+
+def test_is_full():
+    print("  Testing full board detection...")
+    game = CubicGame()
+    game.bitboards[PLAYER_X] = FULL_MASK
+    assert game.is_full(), "Full mask should be a full board"
+    print("    PASS: Full board detected")
+
+def has_line_by_directions(game, x, y, z, player):
+    for dx, dy, dz in DIRECTIONS:
+        count = 0
+        for i in range(-(WINNING_LENGTH - 1), WINNING_LENGTH):
+            nx, ny, nz = x + i*dx, y + i*dy, z + i*dz
+            if (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 0 <= nz < BOARD_SIZE
+                    and game.board[nx][ny][nz] == player):
+                count += 1
+                if count >= WINNING_LENGTH:
+                    return True
+            else:
+                count = 0
+    return False
+
+def test_winning_line_table():
+    print("  Testing precomputed winning lines...")
+    assert len(WINNING_LINES) == 76, "A 4x4x4 cube has 76 winning lines"
+    assert len(set(LINE_MASKS)) == 76, "Line masks should be distinct"
+    assert all(popcount(mask) == WINNING_LENGTH for mask in LINE_MASKS), "Every line has 4 cells"
+    assert sum(len(lines) for lines in CELL_LINES) == 76 * WINNING_LENGTH, "Cell map must cover every line"
+    assert max(len(lines) for lines in CELL_LINES) == 7, "No cell lies on more than 7 lines"
+    print("    PASS: 76 lines indexed by cell")
+
+def test_win_detection_matches_scan():
+    print("  Testing table win detection against a directional scan...")
+    for seed in range(40):
+        game = CubicGame()
+        play_random_moves(game, 40, seed)
+        for x, y, z in CELL_COORDS:
+            for player in (PLAYER_X, PLAYER_O):
+                if game.board[x][y][z] == player:
+                    expected = has_line_by_directions(game, x, y, z, player)
+                    assert game.check_win_optimized(x, y, z, player) == expected, "Win detection mismatch"
+        if game.winner:
+            assert len(game.winning_line) == WINNING_LENGTH, "Winning line should have 4 cells"
+            assert all(game.board[x][y][z] == game.winner for x, y, z in game.winning_line), "Winning line cells"
+    print("    PASS: Table win detection matches the scan")
+
+def rescan_line_state(game, player):
+    opponent = PLAYER_O if player == PLAYER_X else PLAYER_X
+    own_bits = game.bitboards[player]
+    opponent_bits = game.bitboards[opponent]
+    empty = ~game.occupied() & FULL_MASK
+    open_lines = [0] * (WINNING_LENGTH + 1)
+    threat_cells = 0
+    for mask in LINE_MASKS:
+        if not opponent_bits & mask:
+            count = popcount(own_bits & mask)
+            open_lines[count] += 1
+            if count == WINNING_LENGTH - 1:
+                threat_cells |= mask & empty
+    return open_lines, threat_cells
+
+def check_line_state(game):
+    for player in (PLAYER_X, PLAYER_O):
+        open_lines, threat_cells = rescan_line_state(game, player)
+        assert game.open_lines[player] == open_lines, "Open line totals drifted"
+        assert game.threat_cells[player] == threat_cells, "Threat cells drifted"
+        assert game.line_counts[player] == [popcount(game.bitboards[player] & mask) for mask in LINE_MASKS], \
+            "Line counts drifted"
+        assert game.center_counts[player] == popcount(game.bitboards[player] & CENTER_MASK), "Centre count drifted"
+        assert game.corner_counts[player] == popcount(game.bitboards[player] & CORNER_MASK), "Corner count drifted"
+
+def test_incremental_line_state():
+    print("  Testing incremental line counts through make/undo...")
+    for seed in range(30):
+        game = CubicGame()
+        rng = random.Random(seed)
+        while not game.game_over:
+            game.make_move(*rng.choice(game.get_possible_moves()))
+            game.switch_player()
+            check_line_state(game)
+        while game.undo_move():
+            check_line_state(game)
+        assert game.open_lines[PLAYER_X][0] == len(LINE_MASKS), "Empty board should have every line open"
+    print("    PASS: Incremental line state matches a rescan")
+
+def test_zobrist_hash_incremental():
+    print("  Testing incremental Zobrist hashing...")
+    for seed in range(20):
+        game = CubicGame()
+        rng = random.Random(seed)
+        seen = {}
+        while not game.game_over:
+            game.make_move(*rng.choice(game.get_possible_moves()))
+            game.switch_player()
+            expected = zobrist_hash(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O], game.current_player)
+            assert game.hash == expected, "Incremental hash drifted"
+            seen[game.hash] = game.get_game_state()
+        while game.undo_move():
+            expected = zobrist_hash(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O], game.current_player)
+            assert game.hash == expected, "Hash not restored by undo"
+        assert game.hash == 0, "Empty board with X to move hashes to zero"
+        assert len(set(seen.values())) == len(seen), "Hash collision in a single game"
+    print("    PASS: Zobrist hash follows make/undo")
+
+if __name__ == "__main__":
+    print("Testing bitboard backend...")
+    test_bitboard_matches_list_board()
+    test_undo_restores_bitboards()
+    test_possible_moves_order()
+    test_is_full()
+    test_winning_line_table()
+    test_win_detection_matches_scan()
+    test_incremental_line_state()
+    test_zobrist_hash_incremental()
+    print("SUCCESS: All bitboard tests passed!")
@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+import tempfile
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from endgame import EndgameSolver, MATE_SCORE
+from geometry import get_geometry
+from bitboard import *
+from constants import *
+
+# Seeded self-play between weak players reaches the endgame without a
+# winning cell for the side to move, unlike a random fill.
+def late_position(seed, empty_cells):
+    while True:
+        random.seed(seed)
+        game = CubicGame()
+        players = {
+            player: AdvancedAIPlayer(player, difficulty=1, verbose=False, endgame_threshold=0)
+            for player in (PLAYER_X, PLAYER_O)
+        }
+        while not game.game_over and CELL_COUNT - game.move_count > empty_cells:
+            game.make_move(*players[game.current_player].find_best_move(game))
+            game.switch_player()
+        if not game.game_over and not game.threat_cells[game.current_player]:
+            return game
+        seed += 1000
+
+def brute_force(game, player, opponent, ply):
+    empty = ~game.occupied() & FULL_MASK
+    best = None
+    for index in iter_bits(empty):
+        x, y, z = CELL_COORDS[index]
+        if game.is_winning_move(x, y, z, player):
+            return MATE_SCORE - ply - 1
+        game.place_piece(x, y, z, player)
+        value = -brute_force(game, opponent, player, ply + 1)
+        game.remove_piece(x, y, z)
+        best = value if best is None else max(best, value)
+    return 0 if best is None else best
+
+def test_solver_matches_brute_force():
+    print("  Testing exact solving against brute force...")
+    for seed in range(6):
+        game = late_position(seed, 6)
+        opponent = PLAYER_O if game.current_player == PLAYER_X else PLAYER_X
+        expected = brute_force(game.copy(), game.current_player, opponent, 0)
+        value, move = EndgameSolver().solve(game)
+        assert value == expected, f"Seed {seed}: solver {value} != brute force {expected}"
+        assert move in game.get_possible_moves(), "Solver move must be legal"
+        child = game.copy()
+        child.make_move(*move)
+        if not child.game_over:
+            child.switch_player()
+            reply = EndgameSolver().solve(child)[0]
+            assert -reply + (1 if value > 0 else -1 if value < 0 else 0) == value, \
+                "The solver move should keep the solved value"
+    print("    PASS: Values and distances to mate match a full search")
+
+def test_distance_to_mate():
+    print("  Testing distance-to-mate scores...")
+    game = CubicGame()
+    for move in [(0, 0, 1), (3, 3, 3), (0, 0, 2), (3, 3, 2), (0, 1, 0), (3, 2, 3), (0, 2, 0), (2, 3, 3)]:
+        game.make_move(*move)
+        game.switch_player()
+    value, move = EndgameSolver().solve(game)
+    assert (value, move) == (MATE_SCORE - 3, (0, 0, 0)), "X forks at (0, 0, 0) and wins on ply 3"
+    game.make_move(*move)
+    game.switch_player()
+    value, move = EndgameSolver().solve(game)
+    assert value == -(MATE_SCORE - 2), "O can block only one of two winning cells"
+    assert move in ((0, 0, 3), (0, 3, 0)), "The loser still blocks"
+    print("    PASS: Win in 3 plies and loss in 2 plies")
+
+def test_persistent_cache():
+    print("  Testing the persistent solved-position cache...")
+    game = late_position(9, 10)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "endgame.sqlite")
+        first = EndgameSolver(path)
+        solved = first.solve(game)
+        first.close()
+
+        second = EndgameSolver(path)
+        second.nodes = 0
+        assert second.solve(game) == solved, "A new solver should read the stored solution"
+        assert second.nodes == 0, "A stored position needs no search"
+        second.close()
+
+        # Another board shape with the same bitboards must not see it.
+        other = EndgameSolver(path, geometry=get_geometry(4, 3, 3))
+        assert other.load(game, game.current_player) is None, "Solutions are kept per board shape"
+        other.close()
+    print(f"    PASS: Solution {solved} survives a new solver")
+
+def test_ai_uses_solver():
+    print("  Testing the AI endgame mode...")
+    game = late_position(4, 10)
+    ai = AdvancedAIPlayer(game.current_player, difficulty=1, verbose=False)
+    move = ai.find_best_move(game)
+    assert move in game.get_possible_moves(), "AI move must be legal"
+    if not game.threat_cells[game.current_player] and not game.threat_cells[ai.opponent_symbol]:
+        assert ai.depth_reached == 10, "The solver should search to the end of the game"
+    disabled = AdvancedAIPlayer(game.current_player, difficulty=1, verbose=False, endgame_threshold=0)
+    disabled.find_best_move(game)
+    assert disabled.endgame_solver is None, "Threshold 0 turns the solver off"
+    print(f"    PASS: Move {move}, value {ai.best_value}")
+
+if __name__ == "__main__":
+    print("Testing the endgame solver...")
+    test_solver_matches_brute_force()
+    test_distance_to_mate()
+    test_persistent_cache()
+    test_ai_uses_solver()
+    print("SUCCESS: All endgame tests passed!")
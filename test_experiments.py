@@ -0,0 +1,63 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import json
+import tempfile
+from ai_experiments import run_single_game, run_arena, wilson_interval
+from game_record import RecordReader
+from position_db import PositionDatabase
+from game import CubicGame
+from constants import *
+
+def test_wilson_interval():
+    print("  Testing Wilson confidence intervals...")
+    low, high = wilson_interval(5, 10)
+    assert low < 0.5 < high, "The interval should contain the observed rate"
+    assert abs((0.5 - low) - (high - 0.5)) < 1e-3, "A 50% rate gives a symmetric interval"
+    assert wilson_interval(0, 10)[0] == 0.0, "Zero successes start at zero"
+    assert wilson_interval(10, 10)[1] == 1.0, "All successes end at one"
+    assert wilson_interval(0, 0) == (0.0, 1.0), "No games means no information"
+    print(f"    PASS: 5/10 -> ({low}, {high})")
+
+def test_seeded_games_repeat():
+    print("  Testing seeded self-play...")
+    first = run_single_game(1, 1, 2, seed=7, verbose=False)
+    second = run_single_game(1, 1, 2, seed=7, verbose=False)
+    assert first["winner"] == second["winner"], "The same seed should replay the same game"
+    assert first["moves"] == second["moves"], "The same seed should replay the same game"
+    print(f"    PASS: Seed 7 replays {first['moves']} moves")
+
+def test_parallel_arena():
+    print("  Testing the parallel arena...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "arena.jsonl")
+        record_path = os.path.join(directory, "arena.qgr")
+        database_path = os.path.join(directory, "positions")
+        results = run_arena(games=4, difficulty_x=1, difficulty_o=1, workers=2, seed=3, output_path=path,
+                            record_path=record_path, position_db_path=database_path)
+        with open(path, encoding="utf-8") as output:
+            lines = [json.loads(line) for line in output]
+        with RecordReader(record_path) as reader:
+            records = list(reader)
+        database = PositionDatabase(database_path)
+        start = database.lookup(CubicGame())
+        database.close()
+    assert start["games"] == 4, "Every game should be added to the position database"
+    assert len(lines) == 4, "Every game should be streamed to the JSONL file"
+    assert sorted(len(record) for record in records) == sorted(line["moves"] for line in lines), \
+        "Every game should be appended to the record file"
+    assert all(record.game_over and len(record.depths) == len(record) for record in records), \
+        "Records should hold finished games with per-move depths"
+    assert sorted(line["seed"] for line in lines) == [3, 4, 5, 6], "Game i should use seed + i"
+    assert results["X_wins"] + results["O_wins"] + results["draws"] == 4, "Every game should be counted"
+    low, high = results["X_win_rate_ci"]
+    assert 0.0 <= low <= results["X_wins"] / 4 <= high <= 1.0, "The interval should contain the win rate"
+    print(f"    PASS: 4 games over {results['workers']} workers, X wins {results['X_wins']}")
+
+if __name__ == "__main__":
+    print("Testing experiment tools...")
+    test_wilson_interval()
+    test_seeded_games_repeat()
+    test_parallel_arena()
+    print("SUCCESS: All experiment tests passed!")
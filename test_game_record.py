@@ -0,0 +1,139 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pickle
+import random
+import tempfile
+from game import CubicGame
+from game_record import *
+from geometry import get_geometry
+from constants import *
+
+def random_game(seed, moves, geometry=None):
+    game = CubicGame(geometry)
+    rng = random.Random(seed)
+    for _ in range(moves):
+        if game.game_over:
+            break
+        game.make_move(*rng.choice(game.get_possible_moves()))
+        game.switch_player()
+    return game
+
+def won_game():
+    game = CubicGame()
+    for move in [(0, 0, 0), (3, 3, 0), (0, 0, 1), (3, 3, 1), (0, 0, 2), (3, 2, 0), (0, 0, 3)]:
+        game.make_move(*move)
+        if not game.game_over:
+            game.switch_player()
+    return game
+
+def test_save_and_load_restore_state():
+    print("  Testing save_game and load_game...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.qgr")
+        game = won_game()
+        game.save_game(path)
+        assert os.path.getsize(path) == FILE_HEADER.size + GAME_HEADER.size + 7, "One byte per move"
+        loaded = CubicGame()
+        loaded.load_game(path)
+    assert loaded.game_over and loaded.winner == PLAYER_X, "load_game must restore the result"
+    assert loaded.winning_line == game.winning_line, "load_game must restore the winning line"
+    assert loaded.move_history == game.move_history, "Move history changed"
+    assert loaded.current_player == game.current_player, "Side to move changed"
+    assert loaded.hash == game.hash and loaded.bitboards == game.bitboards, "Position changed"
+    print("    PASS: A won game loads as won, 23 bytes on disk")
+
+def test_streaming_round_trip():
+    print("  Testing appending and streaming many games...")
+    games = [random_game(seed, seed % 40) for seed in range(200)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.qgr")
+        with RecordWriter(path) as writer:
+            for game in games[:100]:
+                writer.write_game(game)
+        with RecordWriter(path) as writer:
+            for index, game in enumerate(games[100:]):
+                count = game.move_count
+                writer.write_game(game, evals=[index * 10 - move for move in range(count)],
+                                  depths=[move % 9 for move in range(count)], times=[0.5] * count)
+        with RecordReader(path) as reader:
+            records = list(reader)
+        with RecordReader(path) as reader:
+            replayed = list(reader.games())
+    assert len(records) == 200, "Every appended game should be read back"
+    for game, record, copy in zip(games, records, replayed):
+        assert record == GameRecord.from_game(game, record.evals, record.depths, record.times), \
+            "Record changed on disk"
+        assert copy.move_history == game.move_history and copy.game_over == game.game_over, "Replay changed"
+        assert copy.winner == game.winner and copy.current_player == game.current_player, "Replay changed"
+    assert records[0].evals is None and records[150].times == [0.5] * len(records[150]), "Fields lost"
+    assert records[150].evals == [50 * 10 - move for move in range(len(records[150]))], "Evals changed"
+    print("    PASS: 200 games written in two sessions and streamed back")
+
+def test_rejects_bad_files():
+    print("  Testing bad and mismatched files...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "games.qgr")
+        with RecordWriter(path) as writer:
+            writer.write_game(random_game(1, 10))
+        try:
+            RecordWriter(path, get_geometry(5, 5, 3))
+            assert False, "Appending another geometry must fail"
+        except ValueError:
+            pass
+        with open(path, "r+b") as record_file:
+            record_file.truncate(os.path.getsize(path) - 1)
+        try:
+            with RecordReader(path) as reader:
+                list(reader)
+            assert False, "A truncated game must be reported"
+        except ValueError:
+            pass
+        other = os.path.join(directory, "other.bin")
+        with open(other, "wb") as other_file:
+            other_file.write(b"not a record file")
+        try:
+            RecordReader(other)
+            assert False, "A foreign file must be rejected"
+        except ValueError:
+            pass
+    print("    PASS: Mismatched, truncated and foreign files are rejected")
+
+def test_other_geometry():
+    print("  Testing records of a 4x4x4x4 game...")
+    geometry = get_geometry(4, 4, 4)
+    game = random_game(4, 30, geometry)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "hyper.qgr")
+        game.save_game(path)
+        loaded = CubicGame()
+        loaded.load_game(path)
+    assert loaded.geometry is geometry, "The geometry comes from the file header"
+    assert loaded.move_history == game.move_history, "Move history changed"
+    print("    PASS: 256-cell boards still take one byte per move")
+
+def test_pickle_migration():
+    print("  Testing migration of pickled saves...")
+    game = won_game()
+    with tempfile.TemporaryDirectory() as directory:
+        old_path = os.path.join(directory, "save.pkl")
+        new_path = os.path.join(directory, "save.qgr")
+        with open(old_path, "wb") as old_file:
+            pickle.dump({'board': game.board, 'current_player': game.current_player,
+                         'move_history': game.move_history}, old_file)
+        migrate_pickle(old_path, new_path)
+        loaded = CubicGame()
+        loaded.load_game(new_path)
+    assert loaded.move_history == game.move_history, "Migration changed the moves"
+    assert loaded.game_over and loaded.winner == PLAYER_X, "Migrated games keep their result"
+    print("    PASS: Old saves convert to game records")
+
+if __name__ == "__main__":
+    print("Testing game records...")
+    test_save_and_load_restore_state()
+    test_streaming_round_trip()
+    test_rejects_bad_files()
+    test_other_geometry()
+    test_pickle_migration()
+    print("SUCCESS: All game record tests passed!")
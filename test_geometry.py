@@ -0,0 +1,133 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pickle
+import random
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from mcts_player import MCTSPlayer
+from geometry import Geometry, get_geometry, DEFAULT_GEOMETRY
+from bitboard import *
+from constants import *
+
+def random_game(geometry, seed, moves):
+    game = CubicGame(geometry)
+    rng = random.Random(seed)
+    for _ in range(moves):
+        if game.game_over:
+            break
+        game.make_move(*rng.choice(game.get_possible_moves()))
+        game.switch_player()
+    return game
+
+def test_default_geometry_tables():
+    print("  Testing the default cube tables...")
+    geometry = get_geometry()
+    assert geometry is DEFAULT_GEOMETRY, "get_geometry must cache instances"
+    assert geometry.cell_count == 64 and len(geometry.lines) == 76, "Qubic has 64 cells and 76 lines"
+    assert geometry.line_masks == LINE_MASKS and geometry.cell_lines == CELL_LINES, "Line tables changed"
+    assert geometry.move_order_bits == MOVE_ORDER_BITS, "Move order changed"
+    assert sorted(geometry.center_positions) == sorted(CENTER_POSITIONS), "Centre cells changed"
+    assert sorted(geometry.corner_positions) == sorted(CORNER_POSITIONS), "Corner cells changed"
+    for index, (x, y, z) in enumerate(geometry.cell_coords):
+        expected = POSITION_WEIGHTS[x][y] + POSITION_WEIGHTS[y][z] + POSITION_WEIGHTS[x][z]
+        if (x, y, z) in CENTER_POSITIONS:
+            expected += 2
+        if (x, y, z) in CORNER_POSITIONS:
+            expected += 1
+        assert geometry.cell_weights[index] == expected, f"Weight of {(x, y, z)} changed"
+    print("    PASS: The default geometry matches the 4x4x4 tables")
+
+def test_line_counts():
+    print("  Testing line enumeration...")
+    # ((n + 2)^d - n^d) / 2 lines of length n on an n^d board.
+    for size, dims in ((3, 3), (5, 3), (4, 4), (3, 4)):
+        geometry = get_geometry(size, size, dims)
+        expected = ((size + 2) ** dims - size ** dims) // 2
+        assert len(geometry.lines) == expected, f"{size}^{dims} should have {expected} lines"
+        assert len(set(geometry.line_masks)) == expected, "Lines must be distinct"
+    assert len(get_geometry(5, 4, 3).lines) == 302, "5x5x5 has 302 four-cell lines"
+    try:
+        Geometry(3, 4, 3)
+        assert False, "A line longer than the board must be rejected"
+    except ValueError:
+        pass
+    print("    PASS: Line counts match the closed form")
+
+def test_symmetries_preserve_lines():
+    print("  Testing symmetry groups of other shapes...")
+    for key, count in (((3, 3, 3), 48), ((5, 5, 3), 48 * 4), ((5, 4, 3), 48), ((4, 4, 4), 384 * 4)):
+        geometry = get_geometry(*key)
+        assert len(geometry.symmetries) == count, f"{key} should have {count} symmetries"
+        lines = set(geometry.line_masks)
+        for perm in geometry.symmetries:
+            for cells in geometry.line_cells:
+                assert sum(geometry.cell_bits[perm[index]] for index in cells) in lines, \
+                    f"A symmetry of {key} breaks a line"
+    print("    PASS: Every symmetry maps lines onto lines")
+
+def test_geometry_pickles_to_cached_instance():
+    print("  Testing geometry pickling...")
+    geometry = get_geometry(5, 5, 3)
+    assert pickle.loads(pickle.dumps(geometry)) is geometry, "Unpickling must return the cached geometry"
+    print("    PASS: Pickled geometries resolve to the shared instance")
+
+def test_larger_boards_play():
+    print("  Testing games on 5x5x5 and 4x4x4x4...")
+    for key in ((5, 5, 3), (4, 4, 4)):
+        geometry = get_geometry(*key)
+        game = random_game(geometry, 5, 10)
+        assert game.copy().geometry is geometry, "Copies must keep their geometry"
+        bits = geometry.bits_from_board(game.board)
+        assert bits[PLAYER_X] == game.bitboards[PLAYER_X] and bits[PLAYER_O] == game.bitboards[PLAYER_O], \
+            "Board and bitboards disagree"
+        ai = AdvancedAIPlayer(game.current_player, difficulty=2, verbose=False, geometry=geometry)
+        ai.max_time = 1000
+        move, _ = ai.alpha_beta_search(game, 2)
+        assert move in game.get_possible_moves(), f"Illegal move on {key}"
+        mcts = MCTSPlayer(game.current_player, difficulty=1, verbose=False, seed=1, geometry=geometry)
+        mcts.max_iterations = 100
+        assert mcts.find_best_move(game) in game.get_possible_moves(), f"Illegal MCTS move on {key}"
+    print("    PASS: Both engines play legal moves on larger boards")
+
+def test_win_on_hypercube():
+    print("  Testing a win along a 4D diagonal...")
+    geometry = get_geometry(4, 4, 4)
+    game = CubicGame(geometry)
+    filler = [(0, 1, 2, 3), (1, 0, 3, 2), (2, 3, 0, 1)]
+    for step in range(4):
+        game.make_move(step, step, step, step)
+        assert game.game_over == (step == 3), "Only the fourth stone on the diagonal wins"
+        if step < 3:
+            game.switch_player()
+            game.make_move(*filler[step])
+            game.switch_player()
+    assert game.winner == PLAYER_X, "X should win along the main diagonal"
+    print("    PASS: The main 4D diagonal wins")
+
+def test_endgame_on_larger_board():
+    print("  Testing the endgame solver on a 5x5x5 board...")
+    geometry = get_geometry(5, 5, 3)
+    game = CubicGame(geometry)
+    for move in [(0, 0, 0), (4, 4, 4), (0, 0, 1), (4, 4, 3), (0, 0, 2), (4, 4, 2), (0, 0, 3), (3, 3, 3)]:
+        game.make_move(*move)
+        game.switch_player()
+    ai = AdvancedAIPlayer(game.current_player, difficulty=3, verbose=False, geometry=geometry)
+    ai.controller.start()
+    move = ai.solve_endgame(game)
+    assert move == (0, 0, 4), f"X must win at (0, 0, 4), got {move}"
+    assert ai.best_value > 0, "The solver should report a win"
+    assert ai.endgame_solver.cache_path is None, "Boards over 64 cells cannot use the disk cache"
+    print("    PASS: The solver finds the win on a 125-cell board")
+
+if __name__ == "__main__":
+    print("Testing board geometries...")
+    test_default_geometry_tables()
+    test_line_counts()
+    test_symmetries_preserve_lines()
+    test_geometry_pickles_to_cached_instance()
+    test_larger_boards_play()
+    test_win_on_hypercube()
+    test_endgame_on_larger_board()
+    print("SUCCESS: All geometry tests passed!")
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import math
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from mcts_player import MCTSPlayer, MCTSNode, PRIOR_TEMPERATURE
+from constants import *
+
+OPENING = [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2)]
+
+def build_game(moves):
+    game = CubicGame()
+    for x, y, z in moves:
+        game.make_move(x, y, z)
+        game.switch_player()
+    return game
+
+def test_mcts_interface():
+    print("  Testing the MCTS player interface...")
+    game = build_game(OPENING)
+    for use_prior in (True, False):
+        player = MCTSPlayer(game.current_player, difficulty=1, use_prior=use_prior, seed=1, verbose=False)
+        move = player.find_best_move(game)
+        metrics = player.get_metrics()
+        assert move in game.get_possible_moves(), "MCTS returned an illegal move"
+        assert metrics["iterations"] == 300, "Difficulty 1 runs 300 playouts"
+        assert metrics["nodes"] == metrics["iterations"], "Nodes count playouts"
+        for key in ("time", "depth", "difficulty", "heuristic"):
+            assert key in metrics, f"Missing metric {key}"
+    player.set_difficulty(4)
+    assert player.max_iterations == 10000, "set_difficulty should change the budget"
+    print("    PASS: PUCT and UCT both return legal moves")
+
+def test_mcts_tactics():
+    print("  Testing MCTS wins and blocks...")
+    game = build_game([(0, 0, 0), (3, 3, 0), (0, 0, 1), (3, 3, 1), (0, 0, 2)])
+    player = MCTSPlayer(PLAYER_O, difficulty=1, seed=2, verbose=False)
+    assert player.find_best_move(game) == (0, 0, 3), "O must block X's line"
+    game = build_game([(0, 0, 0), (3, 3, 0), (0, 0, 1), (3, 3, 1), (0, 0, 2), (3, 3, 2), (1, 2, 1)])
+    assert player.find_best_move(game) == (3, 3, 3), "O must take its own win first"
+    print("    PASS: Winning and blocking cells are played at once")
+
+def test_prior_matches_quick_evaluate():
+    print("  Testing the PUCT prior against quick_evaluate...")
+    game = build_game(OPENING)
+    player = game.current_player
+    mcts = MCTSPlayer(player, verbose=False)
+    node = MCTSNode(None, None, PLAYER_O if player == PLAYER_X else PLAYER_X)
+    mcts.expand(node, game)
+    evaluator = AdvancedAIPlayer(player, heuristic_type=1, verbose=False)
+    scores = []
+    for child in node.children:
+        game.make_move(*child.move)
+        scores.append(evaluator.quick_evaluate(game))
+        game.undo_move()
+    for child, score in zip(node.children, scores):
+        for other, other_score in zip(node.children, scores):
+            expected = (score - other_score) / PRIOR_TEMPERATURE
+            assert abs(math.log(child.prior / other.prior) - expected) < 1e-9, "Prior differs from the softmax"
+    print(f"    PASS: {len(node.children)} priors follow quick_evaluate")
+
+def test_tree_reuse():
+    print("  Testing tree reuse between moves...")
+    game = build_game(OPENING)
+    player = MCTSPlayer(game.current_player, difficulty=2, seed=3, verbose=False)
+    move = player.find_best_move(game)
+    game.make_move(*move)
+    game.switch_player()
+    reply = next(child.move for child in sorted(player.root.children, key=lambda child: -child.visits)
+                 if child.move in game.get_possible_moves())
+    game.make_move(*reply)
+    game.switch_player()
+    player.find_best_move(game)
+    assert player.get_metrics()["reused_visits"] > 0, "The opponent's reply should keep its subtree"
+    print(f"    PASS: {player.reused_visits} playouts carried over")
+
+def test_root_parallel():
+    print("  Testing root-parallel MCTS...")
+    game = build_game(OPENING)
+    player = MCTSPlayer(game.current_player, difficulty=1, workers=2, seed=4, verbose=False)
+    try:
+        move = player.find_best_move(game)
+    finally:
+        player.close()
+    assert move in game.get_possible_moves(), "Root-parallel MCTS returned an illegal move"
+    assert player.iterations == 600, "Both workers should report their playouts"
+    print(f"    PASS: Move {move} from {player.iterations} playouts over 2 processes")
+
+if __name__ == "__main__":
+    print("Testing the MCTS player...")
+    test_mcts_interface()
+    test_mcts_tactics()
+    test_prior_matches_quick_evaluate()
+    test_tree_reuse()
+    test_root_parallel()
+    print("SUCCESS: All MCTS tests passed!")
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+import random
+import tempfile
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from opening_book import OpeningBook, build_book, enumerate_positions, _search_book_position
+from symmetry import SYMMETRIES, canonical_hash, transform_move
+from bitboard import *
+from constants import *
+
+def build_game(moves):
+    game = CubicGame()
+    for move in moves:
+        game.make_move(*move)
+        game.switch_player()
+    return game
+
+def test_enumerate_positions():
+    print("  Testing symmetry-reduced position enumeration...")
+    positions = enumerate_positions(2)
+    assert len(positions) == 3, "The empty board and two kinds of first move"
+    for key, (history, symmetry) in positions.items():
+        game = CubicGame.from_history(history)
+        assert canonical_hash(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O],
+                              game.current_player) == (key, symmetry), "Stored key does not match the position"
+    print(f"    PASS: {len(positions)} positions below ply 2, {len(enumerate_positions(3))} below ply 3")
+
+def test_book_round_trip():
+    print("  Testing the opening book file...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        summary = build_book(path, plies=3, depth=2, max_time=5, workers=1)
+        book = OpeningBook(path)
+        try:
+            assert len(book) == summary["positions"], "Every searched position should be written"
+            rng = random.Random(4)
+            for _ in range(20):
+                first = rng.choice(build_game([]).get_possible_moves())
+                game = build_game([first])
+                move = book.lookup(game)
+                assert move in game.get_possible_moves(), "Book move must be legal"
+
+                # The same position seen through another symmetry gets the
+                # image of the book move.
+                symmetry = rng.randrange(len(SYMMETRIES))
+                mirrored = build_game([transform_move(first, symmetry)])
+                mirrored_move = book.lookup(mirrored)
+                game.make_move(*move)
+                mirrored.make_move(*mirrored_move)
+                assert canonical_hash(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O], PLAYER_X)[0] == \
+                    canonical_hash(mirrored.bitboards[PLAYER_X], mirrored.bitboards[PLAYER_O], PLAYER_X)[0], \
+                    "Mirrored positions should get equivalent book moves"
+
+            deep = build_game([(0, 0, 0), (1, 1, 1), (2, 2, 2)])
+            assert book.lookup(deep) is None, "Positions past the book plies are out of book"
+        finally:
+            book.close()
+    print(f"    PASS: {summary['positions']} positions written and read back")
+
+def test_first_plies_are_searched():
+    print("  Testing book entries for the first two plies...")
+    for history in ([], [(0, 1, 2, PLAYER_X)]):
+        results = set()
+        for seed in range(3):
+            random.seed(seed)
+            results.add(_search_book_position(history, 0, 2, 5))
+        assert len(results) == 1, f"Book entries must not depend on the random seed, got {results}"
+        cell, value, searched = results.pop()
+        assert searched == 2, "The entry should record the depth searched"
+    print(f"    PASS: Ply {len(history)} stores cell {cell} from a depth {searched} search")
+
+def test_ai_answers_from_book():
+    print("  Testing find_best_move in book...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "book.bin")
+        build_book(path, plies=2, depth=2, max_time=5, workers=1)
+        book = OpeningBook(path)
+        try:
+            game = build_game([(0, 1, 2)])
+            ai = AdvancedAIPlayer(PLAYER_O, difficulty=3, verbose=False, opening_book=book)
+            start_time = time.perf_counter()
+            move = ai.find_best_move(game)
+            elapsed = time.perf_counter() - start_time
+        finally:
+            book.close()
+    assert move in game.get_possible_moves(), "Book move must be legal"
+    assert ai.nodes_evaluated == 0, "An in-book move should not search"
+    print(f"    PASS: Move {move} from the book in {elapsed * 1e6:.0f} us")
+
+if __name__ == "__main__":
+    print("Testing the opening book...")
+    test_enumerate_positions()
+    test_book_round_trip()
+    test_first_plies_are_searched()
+    test_ai_answers_from_book()
+    print("SUCCESS: All opening book tests passed!")
@@ -0,0 +1,105 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import math
+import time
+import multiprocessing
+import parallel_search
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from transposition import SharedTranspositionTable, EXACT, LOWER_BOUND, NO_MOVE
+from constants import *
+
+OPENING = [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2)]
+
+def build_game(moves):
+    game = CubicGame()
+    for x, y, z in moves:
+        game.make_move(x, y, z)
+        game.switch_player()
+    return game
+
+def test_root_split_matches_serial():
+    print("  Testing parallel root split against the serial search...")
+    game = build_game(OPENING)
+    
+    serial = AdvancedAIPlayer(game.current_player, difficulty=3, use_pvs=False)
+    serial.max_time = 1000
+    serial_move, serial_value = serial.alpha_beta_search(game.copy(), 3)
+    
+    parallel = AdvancedAIPlayer(game.current_player, difficulty=3, workers=2)
+    parallel.max_time = 1000
+    try:
+        move, value = parallel.parallel_root_search(game.copy(), 3)
+    finally:
+        parallel.close()
+    
+    assert value == serial_value, f"Root values differ: {value} != {serial_value}"
+    checker = AdvancedAIPlayer(game.current_player, difficulty=3, verbose=False)
+    checker.max_time = 1000
+    checker.controller.start()
+    child = checker.enter_move(game, move)
+    move_value = checker.alpha_beta_minimax(child, 2, -math.inf, math.inf, False)
+    checker.leave_move(game, child)
+    assert move_value == value, "The chosen move must itself reach the root value"
+    assert move in game.get_possible_moves(), "Parallel search returned an illegal move"
+    assert parallel.worker_nodes > 0, "Worker node counts should be reported"
+    assert parallel.get_metrics()["worker_nodes"] == parallel.worker_nodes, "Metrics miss worker nodes"
+    print(f"    PASS: Same value {value}, {parallel.worker_nodes} nodes searched by workers")
+
+def test_worker_reports_fail_low():
+    print("  Testing fail-low reports from root workers...")
+    game = build_game(OPENING)
+    config = (game.current_player, 3, 2, game.geometry)
+    history = [tuple(entry) for entry in game.move_history]
+    move = game.get_possible_moves()[0]
+    parallel_search._init_worker(multiprocessing.Value('d', -math.inf))
+    _, exact, _, finished, failed_low = parallel_search._search_root_move(
+        config, history, game.current_player, move, 3, time.time() + 1000)
+    assert finished and not failed_low, "A full window search is exact"
+    parallel_search._init_worker(multiprocessing.Value('d', exact))
+    _, bound, _, finished, failed_low = parallel_search._search_root_move(
+        config, history, game.current_player, move, 3, time.time() + 1000)
+    assert finished and failed_low and bound <= exact, "A tie with alpha is only an upper bound"
+    print(f"    PASS: Exact {exact}, fail low at alpha {exact}")
+
+def test_shared_table_round_trip():
+    print("  Testing the shared-memory transposition table...")
+    table = SharedTranspositionTable(1024)
+    other = SharedTranspositionTable.attach(table.name, table.size)
+    try:
+        table.store(0x1234_5678_9ABC_DEF0, 5, EXACT, -1500, 42)
+        table.store(0x0FED_CBA9_8765_4321, 3, LOWER_BOUND, 250)
+        assert other.probe(0x1234_5678_9ABC_DEF0) == (5, EXACT, -1500, 42), "Entry not visible to the attached table"
+        assert other.probe(0x0FED_CBA9_8765_4321) == (3, LOWER_BOUND, 250, NO_MOVE), "Empty move not preserved"
+        assert other.probe(0x1234_5678_9ABC_DEF1) is None, "A different key must miss"
+        other.store(0x1234_5678_9ABC_DEF0, 2, EXACT, 0, 1)
+        assert table.probe(0x1234_5678_9ABC_DEF0)[0] == 5, "A shallower entry must not replace a deeper one"
+        assert len(table) == 2, "Two slots should be in use"
+    finally:
+        other.close()
+        table.close()
+    print("    PASS: Entries round-trip between processes' views")
+
+def test_lazy_smp_search():
+    print("  Testing Lazy SMP search...")
+    game = build_game(OPENING)
+    ai = AdvancedAIPlayer(game.current_player, difficulty=2, workers=2, parallel_mode="lazy_smp")
+    ai.max_time = 1000
+    try:
+        move = ai.lazy_smp_search(game.copy())
+    finally:
+        ai.close()
+    assert move in game.get_possible_moves(), "Lazy SMP returned an illegal move"
+    assert ai.depth_reached >= ai.depth, "The deepest completed iteration should be reported"
+    assert ai.worker_nodes > 0, "Worker node counts should be reported"
+    print(f"    PASS: Move {move} at depth {ai.depth_reached}, {ai.worker_nodes} worker nodes")
+
+if __name__ == "__main__":
+    print("Testing parallel search...")
+    test_root_split_matches_serial()
+    test_worker_reports_fail_low()
+    test_shared_table_round_trip()
+    test_lazy_smp_search()
+    print("SUCCESS: All parallel search tests passed!")
@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+import tempfile
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from game_record import GameRecord
+from position_db import PositionDatabase
+from symmetry import transform_move
+from bitboard import *
+from constants import *
+
+def random_finished_game(seed):
+    game = CubicGame()
+    rng = random.Random(seed)
+    while not game.game_over:
+        game.make_move(*rng.choice(game.get_possible_moves()))
+        if not game.game_over:
+            game.switch_player()
+    return game
+
+def test_game_state_round_trip():
+    print("  Testing CubicGame.from_game_state...")
+    for seed in range(10):
+        game = random_finished_game(seed)
+        game.undo_move()
+        state = game.get_game_state()
+        copy = CubicGame.from_game_state(state)
+        assert copy.get_game_state() == state, "State changed"
+        assert copy.hash == game.hash and copy.move_count == game.move_count, "Hash or move count changed"
+        assert copy.threat_cells == game.threat_cells, "Line state changed"
+    won = random_finished_game(3)
+    copy = CubicGame.from_game_state(won.get_game_state())
+    assert copy.game_over and copy.winner == won.winner, "A won state must load as won"
+    try:
+        CubicGame.from_game_state("X" * 10)
+        assert False, "A short state must be rejected"
+    except ValueError:
+        pass
+    print("    PASS: Game states load back to the same position")
+
+def test_lookup_matches_games():
+    print("  Testing lookups against the games...")
+    games = [random_finished_game(seed) for seed in range(60)]
+    with tempfile.TemporaryDirectory() as directory:
+        database = PositionDatabase(os.path.join(directory, "db"))
+        try:
+            assert database.add_records(GameRecord.from_game(game) for game in games) == 60
+            entry = database.lookup(CubicGame())
+            assert entry["games"] == 60, "Every game starts from the empty board"
+            assert entry["wins"] + entry["draws"] + entry["losses"] == 60, "Results must add up"
+            x_wins = sum(game.winner == PLAYER_X for game in games)
+            assert entry["wins"] == x_wins, "Wins are counted for the side to move"
+
+            # The position after the first game's first move, seen in
+            # another frame, finds the same totals.
+            first = games[0].move_history[0][:3]
+            mirrored = CubicGame()
+            mirrored.make_move(*transform_move(first, 17))
+            mirrored.switch_player()
+            original = CubicGame()
+            original.make_move(*first)
+            original.switch_player()
+            direct = database.lookup(original)
+            assert direct is not None and database.lookup(mirrored)["games"] == direct["games"], \
+                "Symmetric positions share their statistics"
+            assert database.lookup_state(original.get_game_state())["games"] == direct["games"], \
+                "Game state lookups must agree"
+            empty_moves = set(original.get_possible_moves())
+            assert set(direct["moves"]) <= empty_moves, "Moves must be legal in the game's frame"
+        finally:
+            database.close()
+    print(f"    PASS: 60 games, X won {x_wins} from the empty board")
+
+def test_segments_and_compaction():
+    print("  Testing incremental segments and compaction...")
+    games = [random_finished_game(seed) for seed in range(100, 130)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "db")
+        database = PositionDatabase(path)
+        database.add_records(GameRecord.from_game(game) for game in games[:15])
+        database.add_records(GameRecord.from_game(game) for game in games[15:])
+        assert len(database.segments) == 2, "Each batch should become a segment"
+        states = [game.get_game_state() for game in (CubicGame(), games[0], games[20])]
+        before = [database.lookup_state(state) for state in states]
+        database.compact()
+        assert len(database.segments) == 1, "Compaction merges the segments"
+        assert [database.lookup_state(state) for state in states] == before, "Compaction changed results"
+        database.close()
+
+        reopened = PositionDatabase(path)
+        try:
+            assert reopened.lookup(CubicGame())["games"] == 30, "The manifest should list the merged segment"
+            assert len(os.listdir(path)) == 2, "Old segments should be removed"
+        finally:
+            reopened.close()
+    print("    PASS: Two segments compact into one with the same counts")
+
+def test_ai_uses_experience():
+    print("  Testing the AI's experience book...")
+    corner = CELL_COORDS.index((0, 0, 0))
+    record = GameRecord([corner, 5, 1, 6, 2, 7, 3], game_over=True, winner=PLAYER_X)
+    with tempfile.TemporaryDirectory() as directory:
+        database = PositionDatabase(os.path.join(directory, "db"))
+        try:
+            database.add_records([record] * POSITION_DB_MIN_GAMES)
+            ai = AdvancedAIPlayer(PLAYER_X, difficulty=1, verbose=False, position_db=database)
+            move = ai.find_best_move(CubicGame())
+            assert move in CORNER_POSITIONS, f"The AI should play the winning corner, got {move}"
+            assert ai.nodes_evaluated == 0, "No search is needed for a known position"
+        finally:
+            database.close()
+    print(f"    PASS: The AI played {move} from experience")
+
+def test_losing_experience_is_ignored():
+    print("  Testing that losing moves fall through to the search...")
+    # X plays 42 after X 21, O 4 and goes on to lose along O's 4-7 row.
+    record = GameRecord([21, 4, 42, 5, 0, 6, 48, 7], game_over=True, winner=PLAYER_O)
+    game = CubicGame()
+    for index in record.moves[:2]:
+        game.make_move(*CELL_COORDS[index])
+        game.switch_player()
+    with tempfile.TemporaryDirectory() as directory:
+        database = PositionDatabase(os.path.join(directory, "db"))
+        try:
+            database.add_records([record] * POSITION_DB_MIN_GAMES)
+            entry = database.lookup(game, POSITION_DB_MIN_GAMES)
+            assert entry["best_move"] is not None and entry["best_score"] == 0.0, "The move lost every game"
+            assert database.best_move(game) is None, "A losing move must not be trusted"
+            ai = AdvancedAIPlayer(PLAYER_X, difficulty=1, verbose=False, position_db=database)
+            ai.find_best_move(game)
+            assert ai.nodes_evaluated > 0, "The AI should search instead"
+        finally:
+            database.close()
+    print("    PASS: A move that lost 20 of 20 games is left to the search")
+
+if __name__ == "__main__":
+    print("Testing the position database...")
+    test_game_state_round_trip()
+    test_lookup_matches_games()
+    test_segments_and_compaction()
+    test_ai_uses_experience()
+    test_losing_experience_is_ignored()
+    print("SUCCESS: All position database tests passed!")
@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import tempfile
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from profiling import *
+from constants import *
+
+OPENING = [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2)]
+
+def opening_game():
+    game = CubicGame()
+    for move in OPENING:
+        game.make_move(*move)
+        game.switch_player()
+    return game
+
+def search_player():
+    ai = AdvancedAIPlayer(PLAYER_X, difficulty=3, verbose=False)
+    ai.max_time = 1000
+    ai.threat_depth = 0
+    return ai
+
+def test_profiler_counts_calls():
+    print("  Testing the instrumented profiler...")
+    ai = search_player()
+    assert all(hasattr(ai, name) for name in PROFILED_METHODS), "Every profiled method should exist"
+    profiler = ai.enable_profiling()
+    move = ai.find_best_move(opening_game())
+    assert ai.disable_profiling() is profiler, "disable_profiling returns the profiler"
+    assert "alpha_beta_minimax" not in vars(ai), "The original methods must be restored"
+
+    rows = {row["function"]: row for row in profiler.table()}
+    assert rows["alpha_beta_minimax"]["calls"] == ai.nodes_evaluated, "One call per node"
+    assert rows["evaluate"]["calls"] == ai.evaluations, "One call per evaluation"
+    assert rows["choose_move"]["total_time"] <= ai.last_search_time + 1e-3, "Inclusive time is too large"
+    assert all(row["self_time"] <= row["total_time"] + 1e-9 for row in rows.values()), "Self exceeds total"
+
+    plain = search_player()
+    assert plain.find_best_move(opening_game()) == move, "Profiling must not change the search"
+    assert plain.nodes_evaluated == ai.nodes_evaluated, "Profiling must not change the search"
+    print(f"    PASS: {rows['alpha_beta_minimax']['calls']} nodes timed, methods restored")
+
+def test_collapsed_stacks():
+    print("  Testing collapsed stack output...")
+    ai = search_player()
+    profiler = ai.enable_profiling()
+    ai.find_best_move(opening_game())
+    ai.disable_profiling()
+    lines = profiler.collapsed_stacks()
+    assert lines, "The search should leave stacks"
+    for line in lines:
+        stack, micros = line.rsplit(" ", 1)
+        assert stack.startswith("choose_move") and int(micros) > 0, f"Bad collapsed line: {line}"
+    assert any(";alpha_beta_minimax;enter_move" in line for line in lines), "Nested calls should show up"
+    total = sum(int(line.rsplit(" ", 1)[1]) for line in lines)
+    assert total <= ai.last_search_time * 1e6 + 1000, "Stacks should add up to at most the search time"
+    print(f"    PASS: {len(lines)} stacks, {total} us in total")
+
+def test_profile_position_cli():
+    print("  Testing profile_position from a game state...")
+    state = opening_game().get_game_state()
+    with tempfile.TemporaryDirectory() as directory:
+        prefix = os.path.join(directory, "profile")
+        move, metrics, files = profile_position(state, depth=3, prefix=prefix)
+        assert files == [prefix + ".collapsed", prefix + ".txt"], "Collapsed stacks and a table"
+        with open(prefix + ".txt", encoding="utf-8") as table:
+            assert "alpha_beta_minimax" in table.read(), "The table should list the search"
+        move, metrics, files = profile_position(state, depth=3, use_cprofile=True, prefix=prefix)
+        assert os.path.getsize(prefix + ".prof") > 0, "cProfile stats should be written"
+        assert metrics["depth_reached"] == 3, "The depth argument sets the search depth"
+    assert move in opening_game().get_possible_moves(), "Profiling should return a legal move"
+    print(f"    PASS: Profiled {move} at depth {metrics['depth_reached']}")
+
+if __name__ == "__main__":
+    print("Testing search profiling...")
+    test_profiler_counts_calls()
+    test_collapsed_stacks()
+    test_profile_position_cli()
+    print("SUCCESS: All profiling tests passed!")
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import io
+import contextlib
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from mcts_player import MCTSPlayer
+from search_stats import *
+from constants import *
+
+OPENING = [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1)]
+
+def opening_game():
+    game = CubicGame()
+    for move in OPENING:
+        game.make_move(*move)
+        game.switch_player()
+    return game
+
+def test_effective_branching_factor():
+    print("  Testing the effective branching factor...")
+    assert abs(effective_branching_factor(3 + 9 + 27, 3) - 3.0) < 1e-6, "39 nodes at depth 3 is b = 3"
+    assert abs(effective_branching_factor(10, 1) - 10.0) < 1e-6, "Depth 1 is the node count"
+    assert effective_branching_factor(0, 3) == 0.0, "No nodes, no branching"
+    print("    PASS: b + b^2 + b^3 = 39 gives b = 3")
+
+def test_iteration_events():
+    print("  Testing iteration and move events...")
+    events = []
+    ai = AdvancedAIPlayer(PLAYER_X, difficulty=3, verbose=False)
+    ai.max_time = 1000
+    ai.threat_depth = 0
+    ai.add_listener(lambda event, data: events.append((event, data)))
+    game = opening_game()
+    move = ai.find_best_move(game)
+
+    iterations = [data for event, data in events if event == ITERATION]
+    assert [data["depth"] for data in iterations] == list(range(1, ai.depth_reached + 1)), \
+        "One event per completed iteration"
+    assert events[-1][0] == MOVE and events[-1][1]["move"] == move, "The move event comes last"
+    metrics = ai.get_metrics()
+    assert metrics["iterations"] == iterations, "get_metrics holds the same iterations"
+    assert sum(data["nodes"] for data in iterations) <= metrics["nodes"], "Iteration nodes exceed the total"
+    for data in iterations:
+        assert data["tt_hits"] <= data["tt_probes"] and data["ebf"] >= 1.0, "Bad table or branching stats"
+        assert data["pv"][0] == data["move"] and len(data["pv"]) <= data["depth"], "The PV starts at the move"
+        replay = game.copy()
+        for pv_move in data["pv"]:
+            assert replay.make_move(*pv_move), "The PV must be legal"
+            replay.switch_player()
+    assert metrics["evaluations"] > 0 and metrics["tt_stores"] > 0, "Evaluations and stores are counted"
+    assert game.move_history == opening_game().move_history, "Building the PV must restore the game"
+    print(f"    PASS: {len(iterations)} iterations, PV {iterations[-1]['pv']}")
+
+def test_listeners_replace_print():
+    print("  Testing listener removal and verbose output...")
+    events = []
+    listener = lambda event, data: events.append(event)
+    quiet = AdvancedAIPlayer(PLAYER_X, difficulty=1, verbose=False)
+    quiet.add_listener(listener)
+    quiet.remove_listener(listener)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        quiet.find_best_move(opening_game())
+        MCTSPlayer(PLAYER_X, difficulty=1, verbose=False).find_best_move(opening_game())
+    assert events == [] and output.getvalue() == "", "Quiet players must not report anything"
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        AdvancedAIPlayer(PLAYER_X, difficulty=1).find_best_move(opening_game())
+    assert output.getvalue().startswith("AI: Found move"), "verbose prints through a listener"
+    print("    PASS: Removed listeners stay silent; verbose still prints")
+
+if __name__ == "__main__":
+    print("Testing search instrumentation...")
+    test_effective_branching_factor()
+    test_iteration_events()
+    test_listeners_replace_print()
+    print("SUCCESS: All search instrumentation tests passed!")
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from bitboard import *
+from symmetry import *
+from constants import *
+
+def random_game(seed, moves):
+    game = CubicGame()
+    rng = random.Random(seed)
+    for _ in range(moves):
+        if game.game_over:
+            break
+        game.make_move(*rng.choice(game.get_possible_moves()))
+        game.switch_player()
+    return game
+
+def test_symmetry_group():
+    print("  Testing the 192 board automorphisms...")
+    assert len(SYMMETRIES) == 192, "Qubic has 192 automorphisms"
+    assert len(set(SYMMETRIES)) == 192, "Symmetries must be distinct"
+    assert SYMMETRIES[0] == tuple(range(CELL_COUNT)), "Index 0 is the identity"
+    lines = set(LINE_MASKS)
+    for symmetry in range(len(SYMMETRIES)):
+        assert set(transform_bits(mask, symmetry) for mask in LINE_MASKS) == lines, "Lines not preserved"
+        assert all(INVERSE_SYMMETRIES[symmetry][SYMMETRIES[symmetry][i]] == i for i in range(CELL_COUNT)), \
+            "Inverse table is wrong"
+    print("    PASS: Every symmetry maps the 76 lines onto themselves")
+
+def test_canonical_hash_is_invariant():
+    print("  Testing canonical hashing...")
+    rng = random.Random(11)
+    for seed in range(20):
+        game = random_game(seed, 9)
+        x_bits, o_bits = game.bitboards[PLAYER_X], game.bitboards[PLAYER_O]
+        symmetry = rng.randrange(len(SYMMETRIES))
+        mirrored_x, mirrored_o = transform_bits(x_bits, symmetry), transform_bits(o_bits, symmetry)
+        assert canonical_hash(x_bits, o_bits, game.current_player)[0] == \
+            canonical_hash(mirrored_x, mirrored_o, game.current_player)[0], "Canonical hash differs"
+        assert canonical_position(x_bits, o_bits)[:2] == canonical_position(mirrored_x, mirrored_o)[:2], \
+            "Canonical position differs"
+    print("    PASS: Symmetric positions share a canonical key")
+
+def test_incremental_symmetric_hashes():
+    print("  Testing incremental symmetric hashes...")
+    game = CubicGame()
+    game.enable_symmetry_tracking()
+    rng = random.Random(5)
+    for _ in range(12):
+        game.make_move(*rng.choice(game.get_possible_moves()))
+        game.switch_player()
+        assert game.symmetric_hashes == symmetric_hashes(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O]), \
+            "Symmetric hashes drifted"
+    while game.undo_move():
+        pass
+    assert game.symmetric_hashes == [0] * len(SYMMETRIES), "Undo should clear every frame"
+    print("    PASS: Symmetric hashes follow make/undo")
+
+def test_unique_root_moves():
+    print("  Testing symmetric duplicate removal...")
+    game = CubicGame()
+    moves = unique_moves(0, 0, game.get_possible_moves())
+    assert len(moves) == 2, "The empty cube has two kinds of cell"
+    game.make_move(1, 1, 1)
+    reduced = unique_moves(game.bitboards[PLAYER_X], game.bitboards[PLAYER_O], game.get_possible_moves())
+    assert len(reduced) < 63, "A centre stone leaves symmetric replies"
+    print(f"    PASS: 64 -> 2 root moves, 63 -> {len(reduced)} after a centre move")
+
+def test_symmetric_search_agrees():
+    print("  Testing search with symmetry hashing...")
+    game = random_game(3, 4)
+    values = []
+    for use_symmetry in (False, True):
+        ai = AdvancedAIPlayer(game.current_player, difficulty=3, use_symmetry=use_symmetry)
+        ai.max_time = 1000
+        search_game = game.copy()
+        if use_symmetry:
+            search_game.enable_symmetry_tracking()
+        move, value = ai.alpha_beta_search(search_game, 3)
+        assert move in game.get_possible_moves(), "Search returned an illegal move"
+        values.append(value)
+    assert values[0] == values[1], f"Symmetry changed the root value: {values}"
+    print("    PASS: Same root value with and without symmetry")
+
+if __name__ == "__main__":
+    print("Testing board symmetries...")
+    test_symmetry_group()
+    test_canonical_hash_is_invariant()
+    test_incremental_symmetric_hashes()
+    test_unique_root_moves()
+    test_symmetric_search_agrees()
+    print("SUCCESS: All symmetry tests passed!")
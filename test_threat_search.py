@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from threat_search import ThreatSpaceSearch
+from bitboard import *
+from constants import *
+
+# Nine stones after which O has a forcing win seven attacker moves deep.
+FORCED_WIN_MOVES = [(2, 3, 3), (1, 1, 2), (0, 1, 3), (2, 0, 3), (2, 1, 1),
+                    (2, 3, 2), (0, 1, 1), (0, 1, 2), (3, 2, 2)]
+
+def build_game(moves):
+    game = CubicGame()
+    for x, y, z in moves:
+        game.make_move(x, y, z)
+        game.switch_player()
+    return game
+
+def test_forced_win_is_found():
+    print("  Testing threat-space search on a deep forced win...")
+    game = build_game(FORCED_WIN_MOVES)
+    attacker = game.current_player
+    sequence = ThreatSpaceSearch().find_forced_win(game, attacker)
+    assert sequence, "Forced win should be found"
+    assert len(sequence) >= 11, "This win runs more than ten plies deep"
+    assert game.move_count == len(FORCED_WIN_MOVES), "Search must restore the board"
+    
+    # Replaying the line: every defender reply is the only block, and the
+    # attacker finishes with a double threat or an outright win.
+    for ply, (x, y, z) in enumerate(sequence):
+        if ply % 2 == 1:
+            assert popcount(game.threat_cells[attacker]) == 1, "Defender reply must be forced"
+            assert game.threat_cells[attacker] == CELL_BITS[cell_index(x, y, z)], "Reply must block"
+        game.make_move(x, y, z)
+        game.switch_player()
+    assert game.winner == attacker or popcount(game.threat_cells[attacker]) >= 2, "Line must end in a win"
+    print(f"    PASS: Found a {len(sequence)}-ply forcing win")
+
+# X threatens a forcing win here, but O (on move) can break it up.
+DEFENDABLE_MOVES = [(1, 3, 3), (3, 1, 0), (1, 2, 1), (0, 3, 3), (3, 0, 3), (2, 2, 3),
+                    (1, 1, 0), (0, 0, 1), (3, 2, 0), (1, 2, 3), (3, 0, 0)]
+
+def test_defender_refutes_forcing_line():
+    print("  Testing defence against a forcing line...")
+    game = build_game(DEFENDABLE_MOVES)
+    search = ThreatSpaceSearch()
+    assert search.find_forced_win(game, PLAYER_X), "X should have a forcing line"
+    move = search.find_defensive_move(game, PLAYER_X, PLAYER_O)
+    assert move, "O should find a refutation"
+    game.make_move(*move)
+    game.switch_player()
+    assert search.find_forced_win(game, PLAYER_X) is None, "Defensive move must break the forcing line"
+    print(f"    PASS: {move} breaks X's forcing line")
+
+def test_ai_plays_forcing_move():
+    print("  Testing AI uses the threat search...")
+    game = build_game(FORCED_WIN_MOVES)
+    ai = AdvancedAIPlayer(game.current_player, difficulty=5)
+    move = ai.find_best_move(game)
+    sequence = ThreatSpaceSearch().find_forced_win(game, game.current_player)
+    assert move == sequence[0], "AI should start the forcing line"
+    print(f"    PASS: AI opened the forcing line with {move}")
+
+if __name__ == "__main__":
+    print("Testing threat-space search...")
+    test_forced_win_is_found()
+    test_defender_refutes_forcing_line()
+    test_ai_plays_forcing_move()
+    print("SUCCESS: All threat search tests passed!")
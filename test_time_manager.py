@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from time_manager import TimeManager
+from constants import *
+
+OPENING = [(1, 1, 1), (2, 2, 2), (0, 0, 0), (1, 2, 1), (3, 3, 3), (2, 1, 2)]
+
+def build_game(moves):
+    game = CubicGame()
+    for x, y, z in moves:
+        game.make_move(x, y, z)
+        game.switch_player()
+    return game
+
+def test_budgets():
+    print("  Testing per-move and clock budgets...")
+    manager = TimeManager()
+    opening = manager.start_move(build_game(OPENING[:2]), 4)
+    opening_soft = manager.soft_time()
+    middle = manager.start_move(build_game(OPENING), 4)
+    assert opening == middle == 4, "The per-move budget is the hard limit"
+    assert opening_soft < manager.soft_time() < 4, "The middle game should get more than the opening"
+    
+    manager.set_clock(60, increment=1)
+    hard = manager.start_move(build_game(OPENING), 4)
+    assert manager.soft_time() <= hard <= 60 * 0.25 + 1, "A move may not take a big bite of the clock"
+    manager.finish_move(10)
+    assert manager.clock == 51, "A move is charged to the clock and earns the increment"
+    manager.set_clock(None)
+    print(f"    PASS: Hard {hard:.2f}s on a 60s clock, soft {manager.soft_time():.2f}s")
+
+def test_stability_and_prediction():
+    print("  Testing stability scaling and iteration prediction...")
+    manager = TimeManager()
+    manager.start_move(build_game(OPENING), 10)
+    base = manager.soft_time()
+    for depth in range(1, 5):
+        manager.record_iteration(depth, (0, 0, 0), 100, 10 ** depth, 0.001 * 10 ** depth)
+    assert manager.soft_time() < base, "A stable root should spend less"
+    
+    manager.record_iteration(5, (3, 3, 0), 100, 10 ** 5, 0.1)
+    assert manager.soft_time() > base, "A new best move should spend more"
+    manager.start_move(build_game(OPENING), 10)
+    manager.record_iteration(1, (0, 0, 0), 100, 10, 0.001)
+    manager.record_iteration(2, (0, 0, 0), 100, 100, 0.01)
+    stable = manager.soft_time()
+    manager.record_iteration(3, (0, 0, 0), -100, 1000, 0.1)
+    assert manager.score_dropped and manager.soft_time() > stable, "A score drop should spend more"
+    
+    # Node counts grow tenfold per ply, so depth 4 should take about 1s.
+    assert abs(manager.branching_factor() - 10) < 1e-6
+    assert abs(manager.predict_next_iteration() - 1.0) < 1e-6
+    assert manager.should_start_iteration(0.2)
+    manager.hard_time = 1.0
+    assert not manager.should_start_iteration(0.2), "An iteration that cannot finish must not start"
+    print("    PASS: Budget follows stability, branching factor 10 predicts 1s")
+
+def test_ai_time_management():
+    print("  Testing the AI on a clock...")
+    game = build_game(OPENING)
+    ai = AdvancedAIPlayer(game.current_player, difficulty=5, verbose=False)
+    ai.threat_depth = 0
+    ai.depth = 12
+    ai.max_time = 1.0
+    start_time = time.perf_counter()
+    move = ai.find_best_move(game)
+    elapsed = time.perf_counter() - start_time
+    assert move in game.get_possible_moves()
+    assert elapsed < ai.max_time + 0.1, f"Hard budget overrun: {elapsed:.3f}s"
+    assert ai.depth_reached >= 1 and len(ai.time_manager.iterations) >= 1
+    
+    ai.set_clock(3.0)
+    ai.find_best_move(game)
+    assert ai.time_manager.clock < 3.0, "The clock should run down"
+    assert ai.last_search_time <= 3.0 * 0.25 + 0.1, "One move should not spend the clock"
+    print(f"    PASS: {elapsed:.2f}s at depth {ai.depth_reached}, clock left {ai.time_manager.clock:.2f}s")
+
+if __name__ == "__main__":
+    print("Testing time management...")
+    test_budgets()
+    test_stability_and_prediction()
+    test_ai_time_management()
+    print("SUCCESS: All time management tests passed!")
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from tournament import sprt_llr, sprt_bounds, fit_elo, run_tournament
+
+def test_sprt_llr():
+    print("  Testing the SPRT log-likelihood ratio...")
+    lower, upper = sprt_bounds(0.05, 0.05)
+    assert sprt_llr(0, 0, 0, 0, 50) == 0.0, "No games carry no evidence"
+    assert sprt_llr(30, 5, 2, 0, 50) > upper, "A clear winner should accept H1"
+    assert sprt_llr(2, 5, 30, 0, 50) < lower, "A clear loser should accept H0"
+    assert lower < sprt_llr(0, 4, 0, 0, 50) < 0, "A few draws lean to H0 without deciding"
+    print(f"    PASS: Bounds ({lower:.3f}, {upper:.3f})")
+
+def test_fit_elo():
+    print("  Testing the Elo fit...")
+    pairings = {
+        ("strong", "middle"): {"wins": 8, "draws": 2, "losses": 2},
+        ("middle", "weak"): {"wins": 8, "draws": 2, "losses": 2},
+        ("strong", "weak"): {"wins": 12, "draws": 0, "losses": 0},
+    }
+    ratings = fit_elo(["strong", "middle", "weak"], pairings)
+    assert ratings["strong"] > ratings["middle"] > ratings["weak"], f"Ladder out of order: {ratings}"
+    assert abs(sum(ratings.values())) < 1, "Ratings should be centred on zero"
+    print(f"    PASS: {ratings}")
+
+def test_small_tournament():
+    print("  Testing a small round robin...")
+    configs = [
+        {"name": "d1-h1", "difficulty": 1, "heuristic_type": 1},
+        {"name": "d1-h2", "difficulty": 1, "heuristic_type": 2},
+    ]
+    results = run_tournament(configs, max_games=4, min_games=2, workers=2)
+    record = results["pairings"][("d1-h1", "d1-h2")]
+    played = record["wins"] + record["draws"] + record["losses"]
+    assert played % 2 == 0 and 2 <= played <= 4, "Games are played in colour-swapped pairs"
+    assert record["status"] != "open", "The pairing should finish"
+    assert results["games"] == played, "Every game should be counted"
+    assert len(results["ratings"]) == 2, "Every config should be rated"
+    print(f"    PASS: {played} games, status {record['status']}")
+
+if __name__ == "__main__":
+    print("Testing the tournament runner...")
+    test_sprt_llr()
+    test_fit_elo()
+    test_small_tournament()
+    print("SUCCESS: All tournament tests passed!")
@@ -0,0 +1,85 @@
+from constants import *
+from bitboard import *
+
+
+# Searches forcing moves only: every attacker move must open a winning cell,
+# so the defender's reply is the block. A line that ends with two winning
+# cells at once (or an immediate win) is a forced win, however deep it runs.
+class ThreatSpaceSearch:
+    def __init__(self, max_depth=THREAT_SEARCH_DEPTH, node_limit=THREAT_SEARCH_NODES):
+        self.max_depth = max_depth
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.total_nodes = 0
+        self.failed = {}
+
+    # Returns [attack, block, attack, ...] for the attacker (on move), or None.
+    def find_forced_win(self, game, attacker):
+        self.nodes = 0
+        self.failed = {}
+        defender = PLAYER_O if attacker == PLAYER_X else PLAYER_X
+        return self.attack(game, attacker, defender, self.max_depth)
+
+    # The defender is on move: find a cell on the attacker's forcing line
+    # after which the attacker has no forced win left.
+    def find_defensive_move(self, game, attacker, defender):
+        sequence = self.find_forced_win(game, attacker)
+        if not sequence:
+            return None
+        for move in sequence:
+            index = game.geometry.cell_of[move]
+            if game.occupied() & game.geometry.cell_bits[index]:
+                continue
+            game.place_index(index, defender)
+            refuted = self.find_forced_win(game, attacker) is None
+            game.remove_index(index)
+            if refuted:
+                return move
+        return None
+
+    def attack(self, game, attacker, defender, depth):
+        self.nodes += 1
+        self.total_nodes += 1
+        cell_coords = game.geometry.cell_coords
+        winning = game.threat_cells[attacker]
+        if winning:
+            return [cell_coords[(winning & -winning).bit_length() - 1]]
+
+        defender_threats = game.threat_cells[defender]
+        if depth == 0 or popcount(defender_threats) > 1 or self.nodes > self.node_limit:
+            return None
+        if self.failed.get(game.hash, -1) >= depth:
+            return None
+
+        candidates = self.threat_moves(game, attacker, defender)
+        if defender_threats:
+            candidates &= defender_threats
+
+        for index in iter_bits(candidates):
+            game.place_index(index, attacker)
+            threats = game.threat_cells[attacker]
+            if popcount(threats) >= 2:
+                game.remove_index(index)
+                return [cell_coords[index]]
+
+            block = threats.bit_length() - 1
+            game.place_index(block, defender)
+            line = self.attack(game, attacker, defender, depth - 1)
+            game.remove_index(block)
+            game.remove_index(index)
+            if line:
+                return [cell_coords[index], cell_coords[block]] + line
+
+        self.failed[game.hash] = depth
+        return None
+
+    def threat_moves(self, game, attacker, defender):
+        own_counts = game.line_counts[attacker]
+        defender_counts = game.line_counts[defender]
+        empty = ~game.occupied() & game.geometry.full_mask
+        two_short = game.geometry.length - 2
+        cells = 0
+        for line, mask in enumerate(game.geometry.line_masks):
+            if own_counts[line] == two_short and defender_counts[line] == 0:
+                cells |= mask & empty
+        return cells
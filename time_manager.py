@@ -0,0 +1,129 @@
+import math
+from bitboard import *
+from constants import *
+
+# Each move gets a soft budget, the time it should normally take, and a
+# hard budget that becomes the search controller's deadline. No new
+# iteration starts past the soft budget or when it is predicted to run
+# past the hard one.
+SOFT_FRACTION = 0.5
+# With a game clock the base share is clock / moves left (plus the
+# increment); the hard budget is a few shares but never a big bite of
+# the clock.
+MIN_MOVES_LEFT = 6
+CLOCK_HARD_FACTOR = 3.0
+CLOCK_MAX_FRACTION = 0.25
+MOVE_OVERHEAD = 0.02
+# The opening is shallow and mostly booked; the first half of the middle
+# game, where double threats are built, gets the most time.
+OPENING_PLIES = 6
+OPENING_FACTOR = 0.5
+MIDDLE_GAME_FACTOR = 1.2
+# Stability scaling of the soft budget. Best-move changes decay by half
+# every iteration.
+MOVE_CHANGE_WEIGHT = 0.6
+SCORE_DROP_MARGIN = 50
+SCORE_DROP_FACTOR = 1.5
+STABLE_ITERATIONS = 3
+STABLE_FACTOR = 0.6
+MAX_EXTENSION = 2.5
+
+
+class TimeManager:
+    def __init__(self):
+        self.clock = None
+        self.increment = 0.0
+        self.clear()
+
+    # Clock mode: `remaining` seconds for the rest of the game plus
+    # `increment` per move. None goes back to per-move budgets.
+    def set_clock(self, remaining, increment=0.0):
+        self.clock = remaining
+        self.increment = increment
+
+    # No limits, for searches that run until they are cancelled.
+    def clear(self):
+        self.base_time = math.inf
+        self.hard_time = math.inf
+        # (depth, move, value, nodes, seconds) per completed iteration
+        self.iterations = []
+        self.move_changes = 0.0
+        self.stable_iterations = 0
+        self.score_dropped = False
+
+    def phase_factor(self, game):
+        if game.move_count < OPENING_PLIES:
+            return OPENING_FACTOR
+        if popcount(game.occupied()) < game.geometry.cell_count // 2:
+            return MIDDLE_GAME_FACTOR
+        return 1.0
+
+    # Sets the budgets for one move and returns the hard one. move_time is
+    # the per-move budget, used when no clock is set.
+    def start_move(self, game, move_time):
+        self.clear()
+        phase = self.phase_factor(game)
+        if self.clock is None:
+            self.hard_time = move_time
+            self.base_time = move_time * SOFT_FRACTION * phase
+        else:
+            empty = game.geometry.cell_count - popcount(game.occupied())
+            moves_left = max(MIN_MOVES_LEFT, (empty + 1) // 2)
+            available = max(0.0, self.clock - MOVE_OVERHEAD)
+            share = available / moves_left + self.increment
+            self.hard_time = min(share * CLOCK_HARD_FACTOR, available * CLOCK_MAX_FRACTION + self.increment,
+                                 available)
+            self.base_time = min(share * phase, self.hard_time)
+        return self.hard_time
+
+    # Charges a finished move to the clock.
+    def finish_move(self, seconds):
+        if self.clock is not None:
+            self.clock = max(0.0, self.clock - seconds) + self.increment
+
+    def soft_time(self):
+        factor = 1.0 + MOVE_CHANGE_WEIGHT * self.move_changes
+        if self.score_dropped:
+            factor *= SCORE_DROP_FACTOR
+        elif self.stable_iterations >= STABLE_ITERATIONS:
+            factor *= STABLE_FACTOR
+        return min(self.base_time * min(factor, MAX_EXTENSION), self.hard_time)
+
+    def record_iteration(self, depth, move, value, nodes, seconds):
+        self.move_changes *= 0.5
+        if self.iterations and move != self.iterations[-1][1]:
+            self.move_changes += 1
+            self.stable_iterations = 0
+        else:
+            self.stable_iterations += 1
+        # Scores swing with the side that moved last, so a drop is measured
+        # against the iteration two plies back.
+        for previous in self.iterations:
+            if previous[0] == depth - 2:
+                self.score_dropped = value < previous[2] - SCORE_DROP_MARGIN
+        self.iterations.append((depth, move, value, nodes, seconds))
+
+    # Effective branching factor from the node counts of the last
+    # iterations, taken over two plies when possible because alpha-beta
+    # trees grow unevenly between odd and even depths.
+    def branching_factor(self):
+        if len(self.iterations) >= 3 and self.iterations[-3][3] > 0:
+            return math.sqrt(self.iterations[-1][3] / self.iterations[-3][3])
+        if len(self.iterations) >= 2 and self.iterations[-2][3] > 0:
+            return self.iterations[-1][3] / self.iterations[-2][3]
+        return None
+
+    def predict_next_iteration(self):
+        factor = self.branching_factor()
+        if factor is None:
+            return None
+        return self.iterations[-1][4] * factor
+
+    # The first iteration always runs so that there is a move to play.
+    def should_start_iteration(self, elapsed):
+        if not self.iterations:
+            return True
+        if elapsed >= self.soft_time():
+            return False
+        predicted = self.predict_next_iteration()
+        return predicted is None or elapsed + predicted <= self.hard_time
@@ -0,0 +1,176 @@
+import os
+import math
+import random
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from game import CubicGame
+from ai_player import AdvancedAIPlayer
+from mcts_player import MCTSPlayer
+from ai_experiments import play_game
+from constants import PLAYER_X, PLAYER_O
+
+# A config is a dict of player keyword arguments plus a "name", e.g.
+# {"name": "d3-h2", "difficulty": 3, "heuristic_type": 2}. "engine": "mcts"
+# selects MCTSPlayer instead of AdvancedAIPlayer.
+DEFAULT_CONFIGS = [
+    {"name": "d1-h2", "difficulty": 1, "heuristic_type": 2},
+    {"name": "d2-h2", "difficulty": 2, "heuristic_type": 2},
+    {"name": "d3-h1", "difficulty": 3, "heuristic_type": 1},
+    {"name": "d3-h2", "difficulty": 3, "heuristic_type": 2},
+]
+
+
+def _build_player(config, symbol):
+    options = {key: value for key, value in config.items() if key not in ("name", "engine")}
+    engine = MCTSPlayer if config.get("engine") == "mcts" else AdvancedAIPlayer
+    return engine(symbol, verbose=False, **options)
+
+
+def _play_tournament_game(pairing, first_is_x, seed, config_x, config_o):
+    random.seed(seed)
+    result = play_game(CubicGame(), _build_player(config_x, PLAYER_X), _build_player(config_o, PLAYER_O))
+    result["pairing"] = pairing
+    result["first_is_x"] = first_is_x
+    result["seed"] = seed
+    return result
+
+
+def expected_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+# Log-likelihood ratio of "first is elo1 stronger" against "elo0 stronger",
+# using the normal approximation to the trinomial (win/draw/loss) score.
+# Half a virtual win and half a virtual loss keep the variance of an
+# all-draw record from collapsing to zero.
+def sprt_llr(wins, draws, losses, elo0, elo1):
+    if wins + draws + losses == 0:
+        return 0.0
+    wins, losses = wins + 0.5, losses + 0.5
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    s0, s1 = expected_score(elo0), expected_score(elo1)
+    return games * (s1 - s0) * (2 * score - s0 - s1) / (2 * variance)
+
+
+def sprt_bounds(alpha, beta):
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+
+# Bradley-Terry fit by minorization-maximization, a draw counting as half a
+# win for each side. One virtual draw against every opponent keeps an
+# unbeaten config finite. Ratings are in Elo, centred on zero.
+def fit_elo(names, pairings, iterations=200):
+    strengths = {name: 1.0 for name in names}
+    scores = {name: 0.0 for name in names}
+    games = {}
+    for (first, second), record in pairings.items():
+        played = record["wins"] + record["draws"] + record["losses"] + 1
+        scores[first] += record["wins"] + (record["draws"] + 1) / 2
+        scores[second] += record["losses"] + (record["draws"] + 1) / 2
+        games[(first, second)] = played
+
+    for _ in range(iterations):
+        updated = {}
+        for name in names:
+            denominator = 0.0
+            for (first, second), played in games.items():
+                if name in (first, second):
+                    denominator += played / (strengths[first] + strengths[second])
+            updated[name] = scores[name] / denominator if denominator else strengths[name]
+        mean = math.exp(sum(math.log(value) for value in updated.values()) / len(updated))
+        strengths = {name: value / mean for name, value in updated.items()}
+
+    return {name: round(400 * math.log10(value), 1) for name, value in strengths.items()}
+
+
+def run_tournament(
+    configs=DEFAULT_CONFIGS,
+    max_games=40,
+    min_games=4,
+    elo0=0,
+    elo1=50,
+    alpha=0.05,
+    beta=0.05,
+    workers=None,
+    seed=0
+):
+    
+
+    # Every pairing plays game pairs (one with each colour, same seed) in
+    # rounds. A pairing leaves the schedule once its SPRT decides, or at
+    # max_games, so the CPU goes to the results that are still open.
+    names = [config["name"] for config in configs]
+    by_name = {config["name"]: config for config in configs}
+    lower, upper = sprt_bounds(alpha, beta)
+    pairings = {
+        pairing: {"wins": 0, "draws": 0, "losses": 0, "llr": 0.0, "status": "open"}
+        for pairing in itertools.combinations(names, 2)
+    }
+    workers = workers or os.cpu_count() or 1
+    game_seed = seed
+    total_games = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            active = [pairing for pairing, record in pairings.items() if record["status"] == "open"]
+            if not active:
+                break
+
+            futures = []
+            for pairing in active:
+                first, second = pairing
+                futures.append(executor.submit(_play_tournament_game, pairing, True, game_seed,
+                                               by_name[first], by_name[second]))
+                futures.append(executor.submit(_play_tournament_game, pairing, False, game_seed,
+                                               by_name[second], by_name[first]))
+                game_seed += 1
+
+            for future in futures:
+                result = future.result()
+                record = pairings[result["pairing"]]
+                first_symbol = PLAYER_X if result["first_is_x"] else PLAYER_O
+                if result["winner"] == first_symbol:
+                    record["wins"] += 1
+                elif result["winner"] is None:
+                    record["draws"] += 1
+                else:
+                    record["losses"] += 1
+                total_games += 1
+
+            for pairing in active:
+                record = pairings[pairing]
+                played = record["wins"] + record["draws"] + record["losses"]
+                record["llr"] = round(sprt_llr(record["wins"], record["draws"], record["losses"], elo0, elo1), 3)
+                if played < min_games:
+                    continue
+                if record["llr"] >= upper:
+                    record["status"] = "H1"
+                elif record["llr"] <= lower:
+                    record["status"] = "H0"
+                elif played >= max_games:
+                    record["status"] = "max_games"
+
+    ratings = fit_elo(names, pairings)
+    return {
+        "ratings": sorted(ratings.items(), key=lambda item: item[1], reverse=True),
+        "pairings": pairings,
+        "games": total_games,
+        "bounds": (round(lower, 3), round(upper, 3)),
+        "workers": workers
+    }
+
+
+if __name__ == "__main__":
+    results = run_tournament()
+
+    print("\n===== ELO LADDER =====")
+    for name, elo in results["ratings"]:
+        print(f"{name}: {elo}")
+
+    print("\n===== PAIRINGS =====")
+    for (first, second), record in results["pairings"].items():
+        print(f"{first} vs {second}: +{record['wins']} ={record['draws']} -{record['losses']} "
+              f"LLR {record['llr']} {record['status']}")
+    print(f"\ngames: {results['games']}  SPRT bounds: {results['bounds']}")
@@ -0,0 +1,165 @@
+from multiprocessing import shared_memory
+from constants import *
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+NO_MOVE = -1
+
+
+class TranspositionTable:
+    def __init__(self, size=MAX_CACHE_SIZE):
+        slots = 1
+        while slots < size:
+            slots <<= 1
+        self.size = slots
+        self.mask = slots - 1
+        self.keys = [None] * slots
+        self.depths = [0] * slots
+        self.flags = [EXACT] * slots
+        self.values = [0] * slots
+        self.moves = [NO_MOVE] * slots
+        self.generations = [0] * slots
+        self.generation = 0
+        self.reset_stats()
+
+    def new_search(self):
+        self.generation += 1
+
+    # Evictions count stores that overwrite a different position.
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def probe(self, key):
+        self.probes += 1
+        index = key & self.mask
+        if self.keys[index] != key:
+            return None
+        self.hits += 1
+        return self.depths[index], self.flags[index], self.values[index], self.moves[index]
+
+    def store(self, key, depth, flag, value, move=NO_MOVE):
+        index = key & self.mask
+        stored_key = self.keys[index]
+        # Depth-preferred: an entry written during the current search is only
+        # replaced by one searched at least as deep; older entries always go.
+        if (stored_key is not None and self.generations[index] == self.generation
+                and depth < self.depths[index]):
+            return
+        self.stores += 1
+        if stored_key == key:
+            if move == NO_MOVE:
+                move = self.moves[index]
+        elif stored_key is not None:
+            self.evictions += 1
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.flags[index] = flag
+        self.values[index] = value
+        self.moves[index] = move
+        self.generations[index] = self.generation
+
+    def clear(self):
+        for index in range(self.size):
+            self.keys[index] = None
+        self.generation = 0
+
+    def __len__(self):
+        return self.size - self.keys.count(None)
+
+
+# Entry layout shared by every process: two unsigned 64-bit words per slot,
+# (key ^ data, data). A torn write from a concurrent store makes the XOR
+# check fail, so readers see a miss instead of a corrupt entry.
+_VALUE_BITS = 32
+_VALUE_OFFSET = 1 << 31
+_DEPTH_SHIFT = 32
+_FLAG_SHIFT = 40
+_MOVE_SHIFT = 42
+_MOVE_MASK = 0x1FF
+_GENERATION_SHIFT = 51
+_EMPTY_MOVE = _MOVE_MASK
+
+
+class SharedTranspositionTable:
+    def __init__(self, size=SHARED_TABLE_SIZE, name=None, generation=0):
+        slots = 1
+        while slots < size:
+            slots <<= 1
+        self.size = slots
+        self.mask = slots - 1
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=slots * 16)
+            self.memory.buf[:] = bytes(slots * 16)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.words = self.memory.buf.cast('Q')
+        self.name = self.memory.name
+        self.generation = generation
+        self.reset_stats()
+
+    @classmethod
+    def attach(cls, name, size, generation=0):
+        return cls(size, name=name, generation=generation)
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFF
+
+    # Counts are per process; evictions are stores over another position.
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def probe(self, key):
+        self.probes += 1
+        index = (key & self.mask) << 1
+        data = self.words[index + 1]
+        if data == 0 or self.words[index] ^ data != key:
+            return None
+        self.hits += 1
+        move = (data >> _MOVE_SHIFT) & _MOVE_MASK
+        return (
+            (data >> _DEPTH_SHIFT) & 0xFF,
+            (data >> _FLAG_SHIFT) & 0x3,
+            (data & 0xFFFFFFFF) - _VALUE_OFFSET,
+            NO_MOVE if move == _EMPTY_MOVE else move
+        )
+
+    def store(self, key, depth, flag, value, move=NO_MOVE):
+        index = (key & self.mask) << 1
+        stored = self.words[index + 1]
+        if (stored and (stored >> _GENERATION_SHIFT) & 0xFF == self.generation
+                and depth < (stored >> _DEPTH_SHIFT) & 0xFF):
+            return
+        self.stores += 1
+        if stored and self.words[index] ^ stored != key:
+            self.evictions += 1
+        if move == NO_MOVE:
+            move = _EMPTY_MOVE
+        value = int(max(-_VALUE_OFFSET, min(_VALUE_OFFSET - 1, value)))
+        data = ((value + _VALUE_OFFSET)
+                | (depth & 0xFF) << _DEPTH_SHIFT
+                | flag << _FLAG_SHIFT
+                | move << _MOVE_SHIFT
+                | self.generation << _GENERATION_SHIFT)
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+
+    def clear(self):
+        self.memory.buf[:] = bytes(self.size * 16)
+
+    def close(self):
+        self.words.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __len__(self):
+        return sum(1 for index in range(1, self.size * 2, 2) if self.words[index])